@@ -0,0 +1,3 @@
+"""
+离线基准测试
+"""
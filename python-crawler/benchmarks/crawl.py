@@ -0,0 +1,265 @@
+"""
+爬虫离线基准测试
+通过 FixtureAdapter 回放录制的 HTTP 响应，逐个运行注册表中的数据源，统计各阶段耗时：
+    fetch      传输层耗时（回放时即分发开销，多线程数据源为各线程之和）
+    parse      爬虫函数总耗时减去 fetch
+    normalize  按规范化 URL 生成 ID 去重，并编码为存储格式
+    store      写入 Redis（使用 fakeredis，未安装时跳过）
+同时报告吞吐量与 tracemalloc 峰值内存，并可与保存的基线比较
+
+Usage:
+    python -m benchmarks.crawl                          # 回放（无录制文件时使用合成响应）
+    python -m benchmarks.crawl --record                 # 访问真实站点并录制响应（需要网络）
+    python -m benchmarks.crawl --save-baseline baseline.json
+    python -m benchmarks.crawl --baseline baseline.json # 与基线比较，退化时退出码为 1
+"""
+import io
+import json
+import time
+import argparse
+import statistics
+import tracemalloc
+from contextlib import redirect_stdout, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.fixtures import FIXTURE_DIR
+from benchmarks.transport import FixtureAdapter
+from crawlers.article import crawl_batch
+from crawlers.utils import get_session, session_manager, rate_limiter, article_id_for_url
+from crawlers.http_cache import http_cache
+from crawlers.parse_cache import parse_cache
+from crawlers.hackernews_crawler import item_loader
+from crawlers.registry import registry
+from redis_client import RedisClient, INCREMENTAL_SAVE_SCRIPT, pack_articles
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None  # 未安装时跳过 store 阶段
+
+# 比较基线时忽略的绝对差值（毫秒 / KB），避免噪声误报
+NOISE_FLOOR_MS = 2.0
+NOISE_FLOOR_KB = 64.0
+
+
+def _count_items(result: Any) -> int:
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, dict):
+        # 足球数据：球队 + 比赛
+        standings = result.get("standings") or {}
+        matches = result.get("matches") or {}
+        return len(standings.get("teams", [])) + len(matches.get("matches", []))
+    return 0
+
+
+def _measure(fn: Callable[[], Any], adapter: FixtureAdapter) -> Dict[str, Any]:
+    """运行一次，返回各项指标和结果"""
+    item_loader.clear()
+    adapter.reset_stats()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        # 与 main._instrumented 一致：一次运行的文章共用一个 crawl_time
+        with crawl_batch():
+            result = fn()
+        error = None
+    except Exception as e:
+        result, error = [], str(e)
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    fetch = adapter.fetch_seconds
+    return {
+        "result": result,
+        "error": error,
+        "total_ms": total * 1000,
+        "fetch_ms": fetch * 1000,
+        "parse_ms": max(0.0, total - fetch) * 1000,
+        "requests": adapter.requests,
+        "bytes": adapter.bytes,
+        "items": _count_items(result),
+        "peak_kb": peak / 1024,
+    }
+
+
+def _stage(fn: Callable[[], Any]) -> Dict[str, Any]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"result": result, "ms": elapsed * 1000, "peak_kb": peak / 1024}
+
+
+def _normalize(articles: List[Dict[str, Any]], fmt: str) -> bytes:
+    """按规范化 URL 去重后编码为存储格式"""
+    unique = {}
+    for article in articles:
+        unique.setdefault(article_id_for_url(article.get("url", "")), article)
+    return pack_articles(list(unique.values()), fmt)
+
+
+def _fake_store() -> Optional[RedisClient]:
+    if fakeredis is None:
+        return None
+    server = fakeredis.FakeServer()
+    store = RedisClient()
+    store.client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    store.raw_client = fakeredis.FakeRedis(server=server, decode_responses=False)
+    store._incremental_script = store.client.register_script(INCREMENTAL_SAVE_SCRIPT)
+    return store
+
+
+def _median(runs: List[Dict[str, Any]], field: str) -> float:
+    return round(statistics.median(run[field] for run in runs), 3)
+
+
+def run(repeat: int = 5, fmt: str = "json", verbose: bool = False, adapter: FixtureAdapter = None) -> Dict[str, Any]:
+    """
+    运行基准测试
+
+    Args:
+        repeat: 每个数据源的重复次数（另有一次预热不计入）
+        fmt: normalize 阶段使用的存储格式
+        verbose: 是否输出爬虫日志
+        adapter: 传输适配器（默认回放 fixtures 目录）
+
+    Returns:
+        {"sources": {key: 指标}, "stages": {"normalize": ..., "store": ...}}
+    """
+    adapter = adapter or FixtureAdapter()
+    session = get_session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not adapter.record:
+        # 回放时不限流、不使用磁盘缓存，只测量本地开销
+        rate_limiter.configure(default_limit=(1e9, 1e9), host_limits={})
+        http_cache.enabled = False
+    # 重复运行时页面相同，解析结果缓存会跳过 parse 阶段
+    parse_cache.enabled = False
+
+    quiet = nullcontext() if verbose else redirect_stdout(io.StringIO())
+    report = {"sources": {}, "stages": {}}
+    articles: List[Dict[str, Any]] = []
+
+    try:
+        with quiet:
+            for source in registry.sources():
+                key = source.key
+                warmup = _measure(source.run, adapter)
+                runs = [_measure(source.run, adapter) for _ in range(repeat)] if not adapter.record else [warmup]
+                total_s = _median(runs, "total_ms") / 1000
+                report["sources"][key] = {
+                    field: _median(runs, field)
+                    for field in ("total_ms", "fetch_ms", "parse_ms", "requests", "bytes", "items", "peak_kb")
+                }
+                report["sources"][key].update({
+                    "items_per_s": round(runs[0]["items"] / total_s, 1) if total_s else 0.0,
+                    "mb_per_s": round(runs[0]["bytes"] / 1024 / 1024 / total_s, 2) if total_s else 0.0,
+                    "error": runs[-1]["error"],
+                })
+                if isinstance(runs[-1]["result"], list):
+                    articles.extend(runs[-1]["result"])
+
+            normalize = [_stage(lambda: _normalize(articles, fmt)) for _ in range(repeat)]
+            report["stages"]["normalize"] = {
+                "ms": _median(normalize, "ms"),
+                "peak_kb": _median(normalize, "peak_kb"),
+                "items": len(articles),
+                "bytes": len(normalize[-1]["result"]),
+                "format": fmt,
+            }
+
+            store = _fake_store()
+            if store is not None:
+                saves = [_stage(lambda: store.save_articles(articles)) for _ in range(repeat)]
+                report["stages"]["store"] = {
+                    "ms": _median(saves, "ms"),
+                    "peak_kb": _median(saves, "peak_kb"),
+                    "items": len(articles),
+                }
+    finally:
+        session_manager.close()
+
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"{'数据源':<12}{'总耗时':>10}{'fetch':>10}{'parse':>10}{'请求':>6}{'字节':>10}{'条目':>6}{'条/秒':>9}{'峰值内存':>10}")
+    for key, row in report["sources"].items():
+        print(
+            f"{key:<12}{row['total_ms']:>8.1f}ms{row['fetch_ms']:>8.1f}ms{row['parse_ms']:>8.1f}ms"
+            f"{row['requests']:>6.0f}{row['bytes'] / 1024:>8.0f}KB{row['items']:>6.0f}"
+            f"{row['items_per_s']:>9.0f}{row['peak_kb']:>8.0f}KB"
+            + (f"  ✗ {row['error']}" if row["error"] else "")
+        )
+    for stage, row in report["stages"].items():
+        print(f"{stage:<12}{row['ms']:>8.1f}ms{'':>20}{'':>6}{'':>10}{row['items']:>6}{'':>9}{row['peak_kb']:>8.0f}KB")
+    if "store" not in report["stages"]:
+        print("（未安装 fakeredis，跳过 store 阶段）")
+
+
+def _metrics(report: Dict[str, Any]) -> Dict[str, float]:
+    """展开为可比较的指标: {"github.parse_ms": 1.2, "store.ms": 3.4, ...}"""
+    metrics = {}
+    for key, row in report["sources"].items():
+        for field in ("total_ms", "parse_ms", "peak_kb"):
+            metrics[f"{key}.{field}"] = row[field]
+    for stage, row in report["stages"].items():
+        metrics[f"{stage}.ms"] = row["ms"]
+        metrics[f"{stage}.peak_kb"] = row["peak_kb"]
+    return metrics
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """返回超过基线 threshold 比例（且超过噪声下限）的指标说明"""
+    current, previous = _metrics(report), _metrics(baseline)
+    regressions = []
+    for name, value in current.items():
+        old = previous.get(name)
+        if old is None:
+            continue
+        floor = NOISE_FLOOR_KB if name.endswith("_kb") else NOISE_FLOOR_MS
+        if value > old * (1 + threshold) and value - old > floor:
+            regressions.append(f"{name}: {old:.1f} -> {value:.1f} (+{(value / old - 1) * 100 if old else 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="爬虫离线基准测试")
+    parser.add_argument("--repeat", type=int, default=5, help="每个数据源的重复次数")
+    parser.add_argument("--format", default="json", help="normalize 阶段的存储格式")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURE_DIR, help="录制文件目录")
+    parser.add_argument("--record", action="store_true", help="访问真实站点并录制响应")
+    parser.add_argument("--output", type=Path, help="将结果写入 JSON 文件")
+    parser.add_argument("--save-baseline", type=Path, help="将结果保存为基线")
+    parser.add_argument("--baseline", type=Path, help="与基线比较")
+    parser.add_argument("--threshold", type=float, default=0.25, help="判定退化的增幅比例")
+    parser.add_argument("--verbose", action="store_true", help="输出爬虫日志")
+    args = parser.parse_args()
+
+    adapter = FixtureAdapter(args.fixtures, record=args.record)
+    report = run(args.repeat, args.format, args.verbose, adapter)
+    print_report(report)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+            print(f"[Bench] 结果已写入 {path}")
+
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.threshold)
+        if regressions:
+            print(f"\n✗ 相比基线退化 {len(regressions)} 项:")
+            for line in regressions:
+                print(f"  - {line}")
+            raise SystemExit(1)
+        print("\n✓ 未发现相比基线的退化")
+
+
+if __name__ == "__main__":
+    main()
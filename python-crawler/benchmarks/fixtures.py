@@ -0,0 +1,213 @@
+"""
+基准测试用的固定响应
+优先读取 fixtures 目录中录制的真实响应，不存在时生成结构相同的合成响应
+（HTML 页面、掘金/HN/足球 JSON、arXiv Atom）
+"""
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Dict
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+
+_WORDS = (
+    "agent model vision language open source fast local llm inference dataset "
+    "framework training retrieval chat code search image video audio tool"
+).split()
+
+
+def _words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n))
+
+
+def _noise(rng: random.Random, blocks: int) -> str:
+    """页面中与目标无关的部分：导航、内联脚本、SVG 图标"""
+    parts = []
+    for i in range(blocks):
+        parts.append(f'<nav class="menu-{i}"><ul>' + "".join(
+            f'<li><a href="/nav/{i}/{j}">{_words(rng, 2)}</a></li>' for j in range(10)
+        ) + "</ul></nav>")
+        parts.append(f"<script>window.__DATA_{i}__ = {{\"k\": \"{_words(rng, 40)}\"}};</script>")
+        parts.append('<svg viewBox="0 0 16 16"><path d="' + " ".join(
+            f"M{rng.randint(0, 99)} {rng.randint(0, 99)}" for _ in range(40)
+        ) + '"></path></svg>')
+    return "".join(parts)
+
+
+def _page(body: str, rng: random.Random) -> str:
+    return (
+        "<!DOCTYPE html><html><head><title>fixture</title>"
+        f"<style>{_words(rng, 200)}</style></head><body>"
+        f"{_noise(rng, 20)}<main>{body}</main>{_noise(rng, 20)}</body></html>"
+    )
+
+
+def github_trending(rng: random.Random, rows: int = 25) -> str:
+    items = []
+    for i in range(rows):
+        items.append(
+            '<article class="Box-row">'
+            f'<h2 class="h3 lh-condensed"><a href="/owner{i}/repo{i}">\n  owner{i} /\n\n  repo{i}\n</a></h2>'
+            f'<p class="col-9 color-fg-muted my-1 pr-4">\n  {_words(rng, 15)}\n</p>'
+            f'<div class="f6 color-fg-muted mt-2">{_noise(rng, 1)}'
+            f'<span class="d-inline-block float-sm-right">\n  {rng.randint(10, 5000):,} stars today\n</span></div>'
+            "</article>"
+        )
+    return _page("".join(items), rng)
+
+
+def huggingface(rng: random.Random, cards: int = 60) -> str:
+    items = []
+    for i in range(cards):
+        items.append(
+            '<article class="paper-card flex flex-col">'
+            f'<a href="/papers/2401.{i:05d}"><img src="/thumb/{i}.png"/></a>'
+            f'<h3><a href="/papers/2401.{i:05d}">{_words(rng, 8).title()}</a></h3>'
+            f'<p class="truncate">{_words(rng, 40)}</p>'
+            '<time datetime="2099-01-01T00:00:00.000Z">Jan 1</time>'
+            f"{_noise(rng, 1)}</article>"
+        )
+    return _page("".join(items), rng)
+
+
+def futurepedia(rng: random.Random, cards: int = 300) -> str:
+    items = []
+    for i in range(cards):
+        items.append(
+            '<div class="rounded-xl tool-card shadow">'
+            f'<h3 class="tool-title">{_words(rng, 2).title()} {i}</h3>'
+            f'<p class="tool-description">{_words(rng, 25)}</p>'
+            f'<a href="/tool/tool-{i}">Visit</a>'
+            f"{_noise(rng, 1)}</div>"
+        )
+    return _page("".join(items), rng)
+
+
+def toolify(rng: random.Random, rows: int = 300) -> str:
+    items = []
+    for i in range(rows):
+        items.append(
+            f'<tr><td>{i + 1}</td><td><a href="/ai-tool/tool-{i}">{_words(rng, 2).title()} {i}</a></td>'
+            f"<td>{rng.randint(1, 999)}M</td><td>{_words(rng, 10)}</td></tr>"
+        )
+    return _page("<table>" + "".join(items) + "</table>", rng)
+
+
+def github_ai_topics(rng: random.Random, rows: int = 30) -> str:
+    items = []
+    for i in range(rows):
+        items.append(
+            '<article class="border rounded color-shadow-small">'
+            f'<h3 class="f3"><a href="/owner{i}">owner{i}</a> / <a href="/owner{i}/ai-{i}">ai-{i}</a></h3>'
+            f'<div class="px-3 pt-3"><p class="color-fg-muted mb-0">{_words(rng, 20)}</p></div>'
+            f"{_noise(rng, 1)}</article>"
+        )
+    return _page("".join(items), rng)
+
+
+def juejin_feed(rng: random.Random, items: int = 20) -> str:
+    data = []
+    for i in range(items):
+        data.append({
+            # 混入少量非文章条目（如广告）
+            "item_type": 14 if i % 7 == 6 else 2,
+            "item_info": {
+                "article_info": {
+                    "article_id": str(7300000000000000000 + i),
+                    "title": _words(rng, 6),
+                    "brief_content": _words(rng, 40),
+                    "view_count": rng.randint(100, 50000),
+                    "digg_count": rng.randint(0, 2000),
+                },
+                "author_user_info": {"user_name": f"user{i}"},
+            },
+        })
+    return json.dumps({"err_no": 0, "err_msg": "success", "data": data, "cursor": "1", "has_more": True})
+
+
+def hn_topstories(rng: random.Random, count: int = 500) -> str:
+    return json.dumps([40000000 + i for i in range(count)])
+
+
+def hn_item(rng: random.Random, item_id: int) -> str:
+    # 每 5 条中有 1 条是招聘帖，会被爬虫过滤
+    item = {
+        "id": item_id,
+        "type": "job" if item_id % 5 == 4 else "story",
+        "by": f"user{item_id % 97}",
+        "title": _words(rng, 7),
+        "url": f"https://example.com/{item_id}",
+        "score": rng.randint(1, 900),
+        "descendants": rng.randint(0, 400),
+        "time": 1700000000 + item_id,
+    }
+    return json.dumps(item)
+
+
+def arxiv_feed(rng: random.Random, start: int = 0, max_results: int = 10) -> str:
+    now = datetime.now(timezone.utc)
+    entries = []
+    for i in range(start, start + max_results):
+        published = (now - timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        authors = "".join(f"<author><name>Author {i}-{j}</name></author>" for j in range(4))
+        entries.append(
+            "<entry>"
+            f"<id>http://arxiv.org/abs/2401.{i:05d}v1</id>"
+            f"<updated>{published}</updated><published>{published}</published>"
+            f"<title>{_words(rng, 9).title()}\n  {_words(rng, 3)}</title>"
+            f"<summary>  {_words(rng, 150)}\n</summary>"
+            f"{authors}"
+            f'<link href="http://arxiv.org/abs/2401.{i:05d}v1" rel="alternate" type="text/html"/>'
+            '<category term="cs.AI" scheme="http://arxiv.org/schemas/atom"/>'
+            "</entry>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<feed xmlns="http://www.w3.org/2005/Atom">'
+        f"<title>arXiv Query</title><id>http://arxiv.org/api/fixture</id>{''.join(entries)}</feed>"
+    )
+
+
+def football_standings(rng: random.Random, teams: int = 20) -> str:
+    table = [{
+        "position": i + 1,
+        "team": {"id": i, "name": f"Team {i} FC", "shortName": f"Team {i}"},
+        "playedGames": 20,
+        "won": 20 - i, "draw": i % 4, "lost": i,
+        "points": 60 - 2 * i,
+        "goalDifference": 30 - 3 * i,
+    } for i in range(teams)]
+    return json.dumps({
+        "season": {"currentMatchday": 20},
+        "standings": [{"type": "TOTAL", "table": table}, {"type": "HOME", "table": table}],
+    })
+
+
+def football_matches(rng: random.Random, matches: int = 10) -> str:
+    now = datetime.now(timezone.utc)
+    items = [{
+        "utcDate": (now - timedelta(hours=12 * i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "status": "FINISHED" if i > 1 else "SCHEDULED",
+        "homeTeam": {"name": f"Team {2 * i} FC", "shortName": f"Team {2 * i}"},
+        "awayTeam": {"name": f"Team {2 * i + 1} FC", "shortName": f"Team {2 * i + 1}"},
+        "score": {"fullTime": {"home": rng.randint(0, 4), "away": rng.randint(0, 4)} if i > 1 else {}},
+    } for i in range(matches)]
+    return json.dumps({"matches": items})
+
+
+GENERATORS: Dict[str, Callable[[random.Random], str]] = {
+    "github": github_trending,
+    "huggingface": huggingface,
+    "futurepedia": futurepedia,
+    "toolify": toolify,
+    "github-ai": github_ai_topics,
+}
+
+
+def load_fixture(source: str, fixture_dir: Path = FIXTURE_DIR, seed: int = 0) -> str:
+    """读取保存的页面，不存在时生成合成页面（相同 seed 生成的页面完全一致）"""
+    path = fixture_dir / f"{source}.html"
+    if path.exists():
+        return path.read_text(encoding="utf-8")
+    return GENERATORS[source](random.Random(seed))
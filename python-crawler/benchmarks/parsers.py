@@ -0,0 +1,129 @@
+"""
+HTML 解析后端基准测试
+对每个数据源分别用 BeautifulSoup 和 lxml 后端解析同一份固定页面，
+比较耗时并校验两者提取结果（标题、链接）是否一致
+
+Usage:
+    python -m benchmarks.parsers                # 使用合成页面
+    python -m benchmarks.parsers --save         # 先抓取并保存真实页面（需要网络）
+    python -m benchmarks.parsers --repeat 50 --source futurepedia
+"""
+import io
+import time
+import argparse
+import statistics
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.fixtures import FIXTURE_DIR, GENERATORS, load_fixture
+from crawlers import github_crawler, ai_papers_crawler, producthunt_crawler
+from crawlers.utils import safe_request
+
+# 数据源 -> (页面 URL, bs4 解析函数, lxml 解析函数, 额外参数)
+PARSERS: Dict[str, Tuple[str, Callable, Callable, tuple]] = {
+    "github": (
+        github_crawler.TRENDING_URL,
+        github_crawler._parse_trending_bs4,
+        github_crawler._parse_trending_lxml,
+        (8,),
+    ),
+    "huggingface": (
+        ai_papers_crawler.HF_PAPERS_URL,
+        ai_papers_crawler._parse_hf_papers_bs4,
+        ai_papers_crawler._parse_hf_papers_lxml,
+        (5, 10),
+    ),
+    "futurepedia": (
+        producthunt_crawler.FUTUREPEDIA_URL,
+        producthunt_crawler._parse_futurepedia_bs4,
+        producthunt_crawler._parse_futurepedia_lxml,
+        (5,),
+    ),
+    "toolify": (
+        producthunt_crawler.TOOLIFY_URL,
+        producthunt_crawler._parse_toolify_bs4,
+        producthunt_crawler._parse_toolify_lxml,
+        (5,),
+    ),
+    "github-ai": (
+        producthunt_crawler.GITHUB_AI_TOPICS_URL,
+        producthunt_crawler._parse_github_ai_topics_bs4,
+        producthunt_crawler._parse_github_ai_topics_lxml,
+        (3,),
+    ),
+}
+
+
+def _time_parse(parse: Callable, html: str, args: tuple, repeat: int) -> Tuple[float, List[dict]]:
+    """返回 (耗时中位数毫秒, 最后一次的解析结果)"""
+    timings = []
+    result = []
+    with redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = parse(html, *args)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), result
+
+
+def _key(articles: List[dict]) -> List[Tuple[str, str]]:
+    return [(a["title"], a["url"]) for a in articles]
+
+
+def save_fixtures(sources: List[str], fixture_dir: Path = FIXTURE_DIR):
+    """抓取真实页面保存为固定页面"""
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+    for source in sources:
+        url = PARSERS[source][0]
+        try:
+            html = safe_request(url, timeout=30).text
+        except Exception as e:
+            print(f"[Bench] 保存 {source} 失败: {e}")
+            continue
+        (fixture_dir / f"{source}.html").write_text(html, encoding="utf-8")
+        print(f"[Bench] 已保存 {source} ({len(html) / 1024:.0f} KB)")
+
+
+def run(sources: List[str], repeat: int, fixture_dir: Path = FIXTURE_DIR) -> List[Dict]:
+    rows = []
+    print(f"{'数据源':<12}{'页面':>9}{'bs4':>11}{'lxml':>11}{'加速':>8}  结果")
+    for source in sources:
+        _, parse_bs4, parse_lxml, args = PARSERS[source]
+        html = load_fixture(source, fixture_dir)
+        bs4_ms, bs4_result = _time_parse(parse_bs4, html, args, repeat)
+        lxml_ms, lxml_result = _time_parse(parse_lxml, html, args, repeat)
+        same = _key(bs4_result) == _key(lxml_result)
+        rows.append({
+            "source": source,
+            "size_kb": len(html) / 1024,
+            "bs4_ms": bs4_ms,
+            "lxml_ms": lxml_ms,
+            "speedup": bs4_ms / lxml_ms if lxml_ms else 0.0,
+            "same": same,
+        })
+        print(
+            f"{source:<12}{len(html) / 1024:>7.0f}KB{bs4_ms:>9.2f}ms{lxml_ms:>9.2f}ms"
+            f"{bs4_ms / lxml_ms:>7.1f}x  {'一致' if same else '不一致'} ({len(lxml_result)} 条)"
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML 解析后端基准测试")
+    parser.add_argument("--source", choices=list(PARSERS), action="append", help="只测试指定数据源（可多次指定）")
+    parser.add_argument("--repeat", type=int, default=20, help="每个后端重复解析次数")
+    parser.add_argument("--fixtures", type=Path, default=FIXTURE_DIR, help="固定页面目录")
+    parser.add_argument("--save", action="store_true", help="先抓取真实页面保存到固定页面目录")
+    args = parser.parse_args()
+
+    sources = args.source or list(GENERATORS)
+    if args.save:
+        save_fixtures(sources, args.fixtures)
+    rows = run(sources, args.repeat, args.fixtures)
+    if not all(row["same"] for row in rows):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+固定响应传输层
+挂载到共享 requests 会话上，按 URL 路由返回录制的响应（fixtures 目录中的文件），
+没有录制文件时返回合成响应；录制模式下转发真实请求并保存响应体
+"""
+import re
+import time
+import random
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from benchmarks import fixtures
+from benchmarks.fixtures import FIXTURE_DIR
+
+# 路由: (方法, URL 正则, 生成 (录制文件名, 合成函数) 的函数, Content-Type)
+Route = Tuple[str, "re.Pattern", Callable[[re.Match, Dict[str, str]], Tuple[str, Callable[[random.Random], str]]], str]
+
+ROUTES: List[Route] = [
+    ("GET", re.compile(r"https://github\.com/trending$"),
+     lambda m, q: ("github.html", fixtures.github_trending), "text/html; charset=utf-8"),
+    ("GET", re.compile(r"https://github\.com/topics/ai$"),
+     lambda m, q: ("github-ai.html", fixtures.github_ai_topics), "text/html; charset=utf-8"),
+    ("GET", re.compile(r"https://huggingface\.co/papers$"),
+     lambda m, q: ("huggingface.html", fixtures.huggingface), "text/html; charset=utf-8"),
+    ("GET", re.compile(r"https://www\.futurepedia\.io/ai-tools$"),
+     lambda m, q: ("futurepedia.html", fixtures.futurepedia), "text/html; charset=utf-8"),
+    ("GET", re.compile(r"https://www\.toolify\.ai/Best-AI-Tools-list$"),
+     lambda m, q: ("toolify.html", fixtures.toolify), "text/html; charset=utf-8"),
+    ("POST", re.compile(r"https://api\.juejin\.cn/recommend_api/v1/article/recommend_all_feed$"),
+     lambda m, q: ("juejin.json", fixtures.juejin_feed), "application/json"),
+    ("GET", re.compile(r"https://hacker-news\.firebaseio\.com/v0/topstories\.json$"),
+     lambda m, q: ("hn_topstories.json", fixtures.hn_topstories), "application/json"),
+    ("GET", re.compile(r"https://hacker-news\.firebaseio\.com/v0/item/(\d+)\.json$"),
+     lambda m, q: (f"hn_items/{m.group(1)}.json", lambda rng: fixtures.hn_item(rng, int(m.group(1)))),
+     "application/json"),
+    ("GET", re.compile(r"https?://export\.arxiv\.org/api/query$"),
+     lambda m, q: (
+         f"arxiv_{q.get('start', '0')}_{q.get('max_results', '10')}.xml",
+         lambda rng: fixtures.arxiv_feed(rng, int(q.get("start", 0)), int(q.get("max_results", 10)))
+     ), "application/atom+xml; charset=utf-8"),
+    ("GET", re.compile(r"https://api\.football-data\.org/v4/competitions/PL/standings$"),
+     lambda m, q: ("football_standings.json", fixtures.football_standings), "application/json"),
+    ("GET", re.compile(r"https://api\.football-data\.org/v4/competitions/PL/matches$"),
+     lambda m, q: ("football_matches.json", fixtures.football_matches), "application/json"),
+]
+
+
+def resolve(method: str, url: str) -> Optional[Tuple[str, Callable[[random.Random], str], str]]:
+    """返回 URL 对应的 (录制文件名, 合成函数, Content-Type)，没有匹配的路由时返回 None"""
+    parts = urlsplit(url)
+    base = f"{parts.scheme}://{parts.netloc}{parts.path}"
+    query = dict(parse_qsl(parts.query))
+    for route_method, pattern, build, content_type in ROUTES:
+        if route_method != method.upper():
+            continue
+        match = pattern.match(base)
+        if match:
+            name, generate = build(match, query)
+            return name, generate, content_type
+    return None
+
+
+class FixtureAdapter(BaseAdapter):
+    """
+    requests 传输适配器：不访问网络，直接返回固定响应
+    同一 URL 的响应体在首次使用后缓存在内存中，重复运行时只计入分发开销
+
+    Usage:
+        adapter = FixtureAdapter()
+        get_session().mount("https://", adapter)
+    """
+
+    def __init__(self, fixture_dir: Path = FIXTURE_DIR, record: bool = False, seed: int = 0):
+        """
+        Args:
+            fixture_dir: 录制文件目录
+            record: 录制模式：转发真实请求并把响应体保存为录制文件
+            seed: 合成响应的随机种子
+        """
+        super().__init__()
+        self.fixture_dir = Path(fixture_dir)
+        self.record = record
+        self.seed = seed
+        self._bodies: Dict[str, bytes] = {}
+        self._real = HTTPAdapter() if record else None
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.requests = 0
+            self.bytes = 0
+            self.fetch_seconds = 0.0
+
+    def _body(self, name: str, generate: Callable[[random.Random], str]) -> bytes:
+        body = self._bodies.get(name)
+        if body is None:
+            path = self.fixture_dir / name
+            if path.exists():
+                body = path.read_bytes()
+            else:
+                body = generate(random.Random(f"{self.seed}:{name}")).encode("utf-8")
+            self._bodies[name] = body
+        return body
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        start = time.perf_counter()
+        route = resolve(request.method, request.url)
+
+        if self.record and route is not None:
+            response = self._real.send(request, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+            if response.status_code == 200:
+                path = self.fixture_dir / route[0]
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(response.content)
+        else:
+            response = requests.Response()
+            response.request = request
+            response.url = request.url
+            if route is None:
+                response.status_code = 404
+                response._content = b""
+                response.headers = CaseInsensitiveDict()
+            else:
+                name, generate, content_type = route
+                response.status_code = 200
+                response._content = self._body(name, generate)
+                response.headers = CaseInsensitiveDict({"Content-Type": content_type})
+                response.encoding = "utf-8"
+
+        with self._lock:
+            self.requests += 1
+            self.bytes += len(response.content or b"")
+            self.fetch_seconds += time.perf_counter() - start
+        return response
+
+    def close(self):
+        if self._real is not None:
+            self._real.close()
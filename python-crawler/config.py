@@ -24,9 +24,193 @@ REDIS_PASSWORD = os.getenv("REDIS_PASSWORD") or None
 # 足球 API 配置
 FOOTBALL_API_KEY = os.getenv("FOOTBALL_API_KEY", "")
 
-# 爬虫配置 (多抓取，Java端筛选)
+# 单独运行爬虫时的默认条数（main.py 中的配额由各数据源注册时声明）
 GITHUB_TRENDING_COUNT = 8
 JUEJIN_HOT_COUNT = 8
 
+# 并发爬取配置
+# CRAWL_MODE: sequential（逐个爬取）、concurrent（线程池并发爬取）或 async（单事件循环异步爬取）
+CRAWL_MODE = os.getenv("CRAWL_MODE", "sequential")
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", "4"))
+# 单个数据源的超时（秒），从该源开始执行时计时
+CRAWL_SOURCE_TIMEOUT = float(os.getenv("CRAWL_SOURCE_TIMEOUT", "120"))
+# 整轮爬取的总超时（秒）
+CRAWL_GLOBAL_TIMEOUT = float(os.getenv("CRAWL_GLOBAL_TIMEOUT", "300"))
+# 只保留最近多少天内的论文/工具
+CRAWL_DAYS_LIMIT = int(os.getenv("CRAWL_DAYS_LIMIT", "10"))
+
+# 数据源注册：导入这些模块时各自注册数据源（见 crawlers/registry.py）
+CRAWL_SOURCE_MODULES = [
+    "crawlers.producthunt_crawler",
+    "crawlers.ai_papers_crawler",
+    "crawlers.github_crawler",
+    "crawlers.juejin_crawler",
+    "crawlers.hackernews_crawler",
+    "crawlers.football_crawler",
+]
+# 停用的数据源，如 CRAWL_SOURCES_DISABLED="football,juejin"
+CRAWL_SOURCES_DISABLED = {
+    key.strip() for key in os.getenv("CRAWL_SOURCES_DISABLED", "").split(",") if key.strip()
+}
+# 按数据源覆盖配额，如 CRAWL_SOURCE_QUOTAS="github=6,hackernews=5"
+CRAWL_SOURCE_QUOTAS = {
+    key.strip(): int(value)
+    for key, value in (
+        item.split("=", 1) for item in os.getenv("CRAWL_SOURCE_QUOTAS", "").split(",") if "=" in item
+    )
+}
+# 按数据源覆盖守护进程模式下的爬取间隔（秒），如 CRAWL_SOURCE_INTERVALS="hackernews=300"
+CRAWL_SOURCE_INTERVALS = {
+    key.strip(): float(value)
+    for key, value in (
+        item.split("=", 1) for item in os.getenv("CRAWL_SOURCE_INTERVALS", "").split(",") if "=" in item
+    )
+}
+# 守护进程模式：间隔随机抖动比例、启动时各数据源错开的最大秒数、退出时等待进行中爬取的秒数
+CRAWL_DAEMON_JITTER = float(os.getenv("CRAWL_DAEMON_JITTER", "0.1"))
+CRAWL_DAEMON_STAGGER = float(os.getenv("CRAWL_DAEMON_STAGGER", "10"))
+CRAWL_DAEMON_SHUTDOWN_TIMEOUT = float(os.getenv("CRAWL_DAEMON_SHUTDOWN_TIMEOUT", "30"))
+# 比赛日足球数据的爬取间隔（秒）
+FOOTBALL_MATCHDAY_INTERVAL = float(os.getenv("FOOTBALL_MATCHDAY_INTERVAL", "300"))
+# 足球 API 缓存新鲜期（秒）：有比赛进行中时按 LIVE 轮询，否则比赛列表缓存到下一场开球（最长 IDLE）
+FOOTBALL_TTL_LIVE = int(os.getenv("FOOTBALL_TTL_LIVE", "60"))
+FOOTBALL_TTL_IDLE = int(os.getenv("FOOTBALL_TTL_IDLE", str(6 * 3600)))
+# 积分榜只在有比赛结束后刷新，无比赛结束时最长缓存时间（秒）
+FOOTBALL_STANDINGS_MAX_AGE = int(os.getenv("FOOTBALL_STANDINGS_MAX_AGE", str(24 * 3600)))
+# 并发/异步模式下各并发类别同时运行的数据源上限
+# scrape: 抓取并解析 HTML 页面（解析占用 CPU）; api: 调用 JSON API
+CRAWL_CONCURRENCY_LIMITS = {
+    "scrape": int(os.getenv("CRAWL_SCRAPE_CONCURRENCY", "2")),
+    "api": int(os.getenv("CRAWL_API_CONCURRENCY", "4")),
+}
+
+# 分布式爬取队列 (main.py --coordinator / --worker)
+# 任务可见性超时（秒）：领取后超过该时间未确认且未续期的任务重新入队
+WORK_QUEUE_VISIBILITY_TIMEOUT = float(os.getenv("WORK_QUEUE_VISIBILITY_TIMEOUT", "60"))
+# 单个任务最多尝试次数，超过后移入死信队列
+WORK_QUEUE_MAX_ATTEMPTS = int(os.getenv("WORK_QUEUE_MAX_ATTEMPTS", "3"))
+# worker 空闲时的轮询间隔（秒）
+WORK_QUEUE_POLL_INTERVAL = float(os.getenv("WORK_QUEUE_POLL_INTERVAL", "1"))
+# 任务、结果和死信在 Redis 中的保留时间（秒）
+WORK_QUEUE_TTL = int(os.getenv("WORK_QUEUE_TTL", "86400"))
+# Hacker News 每个子任务包含的故事数
+WORK_QUEUE_HN_CHUNK = int(os.getenv("WORK_QUEUE_HN_CHUNK", "10"))
+
+# HTTP 连接池配置 (所有同步爬虫共享)
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "16"))  # 缓存的主机连接池数量
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))  # 每个主机的最大连接数
+HTTP_POOL_BLOCK = os.getenv("HTTP_POOL_BLOCK", "true").lower() == "true"  # 连接数达到上限时等待而不是新建
+# 建立连接失败时由 urllib3 执行的重试次数，默认 0：重试统一交给请求级重试（RETRY_MAX_RETRIES）。
+# 两层重试相乘，设为 N 时连接失败的请求最多尝试 (1 + N) × (1 + RETRY_MAX_RETRIES) 次
+HTTP_TRANSPORT_RETRIES = int(os.getenv("HTTP_TRANSPORT_RETRIES", "0"))
+
+# HTTP 响应缓存配置 (ETag/Last-Modified 条件请求)
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "true").lower() == "true"
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", str(Path(__file__).parent / ".http_cache"))
+# 缓存新鲜期（秒）：新鲜期内直接使用缓存，过期后发送条件请求重新验证
+HTTP_CACHE_DEFAULT_TTL = int(os.getenv("HTTP_CACHE_DEFAULT_TTL", "0"))
+HTTP_CACHE_TTLS = {
+    "github": 600,
+    "huggingface": 900,
+    "arxiv": 900,
+    "futurepedia": 3600,
+    "toolify": 3600,
+    "github-ai": 900,
+}
+# 超过该时长（秒）未更新的缓存条目会被清理
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", str(7 * 86400)))
+
+# 请求级重试：仅重试超时、连接失败和 429/5xx，等待时间优先取 Retry-After
+RETRY_MAX_RETRIES = int(os.getenv("RETRY_MAX_RETRIES", "2"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1.0"))
+# 单次等待上限（秒），Retry-After 超过该值时直接放弃
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "10"))
+# 每轮爬取所有请求重试等待时间之和的上限（秒）
+RETRY_BUDGET_SECONDS = float(os.getenv("RETRY_BUDGET_SECONDS", "30"))
+
+# 按主机限流配置: (每秒请求数, 突发容量)，同一主机的所有请求共享一个令牌桶
+RATE_LIMIT_DEFAULT = (2.0, 4)
+RATE_LIMITS = {
+    "hacker-news.firebaseio.com": (20.0, 20),
+    "api.juejin.cn": (2.0, 2),
+    "github.com": (1.0, 3),
+    "huggingface.co": (2.0, 2),
+    "export.arxiv.org": (1 / 3, 1),  # arXiv API 要求每 3 秒不超过 1 次
+    "www.futurepedia.io": (1.0, 2),
+    "www.toolify.ai": (1.0, 2),
+    "api.football-data.org": (10 / 60, 2),  # 免费版每分钟 10 次
+}
+# 收到 429/503 时自动降速，成功后逐步恢复
+RATE_LIMIT_ADAPTIVE = os.getenv("RATE_LIMIT_ADAPTIVE", "true").lower() == "true"
+
+# HTML 解析后端: lxml（流式 XPath 定向提取）或 bs4（BeautifulSoup）
+HTML_PARSER = os.getenv("HTML_PARSER", "lxml")
+# 按数据源覆盖解析后端，如 HTML_PARSER_OVERRIDES="futurepedia=bs4,github=lxml"
+HTML_PARSERS = dict(
+    item.strip().split("=", 1)
+    for item in os.getenv("HTML_PARSER_OVERRIDES", "").split(",")
+    if "=" in item
+)
+# 解析结果缓存：响应体与之前相同时直接复用提取出的文章，跳过解析（按条目数和总字节数做 LRU 淘汰）
+PARSE_CACHE_ENABLED = os.getenv("PARSE_CACHE_ENABLED", "true").lower() == "true"
+PARSE_CACHE_DIR = os.getenv("PARSE_CACHE_DIR", str(Path(__file__).parent / ".parse_cache"))
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "64"))
+PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(2 * 1024 * 1024)))
+
+# arXiv 查询与分页：每页条数上限、单次爬取最多翻阅的条目数
+ARXIV_QUERY = os.getenv("ARXIV_QUERY", "cat:cs.AI OR cat:cs.LG OR cat:cs.CL")
+ARXIV_PAGE_SIZE = int(os.getenv("ARXIV_PAGE_SIZE", "100"))
+ARXIV_MAX_RESULTS = int(os.getenv("ARXIV_MAX_RESULTS", "1000"))
+
+# AI 工具回退站点 (Futurepedia > Toolify > GitHub AI) 的调度方式:
+# sequential（前一个站点结束且数量不足才尝试下一个）或 hedged（对冲并发，凑够数量即取消其余请求）
+AI_TOOLS_FANOUT = os.getenv("AI_TOOLS_FANOUT", "hedged")
+# hedged 模式下，前一个站点开始后经过多少秒仍未凑够数量即启动下一个站点
+AI_TOOLS_HEDGE_DELAY = float(os.getenv("AI_TOOLS_HEDGE_DELAY", "3"))
+
+# Hacker News 故事详情并发请求数
+HN_ITEM_CONCURRENCY = int(os.getenv("HN_ITEM_CONCURRENCY", "8"))
+
+# 异步引擎配置 (CRAWL_MODE=async 时使用)
+ASYNC_HTTP_LIMIT = int(os.getenv("ASYNC_HTTP_LIMIT", "100"))  # 全局最大连接数
+ASYNC_HTTP_LIMIT_PER_HOST = int(os.getenv("ASYNC_HTTP_LIMIT_PER_HOST", "10"))  # 单主机最大连接数
+
+# 文章存储模式: replace（每次整体替换今天的列表）或 incremental（按 URL 去重增量写入）
+REDIS_STORAGE_MODE = os.getenv("REDIS_STORAGE_MODE", "replace")
+
+# 文章历史库配置 (多日保留，供周报等范围查询使用)
+HISTORY_ENABLED = os.getenv("HISTORY_ENABLED", "true").lower() == "true"
+HISTORY_RETENTION_DAYS = int(os.getenv("HISTORY_RETENTION_DAYS", "30"))
+# 每次压缩时检查的索引成员数（按游标分批清理已过期的成员，不随历史库大小增长）
+HISTORY_SWEEP_BATCH = int(os.getenv("HISTORY_SWEEP_BATCH", "200"))
+
+# 深度爬取 (main.py --deep DAYS)：翻页回溯 DAYS 天内的内容写入历史库，供周报与回填使用
+DEEP_CRAWL_LIMIT = int(os.getenv("DEEP_CRAWL_LIMIT", "500"))  # 每个数据源最多收集的条目数
+DEEP_CRAWL_PREFETCH = int(os.getenv("DEEP_CRAWL_PREFETCH", "3"))  # 同时预取的页数（仍受按主机限流约束）
+DEEP_CRAWL_CHECKPOINT_TTL = int(os.getenv("DEEP_CRAWL_CHECKPOINT_TTL", str(7 * 86400)))  # 断点保留时间（秒）
+
+# 跨数据源近似重复检测（写入 Redis 之前合并同一资讯的多个副本）
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "true").lower() == "true"
+# SimHash 汉明距离不超过该值视为近似重复（标题相同、描述不同的副本距离通常在 6 以内）
+DEDUP_SIMHASH_DISTANCE = int(os.getenv("DEDUP_SIMHASH_DISTANCE", "6"))
+# 标题 + 描述的特征数少于该值时只按链接判断
+DEDUP_MIN_TOKENS = int(os.getenv("DEDUP_MIN_TOKENS", "6"))
+DEDUP_RETENTION_DAYS = int(os.getenv("DEDUP_RETENTION_DAYS", str(HISTORY_RETENTION_DAYS)))
+
+# 文章存储格式: auto（与读取端协商）、json（Java 端默认支持），
+# 或打包格式如 compact、compact+zlib、compact+zstd、json+zlib；
+# 打包格式只在读取端通过 reader_formats 声明支持时生效，否则仍写入 json（Java 端目前只读取 json）
+REDIS_ARTICLE_FORMAT = os.getenv("REDIS_ARTICLE_FORMAT", "auto")
+# auto 模式下按此顺序选择读取端支持的第一个格式，json 始终可用
+REDIS_ARTICLE_FORMAT_PREFERENCE = ["compact+zstd", "compact+zlib", "compact", "json"]
+
+# 分页读取文章时每页条数
+ARTICLE_PAGE_SIZE = int(os.getenv("ARTICLE_PAGE_SIZE", "100"))
+
+# 运行指标：Redis 中每天保留的运行报告条数；导出文件路径（留空不导出）
+METRICS_HISTORY_SIZE = int(os.getenv("METRICS_HISTORY_SIZE", "50"))
+METRICS_JSON_PATH = os.getenv("METRICS_JSON_PATH", "")
+METRICS_PROM_PATH = os.getenv("METRICS_PROM_PATH", "")
+
 # Redis Key 前缀
 REDIS_KEY_PREFIX = "tech_briefing:articles"
@@ -2,29 +2,68 @@
 Hugging Face Daily Papers 爬虫
 获取AI前沿技术论文（AI前沿类）
 """
-import uuid
-import requests
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 from bs4 import BeautifulSoup
+from lxml import etree
 
-from crawlers.utils import retry_on_failure, safe_request, get_random_user_agent
+from config import ARXIV_QUERY, ARXIV_PAGE_SIZE, ARXIV_MAX_RESULTS, CRAWL_DAYS_LIMIT, DEEP_CRAWL_PREFETCH
+from crawlers import parsing
+from crawlers.article import Article
+from crawlers.parse_cache import parse_cache
+from crawlers.utils import safe_request, get_random_user_agent
+from crawlers.async_engine import async_request
+from crawlers.metrics import timed_parse, parse_timer
+from crawlers.registry import registry, Source
 
+HF_PAPERS_URL = "https://huggingface.co/papers"
+ARXIV_API_URL = "http://export.arxiv.org/api/query"
 
-@retry_on_failure(max_retries=3, delay=1.0)
-def crawl_huggingface_papers(count: int = 5, days_limit: int = 10) -> List[Dict[str, Any]]:
-    """
-    爬取 Hugging Face Daily Papers
-    来源：https://huggingface.co/papers
-    """
-    url = "https://huggingface.co/papers"
+
+def _build_hf_article(
+    title: str,
+    link: str,
+    description: str,
+    date_str: Optional[str],
+    cutoff_date: datetime
+) -> Optional[Article]:
+    """由卡片中提取出的字段构造文章，标题过短或已过期时返回 None"""
+    if not title or len(title) < 5:
+        return None
     
-    headers = {
-        "User-Agent": get_random_user_agent()
-    }
+    if not link.startswith("http"):
+        link = f"https://huggingface.co{link}"
+    
+    # 提取日期（如果有）
+    paper_date = None
+    if date_str:
+        try:
+            paper_date = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+    
+    # 时效性过滤（HF papers 通常都是当天的，这里主要过滤异常数据）
+    if paper_date and paper_date.replace(tzinfo=None) < cutoff_date:
+        return None
     
-    response = safe_request(url, headers=headers, timeout=30)
-    soup = BeautifulSoup(response.text, "html.parser")
+    return Article(
+        title,
+        link,
+        "huggingface",
+        description if description else "AI前沿论文",
+        extra={
+            "paper_date": paper_date.isoformat() if paper_date else None
+        },
+        ai_category="AI前沿"  # 预设分类
+    )
+
+
+def _parse_hf_papers_bs4(html: str, count: int, days_limit: int) -> List[Dict[str, Any]]:
+    """BeautifulSoup 解析"""
+    soup = BeautifulSoup(html, "html.parser")
     articles = []
     
     # 查找论文卡片
@@ -42,10 +81,7 @@ def crawl_huggingface_papers(count: int = 5, days_limit: int = 10) -> List[Dict[
         try:
             # 提取标题
             title_elem = card.select_one("h3, h4, .paper-title") or card
-            title = title_elem.get_text(strip=True) if title_elem else ""
-            
-            if not title or len(title) < 5:
-                continue
+            title = title_elem.get_text(strip=True)
             
             # 提取链接
             if card.name == "a":
@@ -54,108 +90,385 @@ def crawl_huggingface_papers(count: int = 5, days_limit: int = 10) -> List[Dict[
                 link_elem = card.select_one("a[href*='/papers/']")
                 link = link_elem.get("href", "") if link_elem else ""
             
-            if not link.startswith("http"):
-                link = f"https://huggingface.co{link}"
-            
             # 提取描述/摘要
             desc_elem = card.select_one("p, .paper-summary, .truncate")
             description = desc_elem.get_text(strip=True)[:200] if desc_elem else ""
             
-            # 提取日期（如果有）
             date_elem = card.select_one("time, .date, span[data-date]")
-            paper_date = None
-            if date_elem:
-                date_str = date_elem.get("datetime") or date_elem.get_text(strip=True)
-                try:
-                    paper_date = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
-                except:
-                    pass
+            date_str = (date_elem.get("datetime") or date_elem.get_text(strip=True)) if date_elem else None
             
-            # 时效性过滤（HF papers 通常都是当天的，这里主要过滤异常数据）
-            if paper_date and paper_date.replace(tzinfo=None) < cutoff_date:
-                continue
-            
-            article = {
-                "id": str(uuid.uuid4()),
-                "title": title,
-                "url": link,
-                "source": "huggingface",
-                "description": description if description else "AI前沿论文",
-                "extra": {
-                    "paper_date": paper_date.isoformat() if paper_date else None
-                },
-                "crawl_time": datetime.now().isoformat(),
-                "ai_category": "AI前沿"  # 预设分类
-            }
-            articles.append(article)
+            article = _build_hf_article(title, link, description, date_str, cutoff_date)
+            if article:
+                articles.append(article)
             
         except Exception as e:
             print(f"[HF Papers] 解析单条失败: {e}")
             continue
     
+    return articles
+
+
+_HF_TITLE = parsing.xpath(f".//h3 | .//h4 | .//*[{parsing.class_predicate('paper-title')}]")
+_HF_LINK = parsing.xpath(".//a[contains(@href, '/papers/')]")
+_HF_SUMMARY = parsing.xpath(
+    f".//p | .//*[{parsing.class_predicate('paper-summary')}] | .//*[{parsing.class_predicate('truncate')}]"
+)
+_HF_DATE = parsing.xpath(f".//time | .//*[{parsing.class_predicate('date')}] | .//span[@data-date]")
+
+
+def _is_hf_card(element) -> bool:
+    if element.tag == "article":
+        return parsing.has_class(element, "paper-card")
+    return element.tag == "div" and element.get("data-target") == "paper"
+
+
+def _is_hf_link(element) -> bool:
+    return element.tag == "a" and "/papers/" in (element.get("href") or "")
+
+
+def _parse_hf_papers_lxml(html: str, count: int, days_limit: int) -> List[Dict[str, Any]]:
+    """
+    lxml 流式解析，取够 count 篇或处理完 count * 2 张卡片后停止
+    页面中没有论文卡片时，与 BeautifulSoup 版本一样退回到论文链接
+    """
+    articles = []
+    cutoff_date = datetime.now() - timedelta(days=days_limit)
+    
+    def extract(card) -> Optional[Dict[str, Any]]:
+        title_elem = parsing.first(card, _HF_TITLE)
+        title = parsing.text_of(card if title_elem is None else title_elem)
+        
+        if card.tag == "a":
+            link = card.get("href", "")
+        else:
+            link_elem = parsing.first(card, _HF_LINK)
+            link = link_elem.get("href", "") if link_elem is not None else ""
+        
+        description = parsing.text_of(parsing.first(card, _HF_SUMMARY))[:200]
+        
+        date_elem = parsing.first(card, _HF_DATE)
+        date_str = (date_elem.get("datetime") or parsing.text_of(date_elem)) if date_elem is not None else None
+        
+        return _build_hf_article(title, link, description, date_str, cutoff_date)
+    
+    def collect(cards) -> List[Dict[str, Any]]:
+        for index, card in enumerate(cards):
+            if index >= count * 2 or len(articles) >= count:
+                break
+            try:
+                article = extract(card)
+                if article:
+                    articles.append(article)
+            except Exception as e:
+                print(f"[HF Papers] 解析单条失败: {e}")
+        return articles
+    
+    # 出现第一张卡片之前遇到的论文链接，用作备用
+    fallback_links = []
+    
+    def cards():
+        seen_card = False
+        for element in parsing.iter_elements(
+            html, ["article", "div", "a"], lambda el: _is_hf_card(el) or _is_hf_link(el)
+        ):
+            if _is_hf_card(element):
+                seen_card = True
+                fallback_links.clear()
+                yield element
+            elif not seen_card and len(fallback_links) < count * 2:
+                fallback_links.append(element)
+    
+    collect(cards())
+    if fallback_links:
+        collect(fallback_links)
+    return articles
+
+
+@timed_parse
+def _parse_hf_papers(html: str, count: int, days_limit: int) -> List[Dict[str, Any]]:
+    """解析 Hugging Face Papers 页面 HTML（解析后端按 HTML_PARSERS 配置选择）"""
+    parse = parsing.select_parser("huggingface", lxml=_parse_hf_papers_lxml, bs4=_parse_hf_papers_bs4)
+    articles = parse(html, count, days_limit)
     print(f"[HF Papers] 成功爬取 {len(articles)} 篇AI前沿论文")
     return articles
 
 
-@retry_on_failure(max_retries=3, delay=1.0)
-def crawl_arxiv_ai(count: int = 3, days_limit: int = 10) -> List[Dict[str, Any]]:
+def crawl_huggingface_papers(count: int = 5, days_limit: int = 10) -> List[Dict[str, Any]]:
     """
-    备用：爬取 arXiv AI 论文
+    爬取 Hugging Face Daily Papers
+    来源：https://huggingface.co/papers
     """
+    headers = {
+        "User-Agent": get_random_user_agent()
+    }
+    
+    response = safe_request(HF_PAPERS_URL, headers=headers, timeout=30, cache_source="huggingface")
+    # 截止日期相对今天计算，同一页面隔天可能过滤出不同结果
+    return parse_cache.parse(
+        "huggingface", response, _parse_hf_papers, count, days_limit, vary=(date.today().isoformat(),)
+    )
+
+
+async def crawl_huggingface_papers_async(count: int = 5, days_limit: int = 10) -> List[Dict[str, Any]]:
+    """crawl_huggingface_papers 的异步版本"""
+    headers = {
+        "User-Agent": get_random_user_agent()
+    }
+    
+    response = await async_request(HF_PAPERS_URL, headers=headers, timeout=30, cache_source="huggingface")
+    # 截止日期相对今天计算，同一页面隔天可能过滤出不同结果
+    return parse_cache.parse(
+        "huggingface", response, _parse_hf_papers, count, days_limit, vary=(date.today().isoformat(),)
+    )
+
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+
+def _arxiv_params(start: int, page_size: int) -> Dict[str, Any]:
     # arXiv API for cs.AI, cs.LG, cs.CL categories
-    url = "http://export.arxiv.org/api/query"
-    params = {
-        "search_query": "cat:cs.AI OR cat:cs.LG OR cat:cs.CL",
-        "start": 0,
-        "max_results": count * 2,
+    return {
+        "search_query": ARXIV_QUERY,
+        "start": start,
+        "max_results": page_size,
         "sortBy": "submittedDate",
         "sortOrder": "descending"
     }
-    
-    response = requests.get(url, params=params, timeout=30)
-    response.raise_for_status()
-    
-    soup = BeautifulSoup(response.text, "xml")
-    entries = soup.find_all("entry")
-    articles = []
-    cutoff_date = datetime.now() - timedelta(days=days_limit)
-    
-    for entry in entries:
-        if len(articles) >= count:
-            break
-            
-        try:
-            # 解析发布日期
-            published = entry.find("published")
-            if published:
-                pub_date = datetime.fromisoformat(published.text.replace("Z", "+00:00"))
-                if pub_date.replace(tzinfo=None) < cutoff_date:
-                    continue
-            
-            title = entry.find("title").text.strip().replace("\n", " ") if entry.find("title") else ""
-            summary = entry.find("summary").text.strip()[:200] if entry.find("summary") else ""
-            link = entry.find("id").text if entry.find("id") else ""
-            
-            article = {
-                "id": str(uuid.uuid4()),
-                "title": title,
-                "url": link,
-                "source": "arxiv",
-                "description": summary,
-                "extra": {
-                    "published": published.text if published else None
-                },
-                "crawl_time": datetime.now().isoformat(),
-                "ai_category": "AI前沿"
+
+
+def _iter_arxiv_entries(content: bytes, chunk_size: int = 64 * 1024) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    流式解析 arXiv Atom 响应，逐条产出 entry 的字段
+    每条 entry 解析完即从树中移除，内存占用与响应中的条目数无关
+    """
+    parser = etree.XMLPullParser(events=("end",), tag=f"{ATOM_NS}entry")
+
+    def drain() -> Iterator[Dict[str, Optional[str]]]:
+        for _, entry in parser.read_events():
+            yield {
+                "id": entry.findtext(f"{ATOM_NS}id"),
+                "title": entry.findtext(f"{ATOM_NS}title"),
+                "summary": entry.findtext(f"{ATOM_NS}summary"),
+                "published": entry.findtext(f"{ATOM_NS}published"),
             }
-            articles.append(article)
-            
-        except Exception as e:
-            print(f"[arXiv] 解析单条失败: {e}")
-            continue
-    
-    print(f"[arXiv] 成功爬取 {len(articles)} 篇AI论文")
-    return articles
+            entry.clear()
+            parent = entry.getparent()
+            if parent is not None:
+                parent.remove(entry)
+
+    for pos in range(0, len(content), chunk_size):
+        parser.feed(content[pos:pos + chunk_size])
+        yield from drain()
+    parser.close()
+    yield from drain()
+
+
+def _build_arxiv_article(fields: Dict[str, Optional[str]]) -> Article:
+    return Article(
+        (fields["title"] or "").strip().replace("\n", " "),
+        fields["id"] or "",
+        "arxiv",
+        (fields["summary"] or "").strip()[:200],
+        extra={
+            "published": fields["published"]
+        },
+        ai_category="AI前沿"
+    )
+
+
+class ArxivPager:
+    """
+    arXiv 分页解析状态
+    结果按提交时间倒序，遇到早于截止日期的条目即可结束翻页
+
+    Usage:
+        pager = ArxivPager(count=300, days_limit=3)
+        while pager.has_next():
+            pager.feed(fetch(pager.next_params()))
+        articles = pager.articles
+    """
+
+    def __init__(
+        self,
+        count: int,
+        days_limit: int,
+        page_size: int = None,
+        max_results: int = ARXIV_MAX_RESULTS,
+        start: int = 0,
+        cutoff_date: datetime = None
+    ):
+        """
+        Args:
+            count: 需要的论文数量
+            days_limit: 只保留最近 days_limit 天提交的论文
+            page_size: 每页条数（默认 count * 2，不超过 ARXIV_PAGE_SIZE）
+            max_results: 翻阅到的条目下标上限（不含）
+            start: 起始条目下标
+            cutoff_date: 截止时间（默认为 days_limit 天前）
+        """
+        self.count = count
+        self.page_size = page_size or max(1, min(ARXIV_PAGE_SIZE, count * 2))
+        self.max_results = max_results
+        self.cutoff_date = cutoff_date or datetime.now() - timedelta(days=days_limit)
+        self.start = start
+        self.articles: List[Dict[str, Any]] = []
+        self.done = False
+        self._seen = set()
+
+    def has_next(self) -> bool:
+        return not self.done and len(self.articles) < self.count and self.start < self.max_results
+
+    def next_params(self) -> Dict[str, Any]:
+        return _arxiv_params(self.start, min(self.page_size, self.max_results - self.start))
+
+    def feed(self, content: bytes):
+        """解析一页响应"""
+        received = 0
+        with parse_timer() as timer:
+            for fields in _iter_arxiv_entries(content):
+                received += 1
+                if len(self.articles) >= self.count:
+                    self.done = True
+                    break
+                try:
+                    # 解析发布日期：按时间倒序，早于截止日期后不必再往后翻
+                    if fields["published"]:
+                        pub_date = datetime.fromisoformat(fields["published"].replace("Z", "+00:00"))
+                        if pub_date.replace(tzinfo=None) < self.cutoff_date:
+                            self.done = True
+                            break
+
+                    # 翻页期间有新论文提交时，前一页的条目可能再次出现
+                    if fields["id"] in self._seen:
+                        continue
+                    self._seen.add(fields["id"])
+                    self.articles.append(_build_arxiv_article(fields))
+                    timer["items"] += 1
+
+                except Exception as e:
+                    print(f"[arXiv] 解析单条失败: {e}")
+                    continue
+
+        # 返回条数不足一页说明已到结果末尾
+        if received < self.page_size:
+            self.done = True
+        self.start += self.page_size
+
+
+def crawl_arxiv_ai(
+    count: int = 3,
+    days_limit: int = 10,
+    page_size: int = None,
+    start: int = 0,
+    max_results: int = ARXIV_MAX_RESULTS
+) -> List[Dict[str, Any]]:
+    """
+    备用：爬取 arXiv AI 论文
+    按 start / max_results 分页，取够 count 篇或遇到截止日期之前的论文时停止
+    """
+    pager = ArxivPager(count, days_limit, page_size, max_results, start)
+    while pager.has_next():
+        response = safe_request(ARXIV_API_URL, params=pager.next_params(), timeout=30, cache_source="arxiv")
+        pager.feed(response.content)
+
+    print(f"[arXiv] 成功爬取 {len(pager.articles)} 篇AI论文")
+    return pager.articles
+
+
+async def crawl_arxiv_ai_async(
+    count: int = 3,
+    days_limit: int = 10,
+    page_size: int = None,
+    start: int = 0,
+    max_results: int = ARXIV_MAX_RESULTS
+) -> List[Dict[str, Any]]:
+    """crawl_arxiv_ai 的异步版本"""
+    pager = ArxivPager(count, days_limit, page_size, max_results, start)
+    while pager.has_next():
+        response = await async_request(ARXIV_API_URL, params=pager.next_params(), timeout=30, cache_source="arxiv")
+        pager.feed(response.content)
+
+    print(f"[arXiv] 成功爬取 {len(pager.articles)} 篇AI论文")
+    return pager.articles
+
+
+def arxiv_shards(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """分布式子任务：每页一个子任务，覆盖 count * 2 条结果（不超过 ARXIV_MAX_RESULTS）"""
+    count = params.get("count", 3)
+    page_size = params.get("page_size") or max(1, min(ARXIV_PAGE_SIZE, count * 2))
+    total = min(ARXIV_MAX_RESULTS, count * 2)
+    return [
+        {"start": start, "page_size": page_size, "max_results": start + page_size, "count": page_size}
+        for start in range(0, total, page_size)
+    ]
+
+
+def _published_timestamp(published: Optional[str]) -> Optional[float]:
+    """Atom published 字段（如 2024-01-01T00:00:00Z）转为时间戳"""
+    if not published:
+        return None
+    try:
+        return datetime.fromisoformat(published.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def arxiv_deep(state: Dict[str, Any], cutoff: float, limit: int) -> Iterator[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+    """
+    深度爬取：按 ARXIV_PAGE_SIZE 翻页直到 cutoff 之前提交的论文或收集满 limit 篇
+    同时预取 DEEP_CRAWL_PREFETCH 页（请求仍受 arXiv 主机限流约束），按顺序解析并产出断点
+    """
+    page_size = max(1, ARXIV_PAGE_SIZE)
+    start = state.get("start", 0)
+    # 多翻阅一倍的条目，容纳翻页期间新提交论文造成的重复
+    pager = ArxivPager(
+        limit, 0, page_size, max_results=start + max(limit * 2, page_size), start=start,
+        cutoff_date=datetime.fromtimestamp(cutoff)
+    )
+
+    executor = ThreadPoolExecutor(max_workers=max(1, DEEP_CRAWL_PREFETCH), thread_name_prefix="arxiv-page")
+    pending = deque()
+    next_start = pager.start
+
+    def prefetch():
+        nonlocal next_start
+        while len(pending) < max(1, DEEP_CRAWL_PREFETCH) and next_start < pager.max_results:
+            params = _arxiv_params(next_start, min(page_size, pager.max_results - next_start))
+            pending.append(executor.submit(
+                contextvars.copy_context().run, safe_request,
+                ARXIV_API_URL, params=params, timeout=30, cache_source="arxiv"
+            ))
+            next_start += page_size
+
+    try:
+        while pager.has_next():
+            prefetch()
+            response = pending.popleft().result()
+            received = len(pager.articles)
+            pager.feed(response.content)
+            articles = pager.articles[received:]
+            for article in articles:
+                article["extra"]["published_at"] = _published_timestamp(article["extra"].get("published"))
+            yield articles, {"start": pager.start}
+    finally:
+        # 已到截止日期或条目上限时，取消尚未开始的预取
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# AI前沿 - Hugging Face Papers
+registry.register(Source(
+    "huggingface", "Hugging Face AI 论文", crawl_huggingface_papers, crawl_huggingface_papers_async,
+    group="ai", priority=20, quota=5, concurrency="scrape", interval=3600,
+    params={"days_limit": CRAWL_DAYS_LIMIT},
+))
+# AI前沿 - arXiv (备用)
+registry.register(Source(
+    "arxiv", "arXiv AI 论文", crawl_arxiv_ai, crawl_arxiv_ai_async,
+    group="ai", priority=30, quota=3, concurrency="api", interval=86400,  # arXiv 每日更新一次
+    params={"days_limit": CRAWL_DAYS_LIMIT}, shards=arxiv_shards, deep=arxiv_deep,
+))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,129 @@
+"""
+文章记录
+各爬虫共用的紧凑文章类型：字段固定，使用 __slots__ 不为每篇文章分配 __dict__；
+source / ai_category 驻留后所有文章共享同一个字符串对象，同一批文章共享一个 crawl_time，
+id 在首次访问时才由规范化 URL 生成。只在写入 Redis、任务队列等 JSON 边界转换为 dict
+"""
+import sys
+import contextvars
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+from crawlers.utils import article_id_for_url
+
+# 标准字段顺序，序列化与解码时按此顺序输出
+ARTICLE_FIELDS = ("id", "title", "url", "source", "description", "extra", "crawl_time", "ai_category")
+_FIELD_SET = frozenset(ARTICLE_FIELDS)
+# 取值集合很小、在成千上万篇文章中重复出现的字段
+_INTERNED_FIELDS = frozenset(("source", "ai_category"))
+
+# 当前批次的爬取时间
+current_crawl_time: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("crawl_time", default=None)
+
+
+@contextmanager
+def crawl_batch(crawl_time: str = None) -> Iterator[str]:
+    """在此上下文中创建的文章共用同一个 crawl_time（线程池中需用 contextvars.copy_context() 提交任务）"""
+    value = crawl_time or datetime.now().isoformat()
+    token = current_crawl_time.set(value)
+    try:
+        yield value
+    finally:
+        current_crawl_time.reset(token)
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+
+class Article(MutableMapping):
+    """
+    紧凑文章记录
+
+    实现 dict 的读写接口（article["url"]、article.get(...)、dict(article)、article.items()），
+    过滤、去重与存储代码无需区分 dict 和 Article。未设置的可选字段（如 ai_category）视为不存在。
+
+    Usage:
+        with crawl_batch():
+            article = Article("Title", "https://example.com", "hackernews", extra={"score": 1})
+        json.dumps(as_dict(article))
+    """
+
+    __slots__ = ("_id", "title", "url", "source", "description", "extra", "crawl_time", "ai_category")
+
+    def __init__(
+        self,
+        title: str,
+        url: str,
+        source: str,
+        description: str = "",
+        extra: Optional[Dict[str, Any]] = None,
+        crawl_time: str = None,
+        ai_category: str = None,
+        id: str = None
+    ):
+        self._id = id
+        self.title = title
+        self.url = url
+        self.source = _intern(source)
+        self.description = description
+        if extra is not None:
+            self.extra = extra
+        # 批次外创建时（如单独运行爬虫脚本）退化为逐篇取当前时间
+        self.crawl_time = crawl_time or current_crawl_time.get() or datetime.now().isoformat()
+        if ai_category is not None:
+            self.ai_category = _intern(ai_category)
+
+    @property
+    def id(self) -> str:
+        """稳定 ID（由规范化 URL 生成，与增量写入使用的 ID 一致）"""
+        if self._id is None:
+            self._id = article_id_for_url(self.url)
+        return self._id
+
+    @id.setter
+    def id(self, value: str):
+        self._id = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in _FIELD_SET:
+            raise KeyError(f"Article 不支持字段: {key}")
+        setattr(self, key, _intern(value) if key in _INTERNED_FIELDS else value)
+
+    def __delitem__(self, key: str):
+        if key == "id" or key not in _FIELD_SET:
+            raise KeyError(key)
+        try:
+            delattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self) -> Iterator[str]:
+        for key in ARTICLE_FIELDS:
+            if key == "id" or hasattr(self, key):
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Article({self.source!r}, {self.url!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为存储使用的 JSON 结构"""
+        return {key: getattr(self, key) for key in self}
+
+
+def as_dict(article: Mapping[str, Any]) -> Dict[str, Any]:
+    """JSON 边界使用：Article 转为 dict，其他映射原样返回"""
+    return article.to_dict() if isinstance(article, Article) else article
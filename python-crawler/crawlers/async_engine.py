@@ -0,0 +1,226 @@
+"""
+异步爬虫引擎
+单事件循环 + 共享 aiohttp 客户端，为各爬虫的异步版本提供 HTTP 请求
+"""
+import time
+import asyncio
+import json
+from typing import Any, Coroutine, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from config import ASYNC_HTTP_LIMIT, ASYNC_HTTP_LIMIT_PER_HOST
+from crawlers.utils import get_default_headers, rate_limiter
+from crawlers.http_cache import http_cache, CacheEntry
+from crawlers.metrics import run_metrics
+from crawlers.retry import retry_policy
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None  # 未安装 aiohttp 时，仅在使用异步引擎时报错
+
+
+class AsyncResponse:
+    """
+    异步请求的响应快照
+    接口与 requests.Response 保持一致（status_code / headers / text / json()），
+    headers 与 requests 一样大小写不敏感（HTTP/2 等返回小写头名），
+    便于同步与异步爬虫共用解析逻辑
+    """
+
+    def __init__(self, url: str, status_code: int, headers: dict, content: bytes, encoding: Optional[str]):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding or "utf-8"
+        self.from_cache = False
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        """与 requests 一致：4xx/5xx 时抛出 requests.HTTPError"""
+        if 400 <= self.status_code < 600:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise requests.HTTPError(
+                f"{self.status_code} {kind} Error for url: {self.url}",
+                response=self
+            )
+
+
+class AsyncEngine:
+    """
+    异步引擎：持有唯一的事件循环和共享的 aiohttp ClientSession
+
+    Usage:
+        result = engine.run(crawl_hackernews_async(10))
+    """
+
+    def __init__(self, limit: int = ASYNC_HTTP_LIMIT, limit_per_host: int = ASYNC_HTTP_LIMIT_PER_HOST):
+        """
+        Args:
+            limit: 连接池总连接数上限
+            limit_per_host: 单个主机的连接数上限
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop
+
+    async def get_session(self):
+        """获取（必要时创建）共享的 ClientSession"""
+        if aiohttp is None:
+            raise RuntimeError("异步引擎需要安装 aiohttp: pip install aiohttp")
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def request(
+        self,
+        url: str,
+        method: str = "GET",
+        timeout: float = 30,
+        headers: dict = None,
+        params: dict = None,
+        json: Any = None,
+        data: Any = None
+    ) -> AsyncResponse:
+        """发送请求并读取完整响应体"""
+        session = await self.get_session()
+        async with session.request(
+            method,
+            url,
+            headers=headers,
+            params=params,
+            json=json,
+            data=data,
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as resp:
+            content = await resp.read()
+            return AsyncResponse(
+                url=str(resp.url),
+                status_code=resp.status,
+                headers=CaseInsensitiveDict(resp.headers),
+                content=content,
+                encoding=resp.charset
+            )
+
+    def run(self, coro: Coroutine) -> Any:
+        """在引擎的事件循环中运行协程直至完成"""
+        return self.loop.run_until_complete(coro)
+
+    async def aclose(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def close(self):
+        """关闭共享会话和事件循环"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.run_until_complete(self.aclose())
+            self._loop.close()
+        self._loop = None
+
+
+def _response_from_cache(entry: CacheEntry) -> AsyncResponse:
+    response = AsyncResponse(entry.url, 200, CaseInsensitiveDict(entry.headers), entry.content, entry.encoding)
+    response.from_cache = True
+    return response
+
+
+async def async_request(
+    url: str,
+    method: str = "GET",
+    timeout: float = 30,
+    headers: dict = None,
+    cache_source: str = None,
+    cache_ttl: int = None,
+    retries: int = None,
+    **kwargs
+) -> AsyncResponse:
+    """
+    异步版 safe_request
+
+    Args:
+        url: 请求 URL
+        method: HTTP 方法
+        timeout: 超时时间（秒）
+        headers: 自定义请求头（会与默认头合并）
+        cache_source: 数据源名称；指定时 GET 请求走 HTTP 缓存
+        cache_ttl: 覆盖本次请求的缓存新鲜期（秒）
+        retries: 最大重试次数（默认读取 RETRY_MAX_RETRIES）
+        **kwargs: params / json / data
+
+    Returns:
+        AsyncResponse 对象（命中缓存时 from_cache 为 True）
+
+    Raises:
+        requests.HTTPError: 状态码为 4xx/5xx 且重试无效时抛出
+    """
+    final_headers = get_default_headers()
+    if headers:
+        final_headers.update(headers)
+
+    cache_key = entry = None
+    if cache_source and method.upper() == "GET" and http_cache.enabled:
+        cache_key = http_cache.make_key(method, url, kwargs.get("params"))
+        entry = http_cache.get(cache_key)
+        if entry is not None:
+            ttl = http_cache.ttl_for(cache_source) if cache_ttl is None else cache_ttl
+            if entry.is_fresh(ttl):
+                run_metrics.record_fetch(0.0, len(entry.content), from_cache=True)
+                return _response_from_cache(entry)
+            final_headers.update(entry.conditional_headers())
+
+    async def send() -> AsyncResponse:
+        await rate_limiter.acquire_async(url)
+        resp = await engine.request(url, method=method, timeout=timeout, headers=final_headers, **kwargs)
+        rate_limiter.on_response(url, resp.status_code, resp.headers)
+        if entry is None or resp.status_code != 304:
+            resp.raise_for_status()
+        return resp
+
+    start = time.perf_counter()
+    response = None
+    try:
+        response = await retry_policy.call_async(send, retries=retries)
+    finally:
+        run_metrics.record_fetch(
+            time.perf_counter() - start,
+            len(response.content) if response is not None else 0,
+            from_cache=response is not None and response.status_code == 304
+        )
+
+    if entry is not None and response.status_code == 304:
+        http_cache.touch(entry, cache_key, response.headers)
+        return _response_from_cache(entry)
+
+    if cache_key is not None and response.status_code == 200:
+        http_cache.put(cache_key, response.url, response.headers, response.content, response.encoding)
+    return response
+
+
+def run_async(coro: Coroutine) -> Any:
+    """在共享事件循环中运行协程"""
+    return engine.run(coro)
+
+
+# 单例
+engine = AsyncEngine()
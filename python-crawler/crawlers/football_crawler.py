@@ -1,10 +1,126 @@
 """
 足球数据爬虫
 使用 football-data.org API 获取英超比分和排行榜
+
+免费版每分钟只有 10 次请求，客户端按比赛状态决定缓存新鲜期：
+- 比赛列表：有比赛进行中时按 FOOTBALL_TTL_LIVE 轮询，否则缓存到下一场开球
+- 积分榜：只在上次获取后有比赛结束时刷新
+响应头中的剩余配额用尽时直接使用缓存
 """
+import json
+import time
+import threading
 import requests
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Tuple
+
+from crawlers.utils import safe_request
+from crawlers.async_engine import async_request
+from crawlers.http_cache import http_cache
+from crawlers.metrics import timed_parse
+from crawlers.registry import registry, Source
+from config import (
+    FOOTBALL_API_KEY,
+    FOOTBALL_MATCHDAY_INTERVAL,
+    FOOTBALL_TTL_LIVE,
+    FOOTBALL_TTL_IDLE,
+    FOOTBALL_STANDINGS_MAX_AGE,
+)
+
+
+# 进行中 / 未开始的比赛状态
+LIVE_STATUSES = {"IN_PLAY", "PAUSED", "LIVE"}
+UPCOMING_STATUSES = {"SCHEDULED", "TIMED"}
+# 开球后多久内仍按进行中处理（API 状态可能滞后于实际开球）
+MATCH_WINDOW = 3 * 3600
+# 比赛结束后积分榜可能延迟更新，这段时间内每次都重新获取
+STANDINGS_SETTLE = 600
+
+
+def _parse_utc(value: Optional[str]) -> Optional[float]:
+    """解析 API 返回的 UTC 时间（如 2024-05-19T15:00:00Z），返回时间戳"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _matches_ttl(data: Dict, stored_at: float) -> int:
+    """
+    比赛列表的新鲜期
+    有比赛进行中（或已到开球时间但状态未更新）时短间隔轮询，否则缓存到下一场开球
+    """
+    next_kickoff = None
+    for match in data.get("matches", []):
+        status = match.get("status")
+        if status in LIVE_STATUSES:
+            return FOOTBALL_TTL_LIVE
+        if status not in UPCOMING_STATUSES:
+            continue
+        kickoff = _parse_utc(match.get("utcDate"))
+        if kickoff is None:
+            continue
+        if kickoff <= stored_at:
+            if stored_at - kickoff < MATCH_WINDOW:
+                return FOOTBALL_TTL_LIVE
+        elif next_kickoff is None or kickoff < next_kickoff:
+            next_kickoff = kickoff
+    
+    ttl = FOOTBALL_TTL_IDLE
+    if next_kickoff is not None:
+        ttl = min(ttl, next_kickoff - stored_at)
+    return max(int(ttl), FOOTBALL_TTL_LIVE)
+
+
+def _standings_ttl(matches: Dict, stored_at: float) -> int:
+    """积分榜的新鲜期：上次获取后有比赛结束则立即刷新，否则最长缓存 FOOTBALL_STANDINGS_MAX_AGE"""
+    for match in matches.get("matches", []):
+        if match.get("status") != "FINISHED":
+            continue
+        finished_at = _parse_utc(match.get("lastUpdated"))
+        if finished_at is None:
+            kickoff = _parse_utc(match.get("utcDate"))
+            finished_at = kickoff + MATCH_WINDOW if kickoff is not None else None
+        if finished_at is not None and finished_at + STANDINGS_SETTLE > stored_at:
+            return 0
+    return FOOTBALL_STANDINGS_MAX_AGE
+
+
+class ApiQuota:
+    """
+    football-data.org 配额跟踪
+    每次实际请求后读取 X-Requests-Available-Minute / X-RequestCounter-Reset 响应头
+    """
+    
+    def __init__(self):
+        self.available: Optional[int] = None
+        self.reset_at = 0.0
+        self._lock = threading.Lock()
+    
+    def update(self, headers):
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        try:
+            available = int(headers["x-requests-available-minute"])
+            reset_in = float(headers.get("x-requestcounter-reset", 60))
+        except (KeyError, ValueError):
+            return
+        with self._lock:
+            self.available = available
+            self.reset_at = time.time() + reset_in
+    
+    def reset_in(self) -> float:
+        return max(0.0, self.reset_at - time.time())
+    
+    def exhausted(self) -> bool:
+        """本分钟配额是否已用尽（重置后自动恢复）"""
+        with self._lock:
+            return self.available is not None and self.available <= 0 and time.time() < self.reset_at
+
+
+# 单例（守护进程中多轮爬取共享）
+football_quota = ApiQuota()
 
 
 class FootballDataClient:
@@ -16,29 +132,109 @@ class FootballDataClient:
     BASE_URL = "https://api.football-data.org/v4"
     PREMIER_LEAGUE_ID = "PL"  # 英超代码
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, quota: ApiQuota = None):
         self.api_key = api_key
         self.headers = {
             "X-Auth-Token": api_key
         }
+        self.quota = football_quota if quota is None else quota
+        # 最近一次获取的比赛列表原始数据，用于判断积分榜是否需要刷新
+        self._matches_data: Optional[Dict] = None
+    
+    def _url(self, endpoint: str) -> str:
+        return f"{self.BASE_URL}/{endpoint}"
     
-    def _request(self, endpoint: str) -> Optional[Dict]:
-        """发送API请求"""
-        url = f"{self.BASE_URL}/{endpoint}"
+    def _plan(self, endpoint: str, ttl_for: Callable[[Dict, float], int]) -> Tuple[Optional[Dict], Optional[int]]:
+        """
+        根据缓存内容计算本次请求的新鲜期
+        返回 (缓存数据, 新鲜期)；新鲜期为 None 表示配额已用尽，直接使用缓存
+        """
+        entry = http_cache.get(http_cache.make_key("GET", self._url(endpoint)))
+        if entry is None:
+            return None, 0
         try:
-            response = requests.get(url, headers=self.headers, timeout=30)
-            response.raise_for_status()
-            return response.json()
+            cached = json.loads(entry.content)
+        except ValueError:
+            return None, 0
+        if self.quota.exhausted():
+            print(f"[Football API] 本分钟配额已用尽，{self.quota.reset_in():.0f}s 后重置，使用缓存")
+            return cached, None
+        return cached, ttl_for(cached, entry.stored_at)
+    
+    def _handle(self, response) -> Dict:
+        # 只有实际请求的响应头带有最新配额
+        if not getattr(response, "from_cache", False):
+            self.quota.update(response.headers)
+        return response.json()
+    
+    @staticmethod
+    def _fallback(error: Exception, cached: Optional[Dict]) -> Optional[Dict]:
+        print(f"[Football API] 请求失败: {error}")
+        if cached is not None:
+            print("[Football API] 使用过期缓存")
+        return cached
+    
+    def _request(self, endpoint: str, ttl_for: Callable[[Dict, float], int]) -> Optional[Dict]:
+        """发送API请求（新鲜期内直接使用缓存，失败时回退到过期缓存）"""
+        cached, ttl = self._plan(endpoint, ttl_for)
+        if ttl is None:
+            return cached
+        try:
+            response = safe_request(
+                self._url(endpoint), headers=self.headers, timeout=30,
+                cache_source="football", cache_ttl=ttl
+            )
+            return self._handle(response)
         except requests.RequestException as e:
-            print(f"[Football API] 请求失败: {e}")
-            return None
+            return self._fallback(e, cached)
+    
+    async def _request_async(self, endpoint: str, ttl_for: Callable[[Dict, float], int]) -> Optional[Dict]:
+        """发送API请求（异步）"""
+        cached, ttl = self._plan(endpoint, ttl_for)
+        if ttl is None:
+            return cached
+        try:
+            response = await async_request(
+                self._url(endpoint), headers=self.headers, timeout=30,
+                cache_source="football", cache_ttl=ttl
+            )
+            return self._handle(response)
+        except Exception as e:
+            return self._fallback(e, cached)
+    
+    def _standings_ttl(self, data: Dict, stored_at: float) -> int:
+        # 未获取过比赛列表时只按最长缓存时间判断
+        return _standings_ttl(self._matches_data or {}, stored_at)
+    
+    def _standings_endpoint(self) -> str:
+        return f"competitions/{self.PREMIER_LEAGUE_ID}/standings"
+    
+    def _matches_endpoint(self, days: int) -> str:
+        # 获取过去几天到未来1天的比赛
+        date_from = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        date_to = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        return (
+            f"competitions/{self.PREMIER_LEAGUE_ID}/matches"
+            f"?dateFrom={date_from}&dateTo={date_to}"
+        )
     
     def get_standings(self) -> Optional[Dict]:
         """
         获取英超积分榜
         返回: 球队排名、积分、胜负场次等
+        应在 get_recent_matches 之后调用，以便根据已结束的比赛判断是否刷新
         """
-        data = self._request(f"competitions/{self.PREMIER_LEAGUE_ID}/standings")
+        return self._parse_standings(self._request(self._standings_endpoint(), self._standings_ttl))
+    
+    async def get_standings_async(self) -> Optional[Dict]:
+        """get_standings 的异步版本"""
+        return self._parse_standings(
+            await self._request_async(self._standings_endpoint(), self._standings_ttl)
+        )
+    
+    @timed_parse
+    def _parse_standings(self, data: Optional[Dict]) -> Optional[Dict]:
+        """解析积分榜响应"""
         if not data:
             return None
         
@@ -85,15 +281,17 @@ class FootballDataClient:
         获取最近几天的英超比赛
         返回: 比赛日期、对阵双方、比分
         """
-        # 获取过去几天到未来1天的比赛
-        date_from = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
-        date_to = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
-        
-        data = self._request(
-            f"competitions/{self.PREMIER_LEAGUE_ID}/matches"
-            f"?dateFrom={date_from}&dateTo={date_to}"
-        )
-        
+        self._matches_data = self._request(self._matches_endpoint(days), _matches_ttl)
+        return self._parse_matches(self._matches_data)
+    
+    async def get_recent_matches_async(self, days: int = 3) -> Optional[Dict]:
+        """get_recent_matches 的异步版本"""
+        self._matches_data = await self._request_async(self._matches_endpoint(days), _matches_ttl)
+        return self._parse_matches(self._matches_data)
+    
+    @timed_parse
+    def _parse_matches(self, data: Optional[Dict]) -> Optional[Dict]:
+        """解析比赛列表响应"""
         if not data:
             return None
         
@@ -124,9 +322,15 @@ class FootballDataClient:
             return None
 
 
+def _log_quota(quota: ApiQuota):
+    if quota.available is not None:
+        print(f"[Football] API 本分钟剩余 {quota.available} 次，{quota.reset_in():.0f}s 后重置")
+
+
 def get_football_summary(api_key: str) -> Dict[str, Any]:
     """
     获取足球数据汇总（积分榜 + 最近比赛）
+    先获取比赛列表，再根据其中已结束的比赛决定积分榜是否需要刷新
     """
     client = FootballDataClient(api_key)
     
@@ -135,6 +339,14 @@ def get_football_summary(api_key: str) -> Dict[str, Any]:
         "matches": None
     }
     
+    # 获取最近比赛
+    print("[Football] 正在获取最近比赛...")
+    matches = client.get_recent_matches(days=3)
+    if matches:
+        result["matches"] = matches
+        finished = [m for m in matches["matches"] if m["status"] == "FINISHED"]
+        print(f"[Football] 获取比赛成功，{len(finished)} 场已结束")
+    
     # 获取积分榜
     print("[Football] 正在获取英超积分榜...")
     standings = client.get_standings()
@@ -142,14 +354,30 @@ def get_football_summary(api_key: str) -> Dict[str, Any]:
         result["standings"] = standings
         print(f"[Football] 获取积分榜成功，共 {len(standings['teams'])} 支球队")
     
-    # 获取最近比赛
-    print("[Football] 正在获取最近比赛...")
-    matches = client.get_recent_matches(days=3)
+    _log_quota(client.quota)
+    return result
+
+
+async def get_football_summary_async(api_key: str) -> Dict[str, Any]:
+    """get_football_summary 的异步版本（积分榜依赖比赛列表，两者顺序获取）"""
+    client = FootballDataClient(api_key)
+    
+    print("[Football] 正在获取最近比赛和英超积分榜...")
+    matches = await client.get_recent_matches_async(days=3)
+    standings = await client.get_standings_async()
+    
+    result = {
+        "standings": standings,
+        "matches": matches
+    }
+    
     if matches:
-        result["matches"] = matches
         finished = [m for m in matches["matches"] if m["status"] == "FINISHED"]
         print(f"[Football] 获取比赛成功，{len(finished)} 场已结束")
+    if standings:
+        print(f"[Football] 获取积分榜成功，共 {len(standings['teams'])} 支球队")
     
+    _log_quota(client.quota)
     return result
 
 
@@ -215,6 +443,26 @@ def format_football_markdown(data: Dict[str, Any]) -> str:
     return "".join(lines)
 
 
+def _is_match_day(data: Dict[str, Any]) -> bool:
+    """今天（UTC）是否有未结束的比赛"""
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+    matches = (data.get("matches") or {}).get("matches", [])
+    return any(m["date"] == today and m["status"] != "FINISHED" for m in matches)
+
+
+def _football_interval(data: Dict[str, Any]) -> Optional[float]:
+    """比赛日按 FOOTBALL_MATCHDAY_INTERVAL 刷新，其他时间使用默认间隔"""
+    return FOOTBALL_MATCHDAY_INTERVAL if _is_match_day(data) else None
+
+
+# 足球数据不是文章列表，单独存储（sink=football）
+registry.register(Source(
+    "football", "足球数据", get_football_summary, get_football_summary_async,
+    group="football", priority=90, timeout=60, concurrency="api", sink="football",
+    params={"api_key": FOOTBALL_API_KEY}, interval=3600, next_interval=_football_interval,
+))
+
+
 if __name__ == "__main__":
     # 测试 - 从环境变量读取 API Key
     import os
@@ -2,33 +2,48 @@
 GitHub Trending 爬虫
 爬取 https://github.com/trending 页面的热门仓库
 """
-import uuid
 from bs4 import BeautifulSoup
-from datetime import datetime
 from typing import List, Dict, Any
 
 from config import GITHUB_TRENDING_COUNT
-from crawlers.utils import retry_on_failure, safe_request, get_random_user_agent
+from crawlers import parsing
+from crawlers.article import Article
+from crawlers.parse_cache import parse_cache
+from crawlers.utils import safe_request, get_random_user_agent
+from crawlers.async_engine import async_request
+from crawlers.metrics import timed_parse
+from crawlers.registry import registry, Source
 
+TRENDING_URL = "https://github.com/trending"
 
-@retry_on_failure(max_retries=3, delay=1.0)
-def crawl_github_trending() -> List[Dict[str, Any]]:
-    """
-    爬取 GitHub Trending 仓库
-    返回文章列表
-    """
-    url = "https://github.com/trending"
-    headers = {
+
+def _build_headers() -> Dict[str, str]:
+    return {
         "User-Agent": get_random_user_agent(),
         "Accept-Language": "en-US,en;q=0.9"
     }
-    
-    response = safe_request(url, headers=headers, timeout=30)
-    soup = BeautifulSoup(response.text, "lxml")
+
+
+def _build_article(repo_path: str, title_text: str, description: str, today_stars: str) -> Article:
+    repo_name = " / ".join([
+        s.strip() for s in title_text.strip().split("\n") if s.strip()
+    ])
+    return Article(
+        repo_name,
+        f"https://github.com{repo_path.strip()}",
+        "github",
+        description or "暂无描述",
+        extra={"today_stars": today_stars}
+    )
+
+
+def _parse_trending_bs4(html: str, count: int) -> List[Dict[str, Any]]:
+    """BeautifulSoup 解析"""
+    soup = BeautifulSoup(html, "lxml")
     articles = []
     
     # 查找所有仓库条目
-    repo_items = soup.select("article.Box-row")[:GITHUB_TRENDING_COUNT]
+    repo_items = soup.select("article.Box-row")[:count]
     
     for item in repo_items:
         try:
@@ -37,39 +52,88 @@ def crawl_github_trending() -> List[Dict[str, Any]]:
             if not title_elem:
                 continue
             
-            repo_path = title_elem.get("href", "").strip()
-            repo_name = " / ".join([
-                s.strip() for s in title_elem.get_text().strip().split("\n") if s.strip()
-            ])
-            repo_url = f"https://github.com{repo_path}"
-            
             # 描述
             desc_elem = item.select_one("p")
-            description = desc_elem.get_text().strip() if desc_elem else "暂无描述"
+            description = desc_elem.get_text().strip() if desc_elem else ""
             
             # 今日 star 数
             star_elem = item.select_one("span.d-inline-block.float-sm-right")
             today_stars = star_elem.get_text().strip() if star_elem else ""
             
-            article = {
-                "id": str(uuid.uuid4()),
-                "title": repo_name,
-                "url": repo_url,
-                "source": "github",
-                "description": description,
-                "extra": {"today_stars": today_stars},
-                "crawl_time": datetime.now().isoformat()
-            }
-            articles.append(article)
+            articles.append(_build_article(
+                title_elem.get("href", ""), title_elem.get_text(), description, today_stars
+            ))
+            
+        except Exception as e:
+            print(f"[GitHub] 解析条目失败: {e}")
+            continue
+    
+    return articles
+
+
+_TITLE_LINK = parsing.xpath(".//h2//a")
+_DESCRIPTION = parsing.xpath(".//p")
+_TODAY_STARS = parsing.xpath(f".//span[{parsing.class_predicate('d-inline-block', 'float-sm-right')}]")
+
+
+def _parse_trending_lxml(html: str, count: int) -> List[Dict[str, Any]]:
+    """lxml 流式解析，取够 count 个仓库后停止"""
+    articles = []
+    rows = parsing.iter_elements(html, ["article"], lambda el: parsing.has_class(el, "Box-row"))
+    
+    for index, item in enumerate(rows):
+        if index >= count:
+            break
+        try:
+            title_elem = parsing.first(item, _TITLE_LINK)
+            if title_elem is None:
+                continue
+            
+            description = parsing.raw_text_of(parsing.first(item, _DESCRIPTION)).strip()
+            today_stars = parsing.raw_text_of(parsing.first(item, _TODAY_STARS)).strip()
+            
+            articles.append(_build_article(
+                title_elem.get("href", ""), parsing.raw_text_of(title_elem), description, today_stars
+            ))
             
         except Exception as e:
             print(f"[GitHub] 解析条目失败: {e}")
             continue
     
+    return articles
+
+
+@timed_parse
+def _parse_trending(html: str, count: int) -> List[Dict[str, Any]]:
+    """解析 Trending 页面 HTML（解析后端按 HTML_PARSERS 配置选择）"""
+    parse = parsing.select_parser("github", lxml=_parse_trending_lxml, bs4=_parse_trending_bs4)
+    articles = parse(html, count)
     print(f"[GitHub] 成功爬取 {len(articles)} 个仓库")
     return articles
 
 
+def crawl_github_trending(count: int = GITHUB_TRENDING_COUNT) -> List[Dict[str, Any]]:
+    """
+    爬取 GitHub Trending 仓库
+    返回前 count 个仓库
+    """
+    response = safe_request(TRENDING_URL, headers=_build_headers(), timeout=30, cache_source="github")
+    return parse_cache.parse("github", response, _parse_trending, count)
+
+
+async def crawl_github_trending_async(count: int = GITHUB_TRENDING_COUNT) -> List[Dict[str, Any]]:
+    """crawl_github_trending 的异步版本"""
+    response = await async_request(TRENDING_URL, headers=_build_headers(), timeout=30, cache_source="github")
+    return parse_cache.parse("github", response, _parse_trending, count)
+
+
+# 主要看 AI 相关，只取 4 个
+registry.register(Source(
+    "github", "GitHub Trending", crawl_github_trending, crawl_github_trending_async,
+    group="extra", priority=40, quota=4, concurrency="scrape", interval=3600,
+))
+
+
 if __name__ == "__main__":
     # 测试爬虫
     results = crawl_github_trending()
@@ -2,72 +2,349 @@
 Hacker News 爬虫
 获取 HN 热门文章
 """
-import uuid
-import requests
-from datetime import datetime
-from typing import List, Dict, Any
+import asyncio
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
-from crawlers.utils import retry_on_failure, RateLimiter
+from config import HN_ITEM_CONCURRENCY, WORK_QUEUE_HN_CHUNK
+from crawlers.article import Article
+from crawlers.utils import safe_request
+from crawlers.async_engine import async_request
+from crawlers.metrics import timed_parse
+from crawlers.registry import registry, Source
 
+TOP_STORIES_URL = "https://hacker-news.firebaseio.com/v0/topstories.json"
+NEW_STORIES_URL = "https://hacker-news.firebaseio.com/v0/newstories.json"
+BEST_STORIES_URL = "https://hacker-news.firebaseio.com/v0/beststories.json"
+ITEM_URL = "https://hacker-news.firebaseio.com/v0/item/{id}.json"
 
-@retry_on_failure(max_retries=3, delay=1.0)
-def crawl_hackernews(count: int = 10) -> List[Dict[str, Any]]:
+
+@timed_parse
+def _parse_story(item: Optional[Dict[str, Any]], story_id: int) -> Optional[Article]:
+    """将 HN item 转换为文章，非 story 类型或无标题时返回 None"""
+    # 只要有标题的 story 类型
+    if not item or item.get("type") != "story" or not item.get("title"):
+        return None
+
+    # HN 有些是讨论帖没有 URL，用 HN 链接代替
+    url = item.get("url", f"https://news.ycombinator.com/item?id={story_id}")
+
+    return Article(
+        item.get("title", ""),
+        url,
+        "hackernews",
+        f"Score: {item.get('score', 0)} | Comments: {item.get('descendants', 0)}",
+        extra={
+            "score": item.get("score", 0),
+            "comments": item.get("descendants", 0),
+            "author": item.get("by", "")
+        }
+    )
+
+
+def _ordered_stories(
+    story_ids: List[int],
+    parsed: Dict[int, Optional[Dict[str, Any]]],
+    count: int
+) -> Tuple[List[Dict[str, Any]], bool]:
     """
-    爬取 Hacker News 热门文章
-    使用官方 API
+    按排名顺序收集已解析的有效故事
+    返回 (文章列表, 是否已确定最终结果)：排名靠前的 count 条有效故事都已就绪，
+    或全部 ID 都已处理完时视为已确定
     """
-    # HN 官方 API - 获取热门故事 ID
-    top_stories_url = "https://hacker-news.firebaseio.com/v0/topstories.json"
-    
-    response = requests.get(top_stories_url, timeout=30)
-    response.raise_for_status()
-    story_ids = response.json()[:count * 2]  # 多取一些，过滤掉非文章类型
-    
     articles = []
-    limiter = RateLimiter(min_interval=0.2)  # 避免请求过快
-    
     for story_id in story_ids:
         if len(articles) >= count:
-            break
-        
-        try:
-            limiter.wait()
-            
-            # 获取单个故事详情
-            item_url = f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json"
-            item_resp = requests.get(item_url, timeout=10)
-            item = item_resp.json()
-            
-            # 只要有标题的 story 类型
-            if not item or item.get("type") != "story" or not item.get("title"):
-                continue
-            
-            # HN 有些是讨论帖没有 URL，用 HN 链接代替
-            url = item.get("url", f"https://news.ycombinator.com/item?id={story_id}")
-            
-            article = {
-                "id": str(uuid.uuid4()),
-                "title": item.get("title", ""),
-                "url": url,
-                "source": "hackernews",
-                "description": f"Score: {item.get('score', 0)} | Comments: {item.get('descendants', 0)}",
-                "extra": {
-                    "score": item.get("score", 0),
-                    "comments": item.get("descendants", 0),
-                    "author": item.get("by", "")
-                },
-                "crawl_time": datetime.now().isoformat()
+            return articles, True
+        if story_id not in parsed:
+            return articles, False
+        if parsed[story_id]:
+            articles.append(parsed[story_id])
+    return articles, True
+
+
+class HNItemLoader:
+    """
+    HN 故事详情批量加载器
+
+    - 并发获取 item，同时进行的请求数不超过 concurrency
+    - 排名靠前的 count 条有效故事就绪后停止发起新请求，并取消仍在进行的请求
+    - item 结果在同一次运行内缓存，重复调用不会再次请求
+
+    Usage:
+        articles = item_loader.load_stories(story_ids, count=10)
+    """
+
+    def __init__(self, concurrency: int = HN_ITEM_CONCURRENCY):
+        """
+        Args:
+            concurrency: 同时进行的最大请求数
+        """
+        self.concurrency = max(1, concurrency)
+        self._cache: Dict[int, Optional[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def clear(self):
+        """清空 item 缓存（新一轮爬取前调用）"""
+        with self._lock:
+            self._cache.clear()
+
+    def _cached(self, story_ids: List[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        with self._lock:
+            return {
+                sid: _parse_story(self._cache[sid], sid)
+                for sid in story_ids if sid in self._cache
             }
-            articles.append(article)
-            
-        except Exception as e:
-            print(f"[HN] 获取故事 {story_id} 失败: {e}")
-            continue
-    
+
+    def _store(self, story_id: int, item: Optional[Dict[str, Any]]):
+        with self._lock:
+            self._cache[story_id] = item
+
+    def fetch_item(self, story_id: int) -> Optional[Dict[str, Any]]:
+        """获取单个 item（同步），失败时抛出异常且不缓存"""
+        # 单条故事失败时由后续 ID 补位，只重试一次以节省重试预算
+        response = safe_request(ITEM_URL.format(id=story_id), timeout=10, retries=1)
+        item = response.json()
+        self._store(story_id, item)
+        return item
+
+    async def fetch_item_async(self, story_id: int) -> Optional[Dict[str, Any]]:
+        """获取单个 item（异步），失败时抛出异常且不缓存"""
+        response = await async_request(ITEM_URL.format(id=story_id), timeout=10, retries=1)
+        item = response.json()
+        self._store(story_id, item)
+        return item
+
+    def load_stories(self, story_ids: List[int], count: int) -> List[Dict[str, Any]]:
+        """按排名顺序加载前 count 条有效故事（线程池并发）"""
+        parsed = self._cached(story_ids)
+        articles, complete = _ordered_stories(story_ids, parsed, count)
+        if complete:
+            return articles
+
+        todo = iter([sid for sid in story_ids if sid not in parsed])
+        in_flight = {}
+        executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="hn-item")
+
+        def submit_next() -> bool:
+            story_id = next(todo, None)
+            if story_id is None:
+                return False
+            # 在复制的上下文中运行，请求指标仍归属于当前数据源
+            in_flight[executor.submit(contextvars.copy_context().run, self.fetch_item, story_id)] = story_id
+            return True
+
+        try:
+            while len(in_flight) < self.concurrency and submit_next():
+                pass
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    story_id = in_flight.pop(future)
+                    try:
+                        parsed[story_id] = _parse_story(future.result(), story_id)
+                    except Exception as e:
+                        print(f"[HN] 获取故事 {story_id} 失败: {e}")
+                        parsed[story_id] = None
+
+                articles, complete = _ordered_stories(story_ids, parsed, count)
+                if complete:
+                    break
+                while len(in_flight) < self.concurrency and submit_next():
+                    pass
+        finally:
+            # 已满足数量后，取消尚未开始的请求，不等待进行中的请求
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return _ordered_stories(story_ids, parsed, count)[0]
+
+    def load_items(self, story_ids: List[int]) -> Dict[int, Optional[Dict[str, Any]]]:
+        """并发获取一批 item 的原始数据（不按数量提前停止），获取失败的为 None"""
+        with self._lock:
+            items = {sid: self._cache[sid] for sid in story_ids if sid in self._cache}
+        todo = [sid for sid in story_ids if sid not in items]
+        if todo:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="hn-item") as executor:
+                futures = {
+                    executor.submit(contextvars.copy_context().run, self.fetch_item, story_id): story_id
+                    for story_id in todo
+                }
+                for future in as_completed(futures):
+                    story_id = futures[future]
+                    try:
+                        items[story_id] = future.result()
+                    except Exception as e:
+                        print(f"[HN] 获取故事 {story_id} 失败: {e}")
+                        items[story_id] = None
+        return {sid: items.get(sid) for sid in story_ids}
+
+    async def load_stories_async(self, story_ids: List[int], count: int) -> List[Dict[str, Any]]:
+        """load_stories 的异步版本，满足数量后直接取消进行中的请求"""
+        parsed = self._cached(story_ids)
+        articles, complete = _ordered_stories(story_ids, parsed, count)
+        if complete:
+            return articles
+
+        todo = iter([sid for sid in story_ids if sid not in parsed])
+        in_flight = {}
+
+        def submit_next() -> bool:
+            story_id = next(todo, None)
+            if story_id is None:
+                return False
+            in_flight[asyncio.ensure_future(self.fetch_item_async(story_id))] = story_id
+            return True
+
+        try:
+            while len(in_flight) < self.concurrency and submit_next():
+                pass
+
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    story_id = in_flight.pop(task)
+                    try:
+                        parsed[story_id] = _parse_story(task.result(), story_id)
+                    except Exception as e:
+                        print(f"[HN] 获取故事 {story_id} 失败: {e}")
+                        parsed[story_id] = None
+
+                articles, complete = _ordered_stories(story_ids, parsed, count)
+                if complete:
+                    break
+                while len(in_flight) < self.concurrency and submit_next():
+                    pass
+        finally:
+            for task in in_flight:
+                task.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+        return _ordered_stories(story_ids, parsed, count)[0]
+
+
+# 单例：同一次运行内共享 item 缓存
+item_loader = HNItemLoader()
+
+
+def crawl_hackernews(count: int = 10, story_ids: List[int] = None) -> List[Dict[str, Any]]:
+    """
+    爬取 Hacker News 热门文章
+    使用官方 API；传入 story_ids 时只加载这些故事（分布式子任务）
+    """
+    if story_ids is None:
+        # HN 官方 API - 获取热门故事 ID
+        response = safe_request(TOP_STORIES_URL, timeout=30)
+        story_ids = response.json()[:count * 2]  # 多取一些，过滤掉非文章类型
+
+    articles = item_loader.load_stories(story_ids, count)
+
     print(f"[HN] 成功爬取 {len(articles)} 篇文章")
     return articles
 
 
+async def crawl_hackernews_async(count: int = 10, story_ids: List[int] = None) -> List[Dict[str, Any]]:
+    """
+    crawl_hackernews 的异步版本
+    """
+    if story_ids is None:
+        response = await async_request(TOP_STORIES_URL, timeout=30)
+        story_ids = response.json()[:count * 2]
+
+    articles = await item_loader.load_stories_async(story_ids, count)
+
+    print(f"[HN] 成功爬取 {len(articles)} 篇文章")
+    return articles
+
+
+def hackernews_shards(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    分布式子任务：协调进程获取热门故事 ID，按 WORK_QUEUE_HN_CHUNK 条一组拆分，
+    各组由不同 worker 加载，每组最多产出组内全部有效故事
+    """
+    count = params.get("count", 10)
+    response = safe_request(TOP_STORIES_URL, timeout=30)
+    story_ids = response.json()[:count * 2]
+    chunk = max(1, WORK_QUEUE_HN_CHUNK)
+    return [
+        {"story_ids": story_ids[i:i + chunk], "count": len(story_ids[i:i + chunk])}
+        for i in range(0, len(story_ids), chunk)
+    ]
+
+
+# 深度爬取每页（每个断点）的故事数
+HN_DEEP_PAGE_SIZE = 100
+
+
+def _deep_story_ids() -> List[int]:
+    """并发获取 new / top / best 三个列表，按此顺序合并去重"""
+    lists = {"new": NEW_STORIES_URL, "top": TOP_STORIES_URL, "best": BEST_STORIES_URL}
+    with ThreadPoolExecutor(max_workers=len(lists), thread_name_prefix="hn-list") as executor:
+        futures = {
+            name: executor.submit(contextvars.copy_context().run, safe_request, url, timeout=30)
+            for name, url in lists.items()
+        }
+    story_ids, seen = [], set()
+    for name, future in futures.items():
+        try:
+            ids = future.result().json()
+        except Exception as e:
+            print(f"[HN] 获取 {name} 列表失败: {e}")
+            continue
+        for story_id in ids:
+            if story_id not in seen:
+                seen.add(story_id)
+                story_ids.append(story_id)
+    if not story_ids:
+        raise RuntimeError("HN 故事列表均获取失败")
+    return story_ids
+
+
+def hackernews_deep(state: Dict[str, Any], cutoff: float, limit: int) -> Iterator[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+    """
+    深度爬取：合并 new / top / best 列表后按页并发加载故事，只保留 cutoff 之后发布的
+    HN item ID 随发布时间递增，遇到早于 cutoff 的故事后，比它小的 ID 都不再请求；
+    断点中保存列表快照，恢复时不受列表变化影响
+    """
+    if "ids" not in state:
+        state = {"ids": _deep_story_ids(), "offset": 0, "floor": 0}
+    story_ids = state["ids"]
+    collected = 0
+    while state["offset"] < len(story_ids) and collected < limit:
+        page = story_ids[state["offset"]:state["offset"] + HN_DEEP_PAGE_SIZE]
+        state["offset"] += len(page)
+        page = [sid for sid in page if sid > state["floor"]]
+        items = item_loader.load_items(page)
+
+        articles = []
+        for story_id in page:
+            item = items[story_id]
+            if not item:
+                continue
+            if item.get("time", 0) < cutoff:
+                state["floor"] = max(state["floor"], story_id)
+                continue
+            article = _parse_story(item, story_id)
+            if article:
+                article["extra"]["published_at"] = item.get("time")
+                articles.append(article)
+        collected += len(articles)
+        yield articles, state
+
+
+registry.register(Source(
+    "hackernews", "Hacker News", crawl_hackernews, crawl_hackernews_async,
+    group="extra", priority=60, quota=3, concurrency="api", interval=600,
+    on_start=item_loader.clear,  # 守护进程中每次重新获取分数和评论数
+    shards=hackernews_shards, deep=hackernews_deep,
+))
+
+
 if __name__ == "__main__":
     results = crawl_hackernews(5)
     for r in results:
@@ -0,0 +1,230 @@
+"""
+HTTP 响应缓存
+将响应体与 ETag/Last-Modified 一起存到磁盘，过期后发送条件请求，304 时直接使用缓存
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from config import (
+    HTTP_CACHE_ENABLED,
+    HTTP_CACHE_DIR,
+    HTTP_CACHE_DEFAULT_TTL,
+    HTTP_CACHE_TTLS,
+    HTTP_CACHE_MAX_AGE,
+)
+
+
+class CacheEntry:
+    """一条缓存的响应"""
+
+    def __init__(self, meta: Dict[str, Any], content: bytes):
+        self.meta = meta
+        self.content = content
+
+    @property
+    def url(self) -> str:
+        return self.meta.get("url", "")
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return self.meta.get("headers", {})
+
+    @property
+    def encoding(self) -> Optional[str]:
+        return self.meta.get("encoding")
+
+    @property
+    def stored_at(self) -> float:
+        return self.meta.get("stored_at", 0.0)
+
+    def is_fresh(self, ttl: int) -> bool:
+        return ttl > 0 and time.time() - self.stored_at < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """构造条件请求头"""
+        headers = {}
+        etag = self.meta.get("etag")
+        last_modified = self.meta.get("last_modified")
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+
+class HttpCache:
+    """
+    磁盘 HTTP 缓存
+
+    每个 URL 对应两个文件：{hash}.json（元数据与校验器）和 {hash}.body（响应体）。
+    写入先写临时文件再原子替换，多线程下安全。
+
+    Usage:
+        entry = http_cache.get(key)
+        if entry and entry.is_fresh(http_cache.ttl_for("github")):
+            ...
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = HTTP_CACHE_DIR,
+        enabled: bool = HTTP_CACHE_ENABLED,
+        default_ttl: int = HTTP_CACHE_DEFAULT_TTL,
+        ttls: Dict[str, int] = None,
+        max_age: int = HTTP_CACHE_MAX_AGE
+    ):
+        """
+        Args:
+            cache_dir: 缓存目录
+            enabled: 是否启用缓存
+            default_ttl: 默认新鲜期（秒），0 表示每次都重新验证
+            ttls: 按数据源覆盖的新鲜期
+            max_age: 超过该时长未更新的条目在清理时删除
+        """
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self.default_ttl = default_ttl
+        self.ttls = dict(HTTP_CACHE_TTLS if ttls is None else ttls)
+        self.max_age = max_age
+        self._pruned = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(method: str, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """根据方法、URL 和查询参数生成缓存键"""
+        raw = f"{method.upper()} {url}"
+        if params:
+            raw += "?" + json.dumps(params, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, source: str) -> int:
+        """获取数据源的新鲜期"""
+        return self.ttls.get(source, self.default_ttl)
+
+    def _paths(self, key: str):
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.body"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """读取缓存条目，不存在或损坏时返回 None"""
+        if not self.enabled:
+            return None
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            content = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(meta, content)
+
+    def put(
+        self,
+        key: str,
+        url: str,
+        headers: Dict[str, str],
+        content: bytes,
+        encoding: Optional[str] = None
+    ) -> Optional[CacheEntry]:
+        """写入一条 200 响应"""
+        if not self.enabled:
+            return None
+        meta = {
+            "url": url,
+            "headers": {k: v for k, v in headers.items() if k.lower() == "content-type"},
+            "encoding": encoding,
+            "etag": headers.get("ETag") or headers.get("etag"),
+            "last_modified": headers.get("Last-Modified") or headers.get("last-modified"),
+            "stored_at": time.time(),
+        }
+        self._write(key, meta, content)
+        self._prune_once()
+        return CacheEntry(meta, content)
+
+    def touch(self, entry: CacheEntry, key: str, headers: Dict[str, str] = None):
+        """304 后刷新条目的存储时间（以及服务端返回的新校验器）"""
+        if not self.enabled:
+            return
+        headers = headers or {}
+        entry.meta["stored_at"] = time.time()
+        if headers.get("ETag") or headers.get("etag"):
+            entry.meta["etag"] = headers.get("ETag") or headers.get("etag")
+        if headers.get("Last-Modified") or headers.get("last-modified"):
+            entry.meta["last_modified"] = headers.get("Last-Modified") or headers.get("last-modified")
+        meta_path, body_path = self._paths(key)
+        try:
+            self._atomic_write(meta_path, json.dumps(entry.meta, ensure_ascii=False).encode("utf-8"))
+            # 同时刷新响应体的修改时间，避免清理时被当作过旧文件删除
+            os.utime(body_path)
+        except OSError as e:
+            print(f"[HttpCache] 刷新缓存失败: {e}")
+
+    def _write(self, key: str, meta: Dict[str, Any], content: bytes):
+        meta_path, body_path = self._paths(key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # 先写响应体，再写元数据：元数据存在即代表条目完整
+            self._atomic_write(body_path, content)
+            self._atomic_write(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        except OSError as e:
+            print(f"[HttpCache] 写入缓存失败: {e}")
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes):
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _prune_once(self):
+        """每个进程首次写入时清理一次过旧的条目"""
+        with self._lock:
+            if self._pruned:
+                return
+            self._pruned = True
+        self.prune()
+
+    def prune(self) -> int:
+        """
+        删除超过 max_age 未更新的条目，返回删除数量
+        以元数据文件的修改时间判断条目新旧，元数据与响应体一起删除（先删元数据，读取方不会看到缺少响应体的条目）；
+        没有元数据的响应体和残留的临时文件按自身修改时间清理
+        """
+        if not self.cache_dir.exists():
+            return 0
+        cutoff = time.time() - self.max_age
+        removed = 0
+        for meta_path in self.cache_dir.glob("*.json"):
+            try:
+                if meta_path.stat().st_mtime >= cutoff:
+                    continue
+                meta_path.unlink()
+                meta_path.with_suffix(".body").unlink(missing_ok=True)
+                removed += 1
+            except OSError:
+                continue
+        for path in self.cache_dir.iterdir():
+            if path.suffix == ".json" or (path.suffix == ".body" and path.with_suffix(".json").exists()):
+                continue
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
+        return removed
+
+    def clear(self):
+        """清空全部缓存"""
+        if not self.cache_dir.exists():
+            return
+        for path in self.cache_dir.iterdir():
+            try:
+                path.unlink()
+            except OSError:
+                continue
+
+
+# 单例
+http_cache = HttpCache()
@@ -2,84 +2,158 @@
 掘金热榜爬虫
 使用掘金 API 获取热门文章
 """
-import uuid
-import requests
-from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Tuple
 
 from config import JUEJIN_HOT_COUNT
-from crawlers.utils import retry_on_failure, get_random_user_agent
+from crawlers.article import Article
+from crawlers.utils import safe_request, get_random_user_agent
+from crawlers.async_engine import async_request
+from crawlers.metrics import timed_parse
+from crawlers.registry import registry, Source
 
+# 掘金综合热榜 API
+JUEJIN_FEED_URL = "https://api.juejin.cn/recommend_api/v1/article/recommend_all_feed"
 
-@retry_on_failure(max_retries=3, delay=1.0)
-def crawl_juejin_hot() -> List[Dict[str, Any]]:
-    """
-    爬取掘金热榜文章
-    返回文章列表
-    """
-    # 掘金综合热榜 API
-    url = "https://api.juejin.cn/recommend_api/v1/article/recommend_all_feed"
-    payload = {
+
+# 深度爬取每页条数
+JUEJIN_DEEP_PAGE_SIZE = 20
+
+
+def _request_size(count: int) -> int:
+    """热榜中夹杂广告等非文章条目，解析时会被跳过：多请求一些，保证能取够 count 篇"""
+    return max(count * 2, JUEJIN_HOT_COUNT)
+
+
+def _build_payload(count: int, cursor: str = "0") -> Dict[str, Any]:
+    return {
         "id_type": 2,
         "sort_type": 200,  # 热门排序
-        "cursor": "0",
-        "limit": JUEJIN_HOT_COUNT
+        "cursor": cursor,
+        "limit": count
     }
-    headers = {
+
+
+def _build_headers() -> Dict[str, str]:
+    return {
         "User-Agent": get_random_user_agent(),
         "Content-Type": "application/json",
         "Origin": "https://juejin.cn",
         "Referer": "https://juejin.cn/"
     }
-    
-    response = requests.post(url, json=payload, headers=headers, timeout=30)
-    response.raise_for_status()
-    data = response.json()
-    
+
+
+def _published_at(article_info: Dict[str, Any]) -> float:
+    """文章发布时间戳（ctime 为秒级时间戳字符串）"""
+    try:
+        return float(article_info.get("ctime") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+@timed_parse
+def _parse_feed(data: Dict[str, Any], count: int, min_time: float = None) -> List[Dict[str, Any]]:
+    """
+    解析热榜 API 返回的 JSON，取够 count 篇文章后停止
+    指定 min_time 时（深度爬取）跳过更早发布的文章，并在 extra.published_at 中记录发布时间
+    """
     if data.get("err_no") != 0:
         raise ValueError(f"API返回错误: {data.get('err_msg')}")
-    
+
     articles = []
-    items = data.get("data", [])[:JUEJIN_HOT_COUNT]
-    
-    for item in items:
+    for item in data.get("data", []):
+        if len(articles) >= count:
+            break
         try:
             # API返回格式: item_type + item_info
             item_type = item.get("item_type")
             if item_type != 2:  # 2 = 文章类型
                 continue
-            
+
             item_info = item.get("item_info", {})
             article_info = item_info.get("article_info", {})
             author_info = item_info.get("author_user_info", {})
             article_id = article_info.get("article_id", "")
-            
+
             if not article_id:
                 continue
-            
-            article = {
-                "id": str(uuid.uuid4()),
-                "title": article_info.get("title", "无标题"),
-                "url": f"https://juejin.cn/post/{article_id}",
-                "source": "juejin",
-                "description": article_info.get("brief_content", "暂无摘要"),
-                "extra": {
+            if min_time is not None and _published_at(article_info) < min_time:
+                continue
+
+            article = Article(
+                article_info.get("title", "无标题"),
+                f"https://juejin.cn/post/{article_id}",
+                "juejin",
+                article_info.get("brief_content", "暂无摘要"),
+                extra={
                     "author": author_info.get("user_name", "未知"),
                     "view_count": article_info.get("view_count", 0),
                     "digg_count": article_info.get("digg_count", 0)
-                },
-                "crawl_time": datetime.now().isoformat()
-            }
+                }
+            )
+            if min_time is not None:
+                article["extra"]["published_at"] = _published_at(article_info)
             articles.append(article)
-            
+
         except Exception as e:
             print(f"[掘金] 解析条目失败: {e}")
             continue
-    
+
     print(f"[掘金] 成功爬取 {len(articles)} 篇文章")
     return articles
 
 
+def crawl_juejin_hot(count: int = JUEJIN_HOT_COUNT) -> List[Dict[str, Any]]:
+    """
+    爬取掘金热榜文章
+    返回前 count 篇文章
+    """
+    response = safe_request(
+        JUEJIN_FEED_URL, method="POST", json=_build_payload(_request_size(count)), headers=_build_headers(), timeout=30
+    )
+    return _parse_feed(response.json(), count)
+
+
+async def crawl_juejin_hot_async(count: int = JUEJIN_HOT_COUNT) -> List[Dict[str, Any]]:
+    """crawl_juejin_hot 的异步版本"""
+    response = await async_request(
+        JUEJIN_FEED_URL, method="POST", json=_build_payload(_request_size(count)), headers=_build_headers(), timeout=30
+    )
+    return _parse_feed(response.json(), count)
+
+
+def juejin_deep(state: Dict[str, Any], cutoff: float, limit: int) -> Iterator[Tuple[List[Dict[str, Any]], Dict[str, Any]]]:
+    """
+    深度爬取：沿响应中的 cursor 逐页翻阅热榜，只保留 cutoff 之后发布的文章
+    下一页的游标来自上一页的响应，只能顺序请求；热榜不严格按时间排序，整页都早于 cutoff 时停止
+    """
+    cursor = state.get("cursor", "0")
+    collected = 0
+    while collected < limit:
+        response = safe_request(
+            JUEJIN_FEED_URL, method="POST", json=_build_payload(JUEJIN_DEEP_PAGE_SIZE, cursor),
+            headers=_build_headers(), timeout=30
+        )
+        data = response.json()
+        articles = _parse_feed(data, JUEJIN_DEEP_PAGE_SIZE, min_time=cutoff)
+        collected += len(articles)
+
+        published = [
+            _published_at((item.get("item_info") or {}).get("article_info") or {})
+            for item in data.get("data") or []
+        ]
+        cursor = data.get("cursor")
+        yield articles, {"cursor": cursor}
+        if not data.get("has_more") or not cursor or not published or max(published) < cutoff:
+            return
+
+
+registry.register(Source(
+    "juejin", "掘金热榜", crawl_juejin_hot, crawl_juejin_hot_async,
+    group="extra", priority=50, quota=3, concurrency="api", interval=1800,
+    deep=juejin_deep,
+))
+
+
 if __name__ == "__main__":
     # 测试爬虫
     results = crawl_juejin_hot()
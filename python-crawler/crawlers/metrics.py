@@ -0,0 +1,261 @@
+"""
+爬取指标
+按数据源记录请求耗时、字节数、重试次数、解析耗时、产出/丢弃条目数，以及 Redis 写入耗时，
+汇总为本轮运行报告，可导出为 JSON 或 Prometheus 文本格式
+
+当前数据源通过 contextvars 传递：safe_request / async_request / 解析函数中记录的指标
+自动归属到 track_source() 所在的数据源，线程池中需用 contextvars.copy_context() 提交任务
+"""
+import json
+import time
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# 当前正在爬取的数据源
+current_source: contextvars.ContextVar[str] = contextvars.ContextVar("crawl_source", default="unknown")
+
+
+@contextmanager
+def track_source(key: str) -> Iterator[None]:
+    """在此上下文中记录的指标归属于数据源 key"""
+    token = current_source.set(key)
+    try:
+        yield
+    finally:
+        current_source.reset(token)
+
+
+def _count_items(result: Any) -> int:
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+class SourceMetrics:
+    """单个数据源的指标"""
+
+    FIELDS = (
+        "status", "error", "duration_ms",
+        "requests", "cache_hits", "fetch_ms", "fetch_max_ms", "bytes", "retries",
+        "parse_ms", "parsed", "parse_cache_hits", "items", "dropped",
+    )
+
+    def __init__(self):
+        self.status = "pending"   # pending / ok / failed / timeout
+        self.error: Optional[str] = None
+        self.duration_ms = 0.0
+        self.requests = 0
+        self.cache_hits = 0
+        self.fetch_ms = 0.0
+        self.fetch_max_ms = 0.0
+        self.bytes = 0
+        self.retries = 0
+        self.parse_ms = 0.0
+        self.parsed = 0           # 解析产出的条目数
+        self.parse_cache_hits = 0 # 复用解析结果缓存的次数
+        self.items = 0            # 数据源最终返回的条目数
+        self.dropped = 0          # 解析产出但未保留的条目数
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {field: getattr(self, field) for field in self.FIELDS}
+        for field in ("duration_ms", "fetch_ms", "fetch_max_ms", "parse_ms"):
+            data[field] = round(data[field], 2)
+        return data
+
+
+class RunMetrics:
+    """
+    一轮爬取的指标（线程安全）
+
+    Usage:
+        run_metrics.reset(mode="concurrent")
+        with track_source("github"):
+            ...
+        report = run_metrics.report()
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, mode: str = None):
+        """开始新一轮爬取"""
+        with self._lock:
+            self.mode = mode
+            self.started_at = time.time()
+            self.finished_at: Optional[float] = None
+            self.sources: Dict[str, SourceMetrics] = {}
+            self.redis: Dict[str, Any] = {}
+
+    def reset_source(self, key: str):
+        """重新开始记录数据源 key（守护进程模式下每次爬取前调用）"""
+        with self._lock:
+            self.sources[key] = SourceMetrics()
+
+    def source(self, key: str = None) -> SourceMetrics:
+        """获取数据源的指标（默认为当前数据源）"""
+        key = key or current_source.get()
+        metrics = self.sources.get(key)
+        if metrics is None:
+            with self._lock:
+                metrics = self.sources.setdefault(key, SourceMetrics())
+        return metrics
+
+    def record_fetch(self, elapsed: float, size: int, from_cache: bool = False):
+        metrics = self.source()
+        with self._lock:
+            metrics.requests += 1
+            metrics.bytes += size
+            metrics.fetch_ms += elapsed * 1000
+            metrics.fetch_max_ms = max(metrics.fetch_max_ms, elapsed * 1000)
+            if from_cache:
+                metrics.cache_hits += 1
+
+    def record_retry(self):
+        metrics = self.source()
+        with self._lock:
+            metrics.retries += 1
+
+    def record_parse(self, elapsed: float, items: int):
+        metrics = self.source()
+        with self._lock:
+            metrics.parse_ms += elapsed * 1000
+            metrics.parsed += items
+
+    def record_parse_cache_hit(self, elapsed: float, items: int):
+        """响应体未变化、直接复用解析结果（产出条目同样计入 parsed）"""
+        metrics = self.source()
+        with self._lock:
+            metrics.parse_ms += elapsed * 1000
+            metrics.parsed += items
+            metrics.parse_cache_hits += 1
+
+    def finish_source(self, key: str, elapsed: float, result: Any = None, error: BaseException = None,
+                      status: str = None, items: int = None):
+        """
+        记录数据源的结束状态；status 为 timeout 时不会被随后完成的线程覆盖
+        items 指定时作为产出条目数（结果已逐页写入、不再返回列表时使用）
+        """
+        metrics = self.source(key)
+        with self._lock:
+            if metrics.status == "timeout":
+                return
+            metrics.duration_ms = elapsed * 1000
+            if status:
+                metrics.status = status
+            elif error is not None:
+                metrics.status = "failed"
+            else:
+                metrics.status = "ok"
+            if error is not None:
+                metrics.error = str(error) or type(error).__name__
+            if status is None and error is None:
+                metrics.items = _count_items(result) if items is None else items
+                if isinstance(result, list) or items is not None:
+                    metrics.dropped = max(0, metrics.parsed - metrics.items)
+
+    def record_redis(self, operation: str, elapsed: float, count: int = 0, size: int = 0):
+        with self._lock:
+            self.redis[operation] = {
+                "elapsed_ms": round(elapsed * 1000, 2),
+                "count": count,
+                "bytes": size,
+            }
+
+    def finish(self):
+        self.finished_at = time.time()
+
+    def report(self) -> Dict[str, Any]:
+        """结构化的运行报告"""
+        finished_at = self.finished_at or time.time()
+        return {
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(),
+            "finished_at": datetime.fromtimestamp(finished_at).isoformat(),
+            "duration_ms": round((finished_at - self.started_at) * 1000, 2),
+            "mode": self.mode,
+            "sources": {key: m.to_dict() for key, m in self.sources.items() if key != "unknown"},
+            "redis": dict(self.redis),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.report(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix: str = "crawler") -> str:
+        """Prometheus 文本格式（适用于 node_exporter textfile collector）"""
+        report = self.report()
+        lines: List[str] = []
+
+        def gauge(name: str, help_text: str, samples: List[tuple]):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+                lines.append(f"{prefix}_{name}{{{label_text}}} {value}" if label_text else f"{prefix}_{name} {value}")
+
+        sources = report["sources"]
+
+        def per_source(field: str, scale: float = 1.0) -> List[tuple]:
+            return [({"source": key}, round(row[field] * scale, 6)) for key, row in sources.items()]
+
+        gauge("source_up", "1 if the source finished successfully", [
+            ({"source": key}, 1 if row["status"] == "ok" else 0) for key, row in sources.items()
+        ])
+        gauge("source_duration_seconds", "Wall time of the source", per_source("duration_ms", 0.001))
+        gauge("fetch_requests", "HTTP requests issued (including cache hits)", per_source("requests"))
+        gauge("fetch_cache_hits", "Requests served from the HTTP cache", per_source("cache_hits"))
+        gauge("fetch_seconds", "Total HTTP fetch latency", per_source("fetch_ms", 0.001))
+        gauge("fetch_max_seconds", "Slowest single HTTP fetch", per_source("fetch_max_ms", 0.001))
+        gauge("fetch_bytes", "Response bytes received", per_source("bytes"))
+        gauge("fetch_retries", "Request retries", per_source("retries"))
+        gauge("parse_seconds", "Time spent parsing responses", per_source("parse_ms", 0.001))
+        gauge("parse_cache_hits", "Responses whose parsed items were reused", per_source("parse_cache_hits"))
+        gauge("items", "Items returned by the source", per_source("items"))
+        gauge("items_dropped", "Parsed items not kept", per_source("dropped"))
+        gauge("redis_write_seconds", "Redis write latency", [
+            ({"operation": op}, round(row["elapsed_ms"] / 1000, 6)) for op, row in report["redis"].items()
+        ])
+        gauge("redis_write_bytes", "Bytes written to Redis", [
+            ({"operation": op}, row["bytes"]) for op, row in report["redis"].items()
+        ])
+        gauge("run_duration_seconds", "Wall time of the crawl run", [({}, round(report["duration_ms"] / 1000, 6))])
+        gauge("run_timestamp_seconds", "Unix time the run finished", [({}, round(self.finished_at or time.time(), 3))])
+        return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def parse_timer() -> Iterator[Dict[str, int]]:
+    """
+    记录一段解析代码的耗时，产出条目数写入 yield 的字典
+
+    Usage:
+        with parse_timer() as timer:
+            ...
+            timer["items"] += 1
+    """
+    timer = {"items": 0}
+    start = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        run_metrics.record_parse(time.perf_counter() - start, timer["items"])
+
+
+def timed_parse(func: Callable) -> Callable:
+    """解析函数装饰器：记录耗时和产出条目数（列表按长度，其他非空结果计 1）"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        run_metrics.record_parse(time.perf_counter() - start, _count_items(result))
+        return result
+    return wrapper
+
+
+# 单例
+run_metrics = RunMetrics()
@@ -0,0 +1,195 @@
+"""
+解析结果缓存
+按 (数据源, 解析后端, 解析参数, 响应体哈希) 缓存提取出的文章：页面内容与之前相同时跳过解析。
+与 HTTP 缓存互补——很多站点不返回 ETag/Last-Modified，每次都下载完整页面，但内容经常不变
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from config import (
+    PARSE_CACHE_ENABLED,
+    PARSE_CACHE_DIR,
+    PARSE_CACHE_MAX_ENTRIES,
+    PARSE_CACHE_MAX_BYTES,
+)
+from crawlers import parsing
+from crawlers.article import Article, as_dict
+from crawlers.metrics import run_metrics
+
+# 解析逻辑或文章结构变更时递增，使旧的缓存条目失效
+PARSE_CACHE_VERSION = 1
+
+# 每次使用缓存时重新生成的字段
+_VOLATILE_FIELDS = ("id", "crawl_time")
+
+
+class ParseCache:
+    """
+    解析结果缓存
+
+    内存中按 LRU 保留最近的条目，同时写入磁盘（{key}.json）供之后的进程复用（如 cron 单次运行），
+    磁盘条目按修改时间判断新旧，命中时刷新。两处都受条目数和总字节数上限约束，超出时淘汰最久未使用的条目。
+    缓存的是去掉 id / crawl_time 的文章字段，命中时重新构造 Article，调用方可以随意修改返回的文章。
+
+    Usage:
+        response = safe_request(TRENDING_URL, cache_source="github")
+        articles = parse_cache.parse("github", response, _parse_trending, count)
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = PARSE_CACHE_DIR,
+        enabled: bool = PARSE_CACHE_ENABLED,
+        max_entries: int = PARSE_CACHE_MAX_ENTRIES,
+        max_bytes: int = PARSE_CACHE_MAX_BYTES
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled and max_entries > 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(source: str, body: bytes, params: Sequence[Any] = ()) -> str:
+        """缓存键：解析参数不同（如条目数、截止日期）时结果不同，需一并计入"""
+        digest = hashlib.sha256()
+        header = [PARSE_CACHE_VERSION, source, parsing.parser_for(source), *params]
+        digest.update(json.dumps(header, ensure_ascii=False, default=str).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(body)
+        return digest.hexdigest()
+
+    def parse(
+        self,
+        source: str,
+        response,
+        parse: Callable[..., List[Dict[str, Any]]],
+        *args: Any,
+        vary: Sequence[Any] = ()
+    ) -> List[Dict[str, Any]]:
+        """
+        解析响应：响应体与缓存条目相同时直接返回缓存的文章，否则调用 parse(response.text, *args) 并写入缓存
+
+        Args:
+            source: 数据源名称
+            response: safe_request / async_request 返回的响应
+            parse: 解析函数
+            *args: 传给解析函数的其他参数（同时计入缓存键）
+            vary: 不传给解析函数、但会影响结果的值（如按当天日期过滤时传入日期）
+        """
+        if not self.enabled:
+            return parse(response.text, *args)
+
+        key = self.make_key(source, response.content, (*args, *vary))
+        start = time.perf_counter()
+        records = self.get(key)
+        if records is not None:
+            articles = [Article(**record) for record in records]
+            run_metrics.record_parse_cache_hit(time.perf_counter() - start, len(articles))
+            print(f"[ParseCache] {source} 页面未变化，复用 {len(articles)} 条解析结果")
+            return articles
+
+        articles = parse(response.text, *args)
+        self.put(key, articles)
+        return articles
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """读取缓存的文章字段，不存在或损坏时返回 None"""
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+        if payload is None:
+            path = self._path(key)
+            try:
+                payload = path.read_bytes()
+                os.utime(path)
+            except OSError:
+                return None
+            self._remember(key, payload)
+        try:
+            return json.loads(payload)
+        except ValueError:
+            return None
+
+    def put(self, key: str, articles: List[Dict[str, Any]]):
+        """写入一次解析结果"""
+        records = [
+            {k: v for k, v in as_dict(article).items() if k not in _VOLATILE_FIELDS}
+            for article in articles
+        ]
+        payload = json.dumps(records, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if len(payload) > self.max_bytes:
+            return
+        self._remember(key, payload)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(payload)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"[ParseCache] 写入缓存失败: {e}")
+            return
+        self._evict_disk()
+
+    def clear(self):
+        """清空内存与磁盘缓存"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if not self.cache_dir.exists():
+            return
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                path.unlink()
+            except OSError:
+                continue
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _remember(self, key: str, payload: bytes):
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old)
+            self._memory[key] = payload
+            self._memory_bytes += len(payload)
+            while self._memory and (len(self._memory) > self.max_entries or self._memory_bytes > self.max_bytes):
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+
+    def _evict_disk(self):
+        """按修改时间淘汰磁盘上最久未使用的条目"""
+        entries = []
+        for path in self.cache_dir.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        count = len(entries)
+        for _, size, path in entries:
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            count -= 1
+            total -= size
+
+
+# 单例
+parse_cache = ParseCache()
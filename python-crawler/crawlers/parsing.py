@@ -0,0 +1,94 @@
+"""
+HTML 解析层
+lxml 流式定向提取：边读边解析，只在目标卡片元素结束时用预编译 XPath 提取少量字段，
+取够数量后停止解析剩余内容，不构建 BeautifulSoup 文档树；可按数据源切换回 BeautifulSoup
+"""
+from typing import Callable, Iterator, Optional, Sequence
+
+from config import HTML_PARSER, HTML_PARSERS
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None  # 未安装 lxml 时回退到 BeautifulSoup
+
+PARSER_BACKENDS = ("lxml", "bs4")
+
+# 每次喂给解析器的字符数
+FEED_CHUNK_SIZE = 16 * 1024
+
+
+def parser_for(source: str) -> str:
+    """获取数据源使用的解析后端"""
+    backend = HTML_PARSERS.get(source, HTML_PARSER)
+    if backend not in PARSER_BACKENDS or (backend == "lxml" and etree is None):
+        return "bs4"
+    return backend
+
+
+def select_parser(source: str, **implementations: Callable) -> Callable:
+    """
+    按数据源配置选择解析函数
+
+    Usage:
+        parse = select_parser("github", lxml=_parse_trending_lxml, bs4=_parse_trending_bs4)
+    """
+    return implementations.get(parser_for(source)) or implementations["bs4"]
+
+
+def iter_elements(
+    html: str,
+    tags: Sequence[str],
+    match: Callable = None,
+    chunk_size: int = FEED_CHUNK_SIZE
+) -> Iterator:
+    """
+    流式解析 HTML，按元素结束的顺序产出标签在 tags 中且满足 match 的元素
+    产出时元素的子树已完整，祖先元素已创建但尚未结束；调用方停止迭代后剩余内容不再解析
+    """
+    parser = etree.HTMLPullParser(events=("end",), tag=tuple(tags))
+    for pos in range(0, len(html), chunk_size):
+        parser.feed(html[pos:pos + chunk_size])
+        for _, element in parser.read_events():
+            if match is None or match(element):
+                yield element
+    parser.close()
+    for _, element in parser.read_events():
+        if match is None or match(element):
+            yield element
+
+
+def xpath(expr: str):
+    """预编译 XPath 表达式"""
+    return etree.XPath(expr) if etree is not None else None
+
+
+def class_predicate(*names: str) -> str:
+    """生成匹配 class 中包含全部 names 的 XPath 条件（等价于 CSS 的 .a.b）"""
+    return " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in names
+    )
+
+
+def has_class(element, name: str) -> bool:
+    return name in (element.get("class") or "").split()
+
+
+def first(element, compiled) -> Optional[object]:
+    """返回 XPath 的第一个结果（文档顺序），没有时返回 None"""
+    result = compiled(element)
+    return result[0] if result else None
+
+
+def text_of(element) -> str:
+    """等价于 BeautifulSoup 的 get_text(strip=True)"""
+    if element is None:
+        return ""
+    return "".join(s.strip() for s in element.itertext())
+
+
+def raw_text_of(element) -> str:
+    """等价于 BeautifulSoup 的 get_text()"""
+    if element is None:
+        return ""
+    return "".join(element.itertext())
@@ -2,60 +2,198 @@
 AI工具聚合爬虫
 从多个AI工具聚合站点获取热门AI应用
 """
-import uuid
-from datetime import datetime
-from typing import List, Dict, Any
+import time
+import asyncio
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Awaitable, Callable, Tuple
 from bs4 import BeautifulSoup
 
-from crawlers.utils import retry_on_failure, safe_request, get_random_user_agent
+from crawlers import parsing
+from crawlers.article import Article
+from crawlers.parse_cache import parse_cache
+from crawlers.utils import safe_request, get_random_user_agent
+from crawlers.async_engine import async_request
+from crawlers.metrics import timed_parse
+from crawlers.registry import registry, Source
+from config import CRAWL_DAYS_LIMIT, AI_TOOLS_FANOUT, AI_TOOLS_HEDGE_DELAY
 
+FUTUREPEDIA_URL = "https://www.futurepedia.io/ai-tools"
+TOOLIFY_URL = "https://www.toolify.ai/Best-AI-Tools-list"
+GITHUB_AI_TOPICS_URL = "https://github.com/topics/ai?o=desc&s=updated"
 
-def crawl_ai_tools(count: int = 5, days_limit: int = 10) -> List[Dict[str, Any]]:
+
+# 回退站点，按优先级排列: (名称, 同步爬取函数, 异步爬取函数)，函数接受 (count, days_limit)
+def _fallbacks() -> List[Tuple[str, Callable[..., List[Dict[str, Any]]], Callable[..., Awaitable[List[Dict[str, Any]]]]]]:
+    return [
+        ("Futurepedia", crawl_futurepedia, crawl_futurepedia_async),
+        ("Toolify", crawl_toolify, crawl_toolify_async),
+        ("GitHub AI", lambda n, _: crawl_github_ai_topics(n), lambda n, _: crawl_github_ai_topics_async(n)),
+    ]
+
+
+def _merge_by_priority(results: Dict[int, List[Dict[str, Any]]], count: int) -> List[Dict[str, Any]]:
+    """按站点优先级拼接已完成站点的结果"""
+    articles = [article for index in sorted(results) for article in results[index]]
+    print(f"[AI工具] 共获取 {len(articles[:count])} 个AI应用")
+    return articles[:count]
+
+
+def crawl_ai_tools(
+    count: int = 5,
+    days_limit: int = 10,
+    fanout: str = AI_TOOLS_FANOUT,
+    hedge_delay: float = AI_TOOLS_HEDGE_DELAY
+) -> List[Dict[str, Any]]:
     """
     爬取多个AI工具聚合站点
     优先级：futurepedia > toolify > github-ai
+
+    Args:
+        count: 需要的工具数量
+        days_limit: 时效限制（天）
+        fanout: sequential（上一个站点结束且数量不足才尝试下一个）或 hedged（对冲并发）
+        hedge_delay: hedged 模式下，前一个站点开始后经过该秒数仍未凑够数量即启动下一个站点；
+            前面的站点都已结束时立即启动
     """
-    articles = []
-    
-    # 1. 尝试 Futurepedia (AI工具目录)
-    try:
-        futurepedia_articles = crawl_futurepedia(count, days_limit)
-        articles.extend(futurepedia_articles)
-    except Exception as e:
-        print(f"[Futurepedia] 爬取失败: {e}")
-    
-    # 2. 如果不够，尝试 Toolify
-    if len(articles) < count:
-        try:
-            toolify_articles = crawl_toolify(count - len(articles), days_limit)
-            articles.extend(toolify_articles)
-        except Exception as e:
-            print(f"[Toolify] 爬取失败: {e}")
-    
-    # 3. 如果还不够，尝试 GitHub AI topics
-    if len(articles) < count:
+    if fanout == "hedged":
+        return _crawl_ai_tools_hedged(count, days_limit, hedge_delay)
+
+    fallbacks = _fallbacks()
+    results = {}
+    for index, (name, fetch, _) in enumerate(fallbacks):
+        collected = sum(len(r) for r in results.values())
+        if collected >= count:
+            break
         try:
-            github_ai = crawl_github_ai_topics(count - len(articles))
-            articles.extend(github_ai)
+            results[index] = fetch(count - collected, days_limit)
         except Exception as e:
-            print(f"[GitHub AI] 爬取失败: {e}")
-    
-    print(f"[AI工具] 共获取 {len(articles)} 个AI应用")
-    return articles[:count]
+            print(f"[{name}] 爬取失败: {e}")
+    return _merge_by_priority(results, count)
 
 
-@retry_on_failure(max_retries=2, delay=1.0)
-def crawl_futurepedia(count: int = 5, days_limit: int = 10) -> List[Dict[str, Any]]:
+def _crawl_ai_tools_hedged(count: int, days_limit: int, hedge_delay: float) -> List[Dict[str, Any]]:
     """
-    爬取 Futurepedia.io - AI工具目录
+    对冲并发：站点按优先级依次在 hedge_delay 秒后启动（前面的站点都已结束时立即启动），
+    已完成站点的结果凑够 count 个即返回，未启动的站点不再启动，进行中的请求被放弃
     """
-    url = "https://www.futurepedia.io/ai-tools"
-    headers = {
+    fallbacks = _fallbacks()
+    results: Dict[int, List[Dict[str, Any]]] = {}
+    in_flight: Dict[Future, int] = {}
+    executor = ThreadPoolExecutor(max_workers=len(fallbacks), thread_name_prefix="ai-tools")
+    next_index, next_start = 0, time.monotonic()
+
+    try:
+        while True:
+            now = time.monotonic()
+            if next_index < len(fallbacks) and (now >= next_start or not in_flight):
+                name, fetch, _ = fallbacks[next_index]
+                if next_index:
+                    print(f"[AI工具] 启动回退站点 {name}")
+                # 在复制的上下文中运行，请求指标仍归属于当前数据源
+                in_flight[executor.submit(contextvars.copy_context().run, fetch, count, days_limit)] = next_index
+                next_index += 1
+                next_start = now + hedge_delay
+            if not in_flight:
+                break
+
+            timeout = max(0.0, next_start - now) if next_index < len(fallbacks) else None
+            done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = in_flight.pop(future)
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    print(f"[{fallbacks[index][0]}] 爬取失败: {e}")
+                    results[index] = []
+            if sum(len(r) for r in results.values()) >= count:
+                break
+    finally:
+        # 线程中的请求无法中断，不等待其结束，结果直接丢弃
+        if in_flight:
+            print(f"[AI工具] 数量已满足，放弃 {len(in_flight)} 个进行中的站点")
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return _merge_by_priority(results, count)
+
+
+async def crawl_ai_tools_async(
+    count: int = 5,
+    days_limit: int = 10,
+    fanout: str = AI_TOOLS_FANOUT,
+    hedge_delay: float = AI_TOOLS_HEDGE_DELAY
+) -> List[Dict[str, Any]]:
+    """crawl_ai_tools 的异步版本，hedged 模式下凑够数量后直接取消进行中的请求"""
+    fallbacks = _fallbacks()
+    results: Dict[int, List[Dict[str, Any]]] = {}
+
+    if fanout != "hedged":
+        for index, (name, _, fetch_async) in enumerate(fallbacks):
+            collected = sum(len(r) for r in results.values())
+            if collected >= count:
+                break
+            try:
+                results[index] = await fetch_async(count - collected, days_limit)
+            except Exception as e:
+                print(f"[{name}] 爬取失败: {e}")
+        return _merge_by_priority(results, count)
+
+    loop = asyncio.get_running_loop()
+    in_flight: Dict[asyncio.Future, int] = {}
+    next_index, next_start = 0, loop.time()
+
+    try:
+        while True:
+            now = loop.time()
+            if next_index < len(fallbacks) and (now >= next_start or not in_flight):
+                name, _, fetch_async = fallbacks[next_index]
+                if next_index:
+                    print(f"[AI工具] 启动回退站点 {name}")
+                in_flight[asyncio.ensure_future(fetch_async(count, days_limit))] = next_index
+                next_index += 1
+                next_start = now + hedge_delay
+            if not in_flight:
+                break
+
+            timeout = max(0.0, next_start - now) if next_index < len(fallbacks) else None
+            done, _ = await asyncio.wait(in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = in_flight.pop(task)
+                try:
+                    results[index] = task.result()
+                except Exception as e:
+                    print(f"[{fallbacks[index][0]}] 爬取失败: {e}")
+                    results[index] = []
+            if sum(len(r) for r in results.values()) >= count:
+                break
+    finally:
+        if in_flight:
+            print(f"[AI工具] 数量已满足，取消 {len(in_flight)} 个进行中的站点")
+        for task in in_flight:
+            task.cancel()
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+    return _merge_by_priority(results, count)
+
+
+def _build_headers() -> Dict[str, str]:
+    return {
         "User-Agent": get_random_user_agent()
     }
-    
-    response = safe_request(url, headers=headers, timeout=30)
-    soup = BeautifulSoup(response.text, "html.parser")
+
+
+def _build_tool(title: str, link: str, description: str, source: str, base_url: str) -> Article:
+    if not link.startswith("http"):
+        link = f"{base_url}{link}"
+    return Article(title, link, source, description, extra={}, ai_category="AI应用")
+
+
+def _parse_futurepedia_bs4(html: str, count: int) -> List[Dict[str, Any]]:
+    """BeautifulSoup 解析"""
+    soup = BeautifulSoup(html, "html.parser")
     articles = []
     
     # 查找工具卡片
@@ -80,44 +218,96 @@ def crawl_futurepedia(count: int = 5, days_limit: int = 10) -> List[Dict[str, An
                 link_elem = card.select_one("a")
                 link = link_elem.get("href", "") if link_elem else ""
             
-            if not link.startswith("http"):
-                link = f"https://www.futurepedia.io{link}"
-            
             # 提取描述
             desc_elem = card.select_one("p, [class*='description']")
             description = desc_elem.get_text(strip=True)[:150] if desc_elem else ""
             
-            article = {
-                "id": str(uuid.uuid4()),
-                "title": title,
-                "url": link,
-                "source": "futurepedia",
-                "description": description if description else "AI工具",
-                "extra": {},
-                "crawl_time": datetime.now().isoformat(),
-                "ai_category": "AI应用"
-            }
-            articles.append(article)
+            articles.append(_build_tool(
+                title, link, description or "AI工具", "futurepedia", "https://www.futurepedia.io"
+            ))
             
         except Exception as e:
             continue
     
-    print(f"[Futurepedia] 成功爬取 {len(articles)} 个AI工具")
     return articles
 
 
-@retry_on_failure(max_retries=2, delay=1.0)
-def crawl_toolify(count: int = 5, days_limit: int = 10) -> List[Dict[str, Any]]:
+_FP_TITLE = parsing.xpath(".//h2 | .//h3 | .//*[contains(@class, 'title')]")
+_FP_LINK = parsing.xpath(".//a")
+_FP_DESCRIPTION = parsing.xpath(".//p | .//*[contains(@class, 'description')]")
+
+
+def _is_futurepedia_card(element) -> bool:
+    if element.tag == "div":
+        return "tool-card" in (element.get("class") or "")
+    return "/tool/" in (element.get("href") or "")
+
+
+def _parse_futurepedia_lxml(html: str, count: int) -> List[Dict[str, Any]]:
     """
-    爬取 Toolify.ai - AI工具排行
+    lxml 流式解析，处理完 count * 2 张卡片后停止
+    嵌套在工具卡片内的工具链接不单独计为卡片
     """
-    url = "https://www.toolify.ai/Best-AI-Tools-list"
-    headers = {
-        "User-Agent": get_random_user_agent()
-    }
+    articles = []
+    cards = parsing.iter_elements(
+        html, ["div", "a"],
+        lambda el: _is_futurepedia_card(el) and not any(
+            _is_futurepedia_card(parent) for parent in el.iterancestors("div")
+        )
+    )
+    
+    for index, card in enumerate(cards):
+        if index >= count * 2 or len(articles) >= count:
+            break
+        try:
+            title = parsing.text_of(parsing.first(card, _FP_TITLE))
+            if not title or len(title) < 3:
+                continue
+            
+            if card.tag == "a":
+                link = card.get("href", "")
+            else:
+                link_elem = parsing.first(card, _FP_LINK)
+                link = link_elem.get("href", "") if link_elem is not None else ""
+            
+            description = parsing.text_of(parsing.first(card, _FP_DESCRIPTION))[:150]
+            
+            articles.append(_build_tool(
+                title, link, description or "AI工具", "futurepedia", "https://www.futurepedia.io"
+            ))
+            
+        except Exception as e:
+            continue
     
-    response = safe_request(url, headers=headers, timeout=30)
-    soup = BeautifulSoup(response.text, "html.parser")
+    return articles
+
+
+@timed_parse
+def _parse_futurepedia(html: str, count: int) -> List[Dict[str, Any]]:
+    """解析 Futurepedia 工具目录页（解析后端按 HTML_PARSERS 配置选择）"""
+    parse = parsing.select_parser("futurepedia", lxml=_parse_futurepedia_lxml, bs4=_parse_futurepedia_bs4)
+    articles = parse(html, count)
+    print(f"[Futurepedia] 成功爬取 {len(articles)} 个AI工具")
+    return articles
+
+
+def crawl_futurepedia(count: int = 5, days_limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    爬取 Futurepedia.io - AI工具目录
+    """
+    response = safe_request(FUTUREPEDIA_URL, headers=_build_headers(), timeout=30, cache_source="futurepedia")
+    return parse_cache.parse("futurepedia", response, _parse_futurepedia, count)
+
+
+async def crawl_futurepedia_async(count: int = 5, days_limit: int = 10) -> List[Dict[str, Any]]:
+    """crawl_futurepedia 的异步版本"""
+    response = await async_request(FUTUREPEDIA_URL, headers=_build_headers(), timeout=30, cache_source="futurepedia")
+    return parse_cache.parse("futurepedia", response, _parse_futurepedia, count)
+
+
+def _parse_toolify_bs4(html: str, count: int) -> List[Dict[str, Any]]:
+    """BeautifulSoup 解析"""
+    soup = BeautifulSoup(html, "html.parser")
     articles = []
     
     # 查找工具列表
@@ -131,42 +321,65 @@ def crawl_toolify(count: int = 5, days_limit: int = 10) -> List[Dict[str, Any]]:
             title = item.get_text(strip=True)
             if not title or len(title) < 3:
                 continue
-                
-            link = item.get("href", "")
-            if not link.startswith("http"):
-                link = f"https://www.toolify.ai{link}"
-            
-            article = {
-                "id": str(uuid.uuid4()),
-                "title": title,
-                "url": link,
-                "source": "toolify",
-                "description": "热门AI工具",
-                "extra": {},
-                "crawl_time": datetime.now().isoformat(),
-                "ai_category": "AI应用"
-            }
-            articles.append(article)
+            
+            articles.append(_build_tool(
+                title, item.get("href", ""), "热门AI工具", "toolify", "https://www.toolify.ai"
+            ))
             
         except Exception as e:
             continue
     
+    return articles
+
+
+def _parse_toolify_lxml(html: str, count: int) -> List[Dict[str, Any]]:
+    """lxml 流式解析，处理完 count * 2 个链接后停止"""
+    articles = []
+    items = parsing.iter_elements(html, ["a"], lambda el: "/ai-tool/" in (el.get("href") or ""))
+    
+    for index, item in enumerate(items):
+        if index >= count * 2 or len(articles) >= count:
+            break
+        title = parsing.text_of(item)
+        if not title or len(title) < 3:
+            continue
+        articles.append(_build_tool(
+            title, item.get("href", ""), "热门AI工具", "toolify", "https://www.toolify.ai"
+        ))
+    
+    return articles
+
+
+@timed_parse
+def _parse_toolify(html: str, count: int) -> List[Dict[str, Any]]:
+    """解析 Toolify 工具排行页（解析后端按 HTML_PARSERS 配置选择）"""
+    parse = parsing.select_parser("toolify", lxml=_parse_toolify_lxml, bs4=_parse_toolify_bs4)
+    articles = parse(html, count)
     print(f"[Toolify] 成功爬取 {len(articles)} 个AI工具")
     return articles
 
 
-@retry_on_failure(max_retries=2, delay=1.0)
-def crawl_github_ai_topics(count: int = 3) -> List[Dict[str, Any]]:
+def crawl_toolify(count: int = 5, days_limit: int = 10) -> List[Dict[str, Any]]:
     """
-    爬取 GitHub AI 主题下的热门仓库
+    爬取 Toolify.ai - AI工具排行
     """
-    url = "https://github.com/topics/ai?o=desc&s=updated"
-    headers = {
-        "User-Agent": get_random_user_agent()
-    }
-    
-    response = safe_request(url, headers=headers, timeout=30)
-    soup = BeautifulSoup(response.text, "html.parser")
+    response = safe_request(TOOLIFY_URL, headers=_build_headers(), timeout=30, cache_source="toolify")
+    return parse_cache.parse("toolify", response, _parse_toolify, count)
+
+
+async def crawl_toolify_async(count: int = 5, days_limit: int = 10) -> List[Dict[str, Any]]:
+    """crawl_toolify 的异步版本"""
+    response = await async_request(TOOLIFY_URL, headers=_build_headers(), timeout=30, cache_source="toolify")
+    return parse_cache.parse("toolify", response, _parse_toolify, count)
+
+
+def _clean_repo_title(text: str) -> str:
+    return text.replace("\n", "").replace("  ", " ")
+
+
+def _parse_github_ai_topics_bs4(html: str, count: int) -> List[Dict[str, Any]]:
+    """BeautifulSoup 解析"""
+    soup = BeautifulSoup(html, "html.parser")
     articles = []
     
     repo_links = soup.select("article h3 a")
@@ -174,32 +387,80 @@ def crawl_github_ai_topics(count: int = 3) -> List[Dict[str, Any]]:
     for link in repo_links[:count]:
         try:
             href = link.get("href", "")
-            title = link.get_text(strip=True).replace("\n", "").replace("  ", " ")
+            title = _clean_repo_title(link.get_text(strip=True))
             
             # 获取描述
             article_elem = link.find_parent("article")
             desc_elem = article_elem.select_one("p") if article_elem else None
             description = desc_elem.get_text(strip=True)[:150] if desc_elem else ""
             
-            article = {
-                "id": str(uuid.uuid4()),
-                "title": title,
-                "url": f"https://github.com{href}",
-                "source": "github-ai",
-                "description": description if description else "GitHub AI项目",
-                "extra": {},
-                "crawl_time": datetime.now().isoformat(),
-                "ai_category": "AI应用"
-            }
-            articles.append(article)
+            articles.append(_build_tool(
+                title, f"https://github.com{href}", description or "GitHub AI项目", "github-ai", ""
+            ))
             
         except Exception as e:
             continue
     
+    return articles
+
+
+_REPO_LINKS = parsing.xpath(".//h3//a")
+_REPO_DESCRIPTION = parsing.xpath(".//p")
+
+
+def _parse_github_ai_topics_lxml(html: str, count: int) -> List[Dict[str, Any]]:
+    """lxml 流式解析，取够 count 个仓库链接后停止"""
+    articles = []
+    
+    for article_elem in parsing.iter_elements(html, ["article"]):
+        if len(articles) >= count:
+            break
+        description = parsing.text_of(parsing.first(article_elem, _REPO_DESCRIPTION))[:150]
+        for link in _REPO_LINKS(article_elem):
+            if len(articles) >= count:
+                break
+            articles.append(_build_tool(
+                _clean_repo_title(parsing.text_of(link)),
+                f"https://github.com{link.get('href', '')}",
+                description or "GitHub AI项目",
+                "github-ai",
+                ""
+            ))
+    
+    return articles
+
+
+@timed_parse
+def _parse_github_ai_topics(html: str, count: int) -> List[Dict[str, Any]]:
+    """解析 GitHub AI 主题页（解析后端按 HTML_PARSERS 配置选择）"""
+    parse = parsing.select_parser("github-ai", lxml=_parse_github_ai_topics_lxml, bs4=_parse_github_ai_topics_bs4)
+    articles = parse(html, count)
     print(f"[GitHub AI] 成功爬取 {len(articles)} 个AI项目")
     return articles
 
 
+def crawl_github_ai_topics(count: int = 3) -> List[Dict[str, Any]]:
+    """
+    爬取 GitHub AI 主题下的热门仓库
+    """
+    response = safe_request(GITHUB_AI_TOPICS_URL, headers=_build_headers(), timeout=30, cache_source="github-ai")
+    return parse_cache.parse("github-ai", response, _parse_github_ai_topics, count)
+
+
+async def crawl_github_ai_topics_async(count: int = 3) -> List[Dict[str, Any]]:
+    """crawl_github_ai_topics 的异步版本"""
+    response = await async_request(GITHUB_AI_TOPICS_URL, headers=_build_headers(), timeout=30, cache_source="github-ai")
+    return parse_cache.parse("github-ai", response, _parse_github_ai_topics, count)
+
+
+# AI应用 - 多源聚合 (Futurepedia/Toolify/GitHub AI)
+registry.register(Source(
+    "ai_tools", "AI 应用工具", crawl_ai_tools, crawl_ai_tools_async,
+    group="ai", priority=10, quota=5, concurrency="scrape", interval=6 * 3600,
+    params={"days_limit": CRAWL_DAYS_LIMIT},
+))
+
+
 if __name__ == "__main__":
     results = crawl_ai_tools(5)
     for r in results:
@@ -0,0 +1,171 @@
+"""
+数据源注册表
+每个爬虫模块在导入时注册自己的数据源：名称、优先级、配额、超时和并发类别，
+main.py 按注册表调度，新增数据源只需新建模块并加入 CRAWL_SOURCE_MODULES
+
+    registry.register(Source(
+        "github", "GitHub Trending", crawl_github_trending, crawl_github_trending_async,
+        group="extra", priority=40, quota=4, concurrency="scrape", interval=3600,
+    ))
+
+配额以 count 参数传给爬取函数，由爬虫在请求和解析时只获取所需条目；
+interval 为守护进程模式（main.py --daemon）下的爬取间隔；
+shards 声明分布式模式（main.py --coordinator）下如何拆分为多个子任务；
+deep 声明深度爬取（main.py --deep）时如何逐页回溯
+"""
+import importlib
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from config import (
+    CRAWL_SOURCE_MODULES,
+    CRAWL_SOURCES_DISABLED,
+    CRAWL_SOURCE_QUOTAS,
+    CRAWL_SOURCE_INTERVALS,
+)
+
+
+class Source:
+    """数据源声明"""
+
+    def __init__(
+        self,
+        key: str,
+        label: str,
+        fetch: Callable[..., Any],
+        fetch_async: Callable[..., Awaitable[Any]],
+        group: str = "extra",
+        priority: int = 100,
+        quota: Optional[int] = None,
+        timeout: Optional[float] = None,
+        concurrency: str = "default",
+        sink: str = "articles",
+        params: Dict[str, Any] = None,
+        interval: float = 3600,
+        next_interval: Callable[[Any], Optional[float]] = None,
+        on_start: Callable[[], None] = None,
+        shards: Callable[[Dict[str, Any]], List[Dict[str, Any]]] = None,
+        deep: Callable[[Dict[str, Any], float, int], Iterator[Tuple[List[Any], Dict[str, Any]]]] = None
+    ):
+        """
+        Args:
+            key: 数据源标识（用于日志、指标、缓存和配置覆盖）
+            label: 显示名称
+            fetch / fetch_async: 同步 / 异步爬取函数，接受 count 和 params 中的参数
+            group: 分组，ai = AI内容（优先），extra = 补充来源
+            priority: 调度与合并顺序，数值越小越靠前
+            quota: 本数据源保留的条目数，作为 count 传给爬取函数；None 表示不传
+            timeout: 单源超时（秒），None 使用全局的单源超时
+            concurrency: 并发类别，同类数据源共享 CRAWL_CONCURRENCY_LIMITS 中的并发上限
+            sink: 结果去向，articles 为文章列表，其他值由调用方按名称处理（如 football）
+            params: 传给爬取函数的其他参数
+            interval: 守护进程模式下的爬取间隔（秒）
+            next_interval: 根据本次结果计算下次间隔，返回 None 时使用 interval
+            on_start: 每次爬取前调用（如清空跨次运行的缓存）
+            shards: 根据爬取参数返回各子任务的参数覆盖（可 JSON 序列化），
+                子任务结果按顺序拼接、按 URL 去重后截取配额；None 表示不拆分
+            deep: 深度爬取生成器，接受 (断点状态, 截止时间戳, 条目上限)，
+                每页产出 (文章列表, 新的断点状态)；断点状态需可 JSON 序列化，空字典表示从头开始
+        """
+        self.key = key
+        self.label = label
+        self.fetch = fetch
+        self.fetch_async = fetch_async
+        self.group = group
+        self.priority = priority
+        self.quota = CRAWL_SOURCE_QUOTAS.get(key, quota)
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.sink = sink
+        self.params = dict(params or {})
+        self.interval = CRAWL_SOURCE_INTERVALS.get(key, interval)
+        self._next_interval = next_interval
+        self.on_start = on_start
+        self._shards = shards
+        self._deep = deep
+
+    def _kwargs(self) -> Dict[str, Any]:
+        kwargs = dict(self.params)
+        if self.quota is not None:
+            kwargs["count"] = self.quota
+        return kwargs
+
+    def run(self, **overrides) -> Any:
+        """运行爬取函数，overrides 覆盖默认参数（如子任务参数）"""
+        if self.on_start:
+            self.on_start()
+        return self.fetch(**dict(self._kwargs(), **overrides))
+
+    async def run_async(self) -> Any:
+        if self.on_start:
+            self.on_start()
+        return await self.fetch_async(**self._kwargs())
+
+    def shards(self) -> List[Dict[str, Any]]:
+        """分布式模式下的子任务参数覆盖列表，不拆分时只有一个空覆盖"""
+        if self._shards is None or self.sink != "articles":
+            return [{}]
+        return self._shards(self._kwargs()) or [{}]
+
+    @property
+    def supports_deep(self) -> bool:
+        return self._deep is not None
+
+    def deep_pages(self, state: Dict[str, Any], cutoff: float, limit: int) -> Iterator[Tuple[List[Any], Dict[str, Any]]]:
+        """逐页深度爬取，从断点状态 state 继续，只收集 cutoff 之后发布的条目"""
+        if self._deep is None:
+            raise ValueError(f"数据源 {self.key} 不支持深度爬取")
+        if self.on_start:
+            self.on_start()
+        return self._deep(state, cutoff, limit)
+
+    def interval_after(self, result: Any) -> float:
+        """本次爬取结束后到下次爬取的间隔（秒）"""
+        if self._next_interval is not None and result is not None:
+            interval = self._next_interval(result)
+            if interval is not None:
+                return interval
+        return self.interval
+
+    def __repr__(self) -> str:
+        return f"Source({self.key!r}, priority={self.priority}, quota={self.quota})"
+
+
+class SourceRegistry:
+    """数据源注册表"""
+
+    def __init__(self):
+        self._sources: Dict[str, Source] = {}
+        self._loaded = False
+
+    def register(self, source: Source) -> Source:
+        """注册数据源，同名数据源后注册的覆盖先注册的"""
+        self._sources[source.key] = source
+        return source
+
+    def load(self, modules: List[str] = None):
+        """导入爬虫模块，模块在导入时注册各自的数据源"""
+        for name in modules or CRAWL_SOURCE_MODULES:
+            importlib.import_module(name)
+        self._loaded = True
+
+    def get(self, key: str) -> Optional[Source]:
+        if not self._loaded:
+            self.load()
+        return self._sources.get(key)
+
+    def sources(self, sink: str = None, include_disabled: bool = False) -> List[Source]:
+        """按优先级排序的数据源列表，可按 sink 过滤"""
+        if not self._loaded:
+            self.load()
+        return sorted(
+            (
+                s for s in self._sources.values()
+                if (sink is None or s.sink == sink)
+                and (include_disabled or s.key not in CRAWL_SOURCES_DISABLED)
+            ),
+            key=lambda s: s.priority
+        )
+
+
+# 单例
+registry = SourceRegistry()
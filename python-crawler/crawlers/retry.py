@@ -0,0 +1,187 @@
+"""
+请求级重试引擎
+区分可恢复错误（超时、连接失败、429/5xx）与永久错误（其他 4xx、解析错误），
+遵守 Retry-After，并以每轮爬取共享的重试时间预算限制总等待时间
+"""
+import time
+import random
+import asyncio
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Any, Optional, Awaitable
+
+import requests
+
+from config import (
+    RETRY_MAX_RETRIES,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    RETRY_BUDGET_SECONDS,
+)
+from crawlers.metrics import run_metrics
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# 可重试的 HTTP 状态码
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头（秒数或 HTTP 日期），返回需要等待的秒数"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """判断异常是否为可恢复的临时错误"""
+    if isinstance(exc, requests.HTTPError):
+        response = exc.response
+        return response is not None and response.status_code in RETRYABLE_STATUS
+    if isinstance(exc, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+        return True
+    if isinstance(exc, asyncio.TimeoutError):
+        return True
+    if aiohttp is not None and isinstance(exc, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)):
+        return True
+    return False
+
+
+def _retry_after_of(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    return parse_retry_after((response.headers or {}).get("Retry-After"))
+
+
+class RetryBudget:
+    """
+    重试时间预算（线程安全）
+    一轮爬取内所有请求的重试等待时间之和不超过 total 秒，
+    耗尽后不再重试，避免个别不稳定的数据源拖慢整轮爬取
+    """
+
+    def __init__(self, total: float = RETRY_BUDGET_SECONDS):
+        self.total = total
+        self.spent = 0.0
+        self._lock = threading.Lock()
+
+    def reset(self, total: float = None):
+        """开始新一轮爬取时重置预算"""
+        with self._lock:
+            if total is not None:
+                self.total = total
+            self.spent = 0.0
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.total - self.spent)
+
+    def try_spend(self, seconds: float) -> bool:
+        """预算足够时扣除 seconds 并返回 True"""
+        with self._lock:
+            if self.spent + seconds > self.total:
+                return False
+            self.spent += seconds
+            return True
+
+
+class RetryPolicy:
+    """
+    重试策略：指数退避 + 全抖动，优先使用服务端的 Retry-After
+
+    Usage:
+        response = retry_policy.call(lambda: session.get(url))
+        response = await retry_policy.call_async(lambda: fetch(url))
+    """
+
+    def __init__(
+        self,
+        max_retries: int = RETRY_MAX_RETRIES,
+        base_delay: float = RETRY_BASE_DELAY,
+        max_delay: float = RETRY_MAX_DELAY,
+        budget: RetryBudget = None
+    ):
+        """
+        Args:
+            max_retries: 单个请求的最大重试次数
+            base_delay: 首次重试的基础延迟（秒）
+            max_delay: 单次等待上限；Retry-After 超过该值时直接放弃
+            budget: 共享的重试时间预算
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    def next_delay(self, exc: BaseException, attempt: int, max_retries: int = None) -> Optional[float]:
+        """
+        计算第 attempt 次（从 0 开始）失败后的等待时间
+        max_retries 为单次调用的重试上限（默认使用策略的 max_retries）
+        返回 None 表示不应重试
+        """
+        if max_retries is None:
+            max_retries = self.max_retries
+        if attempt >= max_retries or not is_retryable(exc):
+            return None
+        retry_after = _retry_after_of(exc)
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                return None
+            delay = retry_after
+        else:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if self.budget is not None and not self.budget.try_spend(delay):
+            print(f"  ✗ 重试预算已用尽 ({self.budget.total:g}s)，放弃重试")
+            return None
+        return delay
+
+    def call(self, func: Callable[[], Any], retries: int = None) -> Any:
+        """执行 func，可恢复错误时按策略重试"""
+        max_retries = self.max_retries if retries is None else retries
+        attempt = 0
+        while True:
+            try:
+                return func()
+            except Exception as e:
+                delay = self.next_delay(e, attempt, max_retries)
+                if delay is None:
+                    raise
+                print(f"  ⚠ 第 {attempt + 1} 次尝试失败: {e}，{delay:.1f} 秒后重试")
+                run_metrics.record_retry()
+                time.sleep(delay)
+                attempt += 1
+
+    async def call_async(self, func: Callable[[], Awaitable[Any]], retries: int = None) -> Any:
+        """call 的异步版本，func 每次调用返回一个新的协程"""
+        max_retries = self.max_retries if retries is None else retries
+        attempt = 0
+        while True:
+            try:
+                return await func()
+            except Exception as e:
+                delay = self.next_delay(e, attempt, max_retries)
+                if delay is None:
+                    raise
+                print(f"  ⚠ 第 {attempt + 1} 次尝试失败: {e}，{delay:.1f} 秒后重试")
+                run_metrics.record_retry()
+                await asyncio.sleep(delay)
+                attempt += 1
+
+
+# 单例：每轮爬取共享同一个预算
+retry_budget = RetryBudget()
+retry_policy = RetryPolicy(budget=retry_budget)
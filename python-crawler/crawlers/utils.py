@@ -1,12 +1,32 @@
 """
 爬虫通用工具模块
-提供重试装饰器、随机 User-Agent、请求工具等
+提供请求级重试、随机 User-Agent、共享 HTTP 会话、按主机限流、请求工具等
 """
 import random
 import time
+import uuid
+import asyncio
 import functools
-from typing import Callable, Any, List
+import threading
+from typing import Callable, Any, List, Optional, Dict, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from config import (
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_POOL_BLOCK,
+    HTTP_TRANSPORT_RETRIES,
+    RATE_LIMIT_DEFAULT,
+    RATE_LIMITS,
+    RATE_LIMIT_ADAPTIVE,
+)
+from crawlers.http_cache import http_cache, CacheEntry
+from crawlers.metrics import run_metrics
+from crawlers.retry import RetryPolicy, retry_policy, retry_budget, parse_retry_after
 
 
 # === 随机 User-Agent 池 ===
@@ -35,6 +55,40 @@ def get_random_user_agent() -> str:
     return random.choice(USER_AGENTS)
 
 
+# 规范化 URL 时去掉的跟踪参数（utm_* 另行处理）
+TRACKING_PARAMS = {"ref", "ref_src", "fbclid", "gclid", "spm", "from"}
+
+
+def normalize_url(url: str) -> str:
+    """
+    规范化 URL，用于判断两个链接是否指向同一内容
+    - 统一为 https、小写主机名、去掉 www. 和默认端口
+    - 去掉末尾斜杠、片段 (#...) 和跟踪参数，查询参数按名称排序
+    """
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    if scheme == "http":
+        scheme = "https"
+    
+    host = parts.netloc.lower()
+    if host.endswith(":443") or host.endswith(":80"):
+        host = host.rsplit(":", 1)[0]
+    if host.startswith("www."):
+        host = host[4:]
+    
+    path = parts.path.rstrip("/") or "/"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def article_id_for_url(url: str) -> str:
+    """根据规范化 URL 生成稳定的文章 ID（UUID5），同一链接多次爬取得到相同 ID"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, normalize_url(url)))
+
+
 def get_default_headers() -> dict:
     """获取带随机 UA 的默认请求头"""
     return {
@@ -47,72 +101,178 @@ def get_default_headers() -> dict:
     }
 
 
+class SessionManager:
+    """
+    进程级 HTTP 会话管理器
+    所有爬虫共享同一个 requests.Session，每个主机一个连接池，连接通过 keep-alive 复用
+    
+    Usage:
+        session = get_session()
+        response = session.get(url, timeout=10)
+    """
+    
+    def __init__(
+        self,
+        pool_connections: int = HTTP_POOL_CONNECTIONS,
+        pool_maxsize: int = HTTP_POOL_MAXSIZE,
+        pool_block: bool = HTTP_POOL_BLOCK,
+        transport_retries: int = HTTP_TRANSPORT_RETRIES
+    ):
+        """
+        Args:
+            pool_connections: 缓存的主机连接池数量
+            pool_maxsize: 每个主机连接池的最大连接数
+            pool_block: 连接数达到上限时是否等待空闲连接（即严格限制单主机连接数）
+            transport_retries: 建立连接失败时由 urllib3 执行的重试次数（与请求级重试相乘）
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.transport_retries = transport_retries
+        self._session: Optional[requests.Session] = None
+        self._lock = threading.Lock()
+    
+    def _build_session(self) -> requests.Session:
+        # 仅重试连接建立失败（请求尚未发出）；读取失败和状态码错误交给请求级重试
+        retries = Retry(
+            total=self.transport_retries,
+            connect=self.transport_retries,
+            read=0,
+            status=0,
+            backoff_factor=0.3,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+            max_retries=retries
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+    
+    def get_session(self) -> requests.Session:
+        """获取共享会话（首次调用时创建）"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._build_session()
+        return self._session
+    
+    def close(self):
+        """关闭共享会话及其连接池"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+# 单例
+session_manager = SessionManager()
+
+
+def get_session() -> requests.Session:
+    """获取进程级共享的 requests.Session"""
+    return session_manager.get_session()
+
+
 def retry_on_failure(
     max_retries: int = 3,
     delay: float = 1.0,
-    backoff: float = 2.0,
-    exceptions: tuple = (requests.RequestException, Exception)
+    max_delay: float = None
 ) -> Callable:
     """
-    重试装饰器
+    重试装饰器（仅重试超时、连接失败、429/5xx 等可恢复错误）
+    爬虫请求已在 safe_request 中按请求重试，本装饰器用于其他需要重试的调用
     
     Args:
         max_retries: 最大重试次数
-        delay: 初始延迟（秒）
-        backoff: 退避倍数
-        exceptions: 需要重试的异常类型
+        delay: 初始延迟（秒），之后指数退避
+        max_delay: 单次等待上限（默认读取配置）
     
     Usage:
         @retry_on_failure(max_retries=3, delay=1.0)
-        def my_crawler():
+        def my_task():
             ...
     """
+    policy = RetryPolicy(
+        max_retries=max_retries,
+        base_delay=delay,
+        max_delay=max_delay or retry_policy.max_delay,
+        budget=retry_budget
+    )
+    
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         def wrapper(*args, **kwargs) -> Any:
-            last_exception = None
-            current_delay = delay
-            
-            for attempt in range(max_retries + 1):
-                try:
-                    return func(*args, **kwargs)
-                except exceptions as e:
-                    last_exception = e
-                    if attempt < max_retries:
-                        # 添加随机抖动避免雷同请求
-                        jitter = random.uniform(0.5, 1.5)
-                        sleep_time = current_delay * jitter
-                        print(f"  ⚠ 第 {attempt + 1} 次尝试失败: {e}")
-                        print(f"  ⏳ {sleep_time:.1f} 秒后重试...")
-                        time.sleep(sleep_time)
-                        current_delay *= backoff
-                    else:
-                        print(f"  ✗ 已达最大重试次数 ({max_retries})")
-            
-            raise last_exception
+            return policy.call(lambda: func(*args, **kwargs))
         return wrapper
     return decorator
 
 
+def async_retry_on_failure(
+    max_retries: int = 3,
+    delay: float = 1.0,
+    max_delay: float = None
+) -> Callable:
+    """
+    异步版重试装饰器，用于 async def 函数
+    参数与 retry_on_failure 相同，等待时使用 asyncio.sleep 不阻塞事件循环
+    """
+    policy = RetryPolicy(
+        max_retries=max_retries,
+        base_delay=delay,
+        max_delay=max_delay or retry_policy.max_delay,
+        budget=retry_budget
+    )
+    
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            return await policy.call_async(lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
+
+
+def _response_from_cache(entry: CacheEntry) -> requests.Response:
+    """用缓存条目构造 Response 对象"""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = entry.content
+    response.headers = CaseInsensitiveDict(entry.headers)
+    response.url = entry.url
+    response.encoding = entry.encoding
+    response.from_cache = True
+    return response
+
+
 def safe_request(
     url: str,
     method: str = "GET",
     timeout: int = 30,
     headers: dict = None,
+    cache_source: str = None,
+    cache_ttl: int = None,
+    retries: int = None,
     **kwargs
 ) -> requests.Response:
     """
-    安全的 HTTP 请求封装
+    安全的 HTTP 请求封装（使用共享会话复用连接，按请求重试可恢复错误）
     
     Args:
         url: 请求 URL
         method: HTTP 方法
         timeout: 超时时间（秒）
         headers: 自定义请求头（会与默认头合并）
+        cache_source: 数据源名称；指定时 GET 请求走 HTTP 缓存，新鲜期按数据源配置
+        cache_ttl: 覆盖本次请求的缓存新鲜期（秒）
+        retries: 最大重试次数（默认读取 RETRY_MAX_RETRIES）
         **kwargs: 其他 requests 参数
     
     Returns:
-        Response 对象
+        Response 对象（命中缓存时 from_cache 为 True）
     
     Raises:
         requests.RequestException: 请求失败时抛出
@@ -122,44 +282,196 @@ def safe_request(
     if headers:
         final_headers.update(headers)
     
-    response = requests.request(
-        method=method,
-        url=url,
-        headers=final_headers,
-        timeout=timeout,
-        **kwargs
-    )
-    response.raise_for_status()
+    # HTTP 缓存：新鲜期内直接返回，过期则带上校验器发送条件请求
+    cache_key = entry = None
+    if cache_source and method.upper() == "GET" and http_cache.enabled:
+        cache_key = http_cache.make_key(method, url, kwargs.get("params"))
+        entry = http_cache.get(cache_key)
+        if entry is not None:
+            ttl = http_cache.ttl_for(cache_source) if cache_ttl is None else cache_ttl
+            if entry.is_fresh(ttl):
+                run_metrics.record_fetch(0.0, len(entry.content), from_cache=True)
+                return _response_from_cache(entry)
+            final_headers.update(entry.conditional_headers())
+    
+    def send() -> requests.Response:
+        # 按主机限流（缓存命中时不占用令牌，每次重试重新获取）
+        rate_limiter.acquire(url)
+        resp = get_session().request(
+            method=method,
+            url=url,
+            headers=final_headers,
+            timeout=timeout,
+            **kwargs
+        )
+        rate_limiter.on_response(url, resp.status_code, resp.headers)
+        if entry is None or resp.status_code != 304:
+            resp.raise_for_status()
+        return resp
+    
+    start = time.perf_counter()
+    response = None
+    try:
+        response = retry_policy.call(send, retries=retries)
+    finally:
+        run_metrics.record_fetch(
+            time.perf_counter() - start,
+            len(response.content) if response is not None else 0,
+            from_cache=response is not None and response.status_code == 304
+        )
+    
+    if entry is not None and response.status_code == 304:
+        http_cache.touch(entry, cache_key, response.headers)
+        return _response_from_cache(entry)
+    
+    if cache_key is not None and response.status_code == 200:
+        http_cache.put(cache_key, response.url, response.headers, response.content, response.encoding)
     return response
 
 
-class RateLimiter:
+class TokenBucket:
     """
-    简单的请求频率限制器
+    令牌桶（线程安全，同时支持 asyncio）
+    
+    每个请求预留一个令牌：令牌不足时计算需要等待的时间后再睡眠，
+    锁只在计算时持有，因此多个线程/协程可以同时排队等待
+    """
+    
+    def __init__(self, rate: float, capacity: float):
+        """
+        Args:
+            rate: 每秒补充的令牌数（即稳态请求速率）
+            capacity: 桶容量（允许的突发请求数）
+        """
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def reserve(self) -> float:
+        """预留一个令牌，返回需要等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+    
+    def acquire(self):
+        """获取一个令牌（阻塞当前线程）"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+    
+    async def acquire_async(self):
+        """获取一个令牌（不阻塞事件循环）"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+    
+    def block_for(self, seconds: float):
+        """在接下来的 seconds 秒内暂停发放令牌"""
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+    
+    def slow_down(self, factor: float = 0.5, floor: float = 0.05):
+        """降低速率（乘性减）"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.base_rate * floor, self.rate * factor)
+    
+    def recover(self, step: float = 0.1):
+        """逐步恢复到配置速率（加性增）"""
+        if self.rate >= self.base_rate:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.base_rate, self.rate + self.base_rate * step)
+
+
+class HostRateLimiter:
+    """
+    按主机共享的令牌桶限流器
+    所有爬虫（包括足球 API 客户端）通过 safe_request / async_request 共用，
+    同一主机的请求无论来自哪个线程或协程都受同一个令牌桶约束
     
     Usage:
-        limiter = RateLimiter(min_interval=1.0)
-        for url in urls:
-            limiter.wait()
-            response = requests.get(url)
+        rate_limiter.acquire(url)
+        response = session.get(url)
+        rate_limiter.on_response(url, response.status_code, response.headers)
     """
     
-    def __init__(self, min_interval: float = 1.0):
+    def __init__(
+        self,
+        default_limit: Tuple[float, float] = RATE_LIMIT_DEFAULT,
+        host_limits: Dict[str, Tuple[float, float]] = None,
+        adaptive: bool = RATE_LIMIT_ADAPTIVE
+    ):
         """
         Args:
-            min_interval: 最小请求间隔（秒）
+            default_limit: 未单独配置的主机使用的 (每秒请求数, 突发容量)
+            host_limits: 按主机配置的 (每秒请求数, 突发容量)
+            adaptive: 收到 429/503 时是否自动降速，并在成功后逐步恢复
         """
-        self.min_interval = min_interval
-        self.last_request_time = 0.0
+        self.default_limit = default_limit
+        self.host_limits = dict(RATE_LIMITS if host_limits is None else host_limits)
+        self.adaptive = adaptive
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+    
+    def configure(self, default_limit: Tuple[float, float] = None, host_limits: Dict[str, Tuple[float, float]] = None):
+        """更新限流配置并丢弃已有的令牌桶"""
+        with self._lock:
+            if default_limit is not None:
+                self.default_limit = default_limit
+            if host_limits is not None:
+                self.host_limits = dict(host_limits)
+            self._buckets.clear()
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        """获取 URL 所属主机的令牌桶"""
+        host = urlsplit(url).hostname or url
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(host)
+                if bucket is None:
+                    rate, burst = self.host_limits.get(host, self.default_limit)
+                    bucket = TokenBucket(rate, burst)
+                    self._buckets[host] = bucket
+        return bucket
     
-    def wait(self):
-        """等待到下一个可请求时间"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_interval:
-            # 添加随机抖动
-            sleep_time = self.min_interval - elapsed + random.uniform(0.1, 0.5)
-            time.sleep(sleep_time)
-        self.last_request_time = time.time()
+    def acquire(self, url: str):
+        self.bucket_for(url).acquire()
+    
+    async def acquire_async(self, url: str):
+        await self.bucket_for(url).acquire_async()
+    
+    def on_response(self, url: str, status_code: int, headers=None):
+        """根据响应状态调整限流：429/503 时按 Retry-After 暂停并降速，成功时逐步恢复"""
+        bucket = self.bucket_for(url)
+        if status_code in (429, 503):
+            retry_after = parse_retry_after((headers or {}).get("Retry-After"))
+            if retry_after is not None:
+                bucket.block_for(retry_after)
+            if self.adaptive:
+                bucket.slow_down()
+            host = urlsplit(url).hostname
+            print(f"  ⚠ [{host}] 返回 {status_code}，降速至 {bucket.rate:.2f} 次/秒"
+                  + (f"，暂停 {retry_after:.0f} 秒" if retry_after else ""))
+        elif self.adaptive and status_code < 400:
+            bucket.recover()
+
+
+# 单例
+rate_limiter = HostRateLimiter()
 
 
 # === 测试代码 ===
@@ -174,7 +486,7 @@ if __name__ == "__main__":
     def test_function():
         print("  尝试执行...")
         if random.random() < 0.7:
-            raise Exception("模拟失败")
+            raise requests.ConnectionError("模拟连接失败")
         return "成功!"
     
     try:
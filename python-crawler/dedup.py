@@ -0,0 +1,405 @@
+"""
+跨数据源近似重复检测
+同一条资讯常同时出现在 HN、GitHub Trending、GitHub AI Topics 和 HF Papers 上，
+写入 Redis 之前按簇合并，Java 端不必为每个副本都调用一次 LLM
+
+- 规范化链接：arXiv abs/pdf 与 HF 论文页归为同一篇论文，GitHub 链接归为仓库
+- 标题 + 描述计算 64 位 SimHash，汉明距离不超过阈值的不同来源文章视为近似重复
+- SimHash 按分段存入 Redis 分桶（鸽巢原理：距离 ≤ d 时 d+1 段中至少一段完全相同），
+  查找只读取同桶候选，耗时与历史规模无关；一批文章的查找合并为两次往返
+- 同一批内的副本合并到优先级最高的文章（extra.duplicates 记录其他来源）；
+  增量模式下与今天已写入的文章重复的副本直接丢弃，记入簇成员，代表文章再次写入时一并带上
+
+Redis 结构：
+    {prefix}:dedup:cluster          HASH  簇 ID -> 代表文章 JSON（simhash / id / source / url / day / canon）
+    {prefix}:dedup:canon            HASH  规范化链接 -> 簇 ID
+    {prefix}:dedup:band:{i}:{value} SET   第 i 段 SimHash 为 value 的簇 ID
+    {prefix}:dedup:members:{簇 ID}  HASH  被合并的文章 ID -> {source, url}
+    {prefix}:dedup:timeline         ZSET  member=簇 ID, score=最近一次出现时间戳
+"""
+import re
+import json
+import time
+import hashlib
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from config import REDIS_KEY_PREFIX, DEDUP_SIMHASH_DISTANCE, DEDUP_MIN_TOKENS, DEDUP_RETENTION_DAYS
+from crawlers.utils import normalize_url, article_id_for_url
+from redis_client import RedisClient, redis_client
+
+DEDUP_PREFIX = f"{REDIS_KEY_PREFIX}:dedup"
+
+# arXiv 论文编号（新格式），如 2401.01234v2
+ARXIV_ID = re.compile(r"(\d{4}\.\d{4,5})(?:v\d+)?")
+# github.com 下不是仓库的一级路径
+GITHUB_RESERVED = {
+    "topics", "trending", "orgs", "search", "features", "marketplace", "sponsors",
+    "collections", "explore", "settings", "login", "about", "pricing", "enterprise",
+}
+
+# 英文单词或连续汉字
+_TOKEN = re.compile(r"[a-z]+|[一-鿿]+")
+# 不参与指纹的常见词（含 HN / GitHub 描述中的固定字段）
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "by", "is", "are",
+    "at", "as", "from", "this", "that", "it", "its", "be", "we", "our", "your", "you", "how",
+    "score", "comments", "stars", "today", "star", "forks",
+}
+
+
+def canonical_url(url: str) -> str:
+    """
+    判断重复用的规范化链接
+    arxiv.org/abs/2401.01234v2、arxiv.org/pdf/2401.01234、huggingface.co/papers/2401.01234 -> arxiv:2401.01234
+    github.com/Owner/Repo/tree/main -> github:owner/repo
+    其他链接使用 normalize_url 的结果
+    """
+    normalized = normalize_url(url)
+    parts = urlsplit(normalized)
+    host, path = parts.netloc, parts.path
+
+    if (host.endswith("arxiv.org") and path.startswith(("/abs/", "/pdf/"))) or \
+            (host == "huggingface.co" and path.startswith("/papers/")):
+        match = ARXIV_ID.search(path)
+        if match:
+            return f"arxiv:{match.group(1)}"
+
+    if host == "github.com":
+        segments = [s for s in path.split("/") if s]
+        if len(segments) >= 2 and segments[0].lower() not in GITHUB_RESERVED:
+            repo = segments[1][:-4] if segments[1].endswith(".git") else segments[1]
+            return f"github:{segments[0]}/{repo}".lower()
+
+    return normalized
+
+
+def _features(title: str, description: str) -> Counter:
+    """指纹特征：英文单词、汉字二元组，标题权重为 2"""
+    features: Counter = Counter()
+    for text, weight in ((title, 2), (description, 1)):
+        for token in _TOKEN.findall((text or "").lower()):
+            if token[0] >= "一":
+                grams = [token[i:i + 2] for i in range(max(1, len(token) - 1))]
+            elif len(token) > 1 and token not in STOPWORDS:
+                grams = [token]
+            else:
+                continue
+            for gram in grams:
+                features[gram] += weight
+    return features
+
+
+def simhash(features: Counter) -> int:
+    """64 位 SimHash"""
+    weights = [0] * 64
+    for feature, weight in features.items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for i in range(64):
+            weights[i] += weight if h >> i & 1 else -weight
+    return sum(1 << i for i in range(64) if weights[i] > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class _Entry:
+    """一篇待处理文章的指纹"""
+
+    __slots__ = ("article", "article_id", "source", "canon", "simhash", "bands")
+
+    def __init__(self, article: Dict[str, Any], bands: int, min_tokens: int):
+        self.article = article
+        self.article_id = article_id_for_url(article.get("url", ""))
+        self.source = article.get("source", "")
+        self.canon = canonical_url(article.get("url", ""))
+        features = _features(article.get("title", ""), article.get("description", ""))
+        # 特征太少的短标题 SimHash 不可靠，只按链接判断
+        self.simhash = simhash(features) if len(features) >= min_tokens else None
+        self.bands = _split_bands(self.simhash, bands) if self.simhash is not None else []
+
+
+def _split_bands(value: int, bands: int) -> List[str]:
+    """SimHash 分段，返回 ["{段号}:{段值}", ...]"""
+    width = 64 // bands
+    mask = (1 << width) - 1
+    return [f"{i}:{(value >> (i * width)) & mask:x}" for i in range(bands)]
+
+
+class DedupIndex:
+    """
+    近似重复索引
+
+    Usage:
+        articles = dedup_index.process(articles, drop_indexed=incremental)
+        dedup_index.compact()
+    """
+
+    def __init__(
+        self,
+        client: RedisClient = redis_client,
+        max_distance: int = DEDUP_SIMHASH_DISTANCE,
+        min_tokens: int = DEDUP_MIN_TOKENS,
+        retention_days: int = DEDUP_RETENTION_DAYS
+    ):
+        """
+        Args:
+            client: Redis 客户端封装
+            max_distance: 汉明距离不超过该值视为近似重复（0-15）
+            min_tokens: 特征数少于该值时不计算 SimHash
+            retention_days: 簇的保留天数
+        """
+        self.redis = client.client
+        self.max_distance = max(0, min(max_distance, 15))
+        self.bands = self.max_distance + 1
+        self.min_tokens = min_tokens
+        self.retention_days = retention_days
+        # 最近一次 process 的统计: total / merged / dropped / elapsed_ms
+        self.last_stats: Dict[str, Any] = {}
+
+    @property
+    def retention_seconds(self) -> int:
+        return self.retention_days * 86400
+
+    @staticmethod
+    def _band_key(band: str) -> str:
+        return f"{DEDUP_PREFIX}:band:{band}"
+
+    @staticmethod
+    def _members_key(cluster_id: str) -> str:
+        return f"{DEDUP_PREFIX}:members:{cluster_id}"
+
+    def _lookup(self, entries: List[_Entry]) -> Tuple[Dict[str, str], Dict[str, Dict[str, Any]]]:
+        """
+        查询已有索引（两次往返）
+        返回 (规范化链接 -> 簇 ID, 簇 ID -> 代表文章信息)
+        """
+        canons = list({e.canon for e in entries})
+        bands = list({band for e in entries for band in e.bands})
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hmget(f"{DEDUP_PREFIX}:canon", canons)
+        for band in bands:
+            pipe.smembers(self._band_key(band))
+        replies = pipe.execute()
+
+        canon_map = {canon: cid for canon, cid in zip(canons, replies[0]) if cid}
+        candidates = set(canon_map.values())
+        for members in replies[1:]:
+            candidates.update(members)
+        if not candidates:
+            return canon_map, {}
+
+        ids = list(candidates)
+        clusters = {
+            cid: json.loads(raw)
+            for cid, raw in zip(ids, self.redis.hmget(f"{DEDUP_PREFIX}:cluster", ids))
+            if raw
+        }
+        return canon_map, clusters
+
+    def _match(
+        self,
+        entry: _Entry,
+        canon_map: Dict[str, str],
+        clusters: Dict[str, Dict[str, Any]],
+        band_index: Dict[str, Set[str]]
+    ) -> Optional[str]:
+        """查找文章所属的簇：先按规范化链接，再按 SimHash（只匹配不同来源的代表文章）"""
+        cid = canon_map.get(entry.canon)
+        if cid is not None and cid in clusters:
+            return cid
+        if entry.simhash is None:
+            return None
+
+        best, best_distance = None, self.max_distance + 1
+        candidates = set()
+        for band in entry.bands:
+            candidates |= band_index.get(band, set())
+        for cid in candidates:
+            cluster = clusters.get(cid)
+            if not cluster or cluster.get("simhash") is None or cluster["source"] == entry.source:
+                continue
+            distance = hamming(entry.simhash, cluster["simhash"])
+            if distance < best_distance:
+                best, best_distance = cid, distance
+        return best
+
+    def process(self, articles: List[Dict[str, Any]], drop_indexed: bool = False) -> List[Dict[str, Any]]:
+        """
+        合并近似重复文章，返回保留的文章（顺序不变，靠前的优先作为代表）
+
+        Args:
+            articles: 按优先级排序的文章列表
+            drop_indexed: 是否丢弃与今天已写入的其他文章重复的副本（增量写入时使用；
+                整体替换今天列表时代表文章未必还在列表中，只合并同一批内的副本）
+
+        保留的文章 extra 中增加 cluster_id，合并了副本的代表文章增加 duplicates: [{source, url}, ...]
+        """
+        if not articles:
+            return []
+
+        start = time.perf_counter()
+        today = date.today().isoformat()
+        entries = [_Entry(article, self.bands, self.min_tokens) for article in articles]
+        canon_map, clusters = self._lookup(entries)
+
+        band_index: Dict[str, Set[str]] = {}
+        for cid, cluster in clusters.items():
+            if cluster.get("simhash") is not None:
+                for band in _split_bands(cluster["simhash"], self.bands):
+                    band_index.setdefault(band, set()).add(cid)
+
+        kept: List[Dict[str, Any]] = []
+        reps: Dict[str, Dict[str, Any]] = {}        # 簇 ID -> 本批中的代表文章
+        members: Dict[str, Dict[str, str]] = {}      # 被丢弃的副本：文章 ID -> 簇 ID
+        touched: Dict[str, _Entry] = {}             # 需要写回索引的簇 -> 代表文章
+        canons: Dict[str, str] = {}
+        merged = dropped = 0
+
+        for entry in entries:
+            cid = self._match(entry, canon_map, clusters, band_index)
+            rep = reps.get(cid) if cid else None
+
+            if rep is not None:
+                # 同一批内的副本：合并到代表文章
+                self._merge_into(rep["article"], entry.article)
+                canons[entry.canon] = canon_map[entry.canon] = cid
+                merged += 1
+                continue
+
+            cluster = clusters.get(cid) if cid else None
+            if (
+                drop_indexed and cluster is not None and rep is None
+                and cluster["id"] != entry.article_id and cluster.get("day") == today
+            ):
+                # 今天已写入过该簇的其他文章
+                members[entry.article_id] = {"cluster": cid, "source": entry.source, "url": entry.article.get("url", "")}
+                canons[entry.canon] = canon_map[entry.canon] = cid
+                dropped += 1
+                continue
+
+            cid = cid or entry.article_id
+            article = dict(entry.article, extra=dict(entry.article.get("extra") or {}))
+            article["extra"]["cluster_id"] = cid
+            kept.append(article)
+            reps[cid] = {"id": entry.article_id, "article": article}
+            touched[cid] = entry
+            canons[entry.canon] = canon_map[entry.canon] = cid
+
+            if cid not in clusters:
+                clusters[cid] = {"id": entry.article_id, "source": entry.source, "simhash": entry.simhash}
+                for band in entry.bands:
+                    band_index.setdefault(band, set()).add(cid)
+
+        self._attach_members(reps, clusters)
+        self._save(touched, canons, members, clusters, today)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.last_stats = {
+            "total": len(articles),
+            "merged": merged,
+            "dropped": dropped,
+            "elapsed_ms": round(elapsed_ms, 2),
+        }
+        if merged or dropped:
+            print(f"[Dedup] 合并 {merged} 篇、丢弃 {dropped} 篇近似重复文章，耗时 {self.last_stats['elapsed_ms']} ms")
+        return kept
+
+    @staticmethod
+    def _merge_into(rep: Dict[str, Any], duplicate: Dict[str, Any]):
+        """副本的来源和链接记入代表文章，代表文章缺少的描述和分类由副本补齐"""
+        duplicates = rep["extra"].setdefault("duplicates", [])
+        entry = {"source": duplicate.get("source", ""), "url": duplicate.get("url", "")}
+        if entry not in duplicates:
+            duplicates.append(entry)
+        if not rep.get("description") and duplicate.get("description"):
+            rep["description"] = duplicate["description"]
+        if "ai_category" not in rep and "ai_category" in duplicate:
+            rep["ai_category"] = duplicate["ai_category"]
+
+    def _attach_members(self, reps: Dict[str, Dict[str, Any]], clusters: Dict[str, Dict[str, Any]]):
+        """已有簇的代表文章带上此前被丢弃的副本"""
+        existing = [cid for cid in reps if clusters.get(cid, {}).get("day")]
+        if not existing:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for cid in existing:
+            pipe.hvals(self._members_key(cid))
+        for cid, values in zip(existing, pipe.execute()):
+            rep = reps[cid]
+            for raw in values:
+                member = json.loads(raw)
+                if member.get("url") != rep["article"].get("url"):
+                    self._merge_into(rep["article"], member)
+
+    def _save(
+        self,
+        touched: Dict[str, _Entry],
+        canons: Dict[str, str],
+        members: Dict[str, Dict[str, str]],
+        clusters: Dict[str, Dict[str, Any]],
+        today: str
+    ):
+        """写回索引：更新代表文章、规范化链接映射、SimHash 分桶和簇成员"""
+        now = time.time()
+        ttl = self.retention_seconds
+        pipe = self.redis.pipeline(transaction=True)
+        for cid, entry in touched.items():
+            cluster_canons = set(clusters.get(cid, {}).get("canon") or [])
+            cluster_canons.update(canon for canon, c in canons.items() if c == cid)
+            pipe.hset(f"{DEDUP_PREFIX}:cluster", cid, json.dumps({
+                "id": entry.article_id,
+                "source": entry.source,
+                "url": entry.article.get("url", ""),
+                "simhash": entry.simhash,
+                "day": today,
+                "canon": sorted(cluster_canons),
+            }, ensure_ascii=False))
+            pipe.zadd(f"{DEDUP_PREFIX}:timeline", {cid: now})
+            for band in entry.bands:
+                pipe.sadd(self._band_key(band), cid)
+                pipe.expire(self._band_key(band), ttl)
+        if canons:
+            pipe.hset(f"{DEDUP_PREFIX}:canon", mapping=canons)
+        for article_id, member in members.items():
+            key = self._members_key(member["cluster"])
+            pipe.hset(key, article_id, json.dumps(
+                {"source": member["source"], "url": member["url"]}, ensure_ascii=False
+            ))
+            pipe.expire(key, ttl)
+        pipe.execute()
+
+    def compact(self) -> int:
+        """删除超过保留期的簇及其链接映射和分桶，返回删除的簇数量"""
+        cutoff = time.time() - self.retention_seconds
+        timeline_key = f"{DEDUP_PREFIX}:timeline"
+        expired = self.redis.zrangebyscore(timeline_key, "-inf", cutoff)
+        if not expired:
+            return 0
+
+        clusters = self.redis.hmget(f"{DEDUP_PREFIX}:cluster", expired)
+        pipe = self.redis.pipeline(transaction=True)
+        for cid, raw in zip(expired, clusters):
+            if not raw:
+                continue
+            cluster = json.loads(raw)
+            if cluster.get("canon"):
+                pipe.hdel(f"{DEDUP_PREFIX}:canon", *cluster["canon"])
+            if cluster.get("simhash") is not None:
+                for band in _split_bands(cluster["simhash"], self.bands):
+                    pipe.srem(self._band_key(band), cid)
+            pipe.delete(self._members_key(cid))
+        pipe.hdel(f"{DEDUP_PREFIX}:cluster", *expired)
+        pipe.zrem(timeline_key, *expired)
+        pipe.execute()
+
+        print(f"[Dedup] 已清理 {len(expired)} 个过期簇")
+        return len(expired)
+
+
+# 单例
+dedup_index = DedupIndex()
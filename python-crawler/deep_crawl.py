@@ -0,0 +1,151 @@
+"""
+深度爬取
+逐页回溯声明了 deep 的数据源（掘金沿游标翻页、HN 合并 top/new/best 列表、arXiv 分页预取），
+直到时间截止点或条目上限，结果逐页写入历史库供周报与回填使用；
+历史库按文章的发布时间（extra.published_at）索引回填的文章，不会显示为今天爬取
+
+每页写入后在 Redis 中保存断点，中断（崩溃、Ctrl-C、超时）后以 --resume 从断点继续，
+恢复时沿用首次运行的截止时间和已收集数量；数据源完成后删除断点
+
+Redis 结构：
+    {prefix}:deep:checkpoint:{source}   STRING  断点 JSON: state / cutoff / limit / collected / updated_at
+"""
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from config import REDIS_KEY_PREFIX, DEEP_CRAWL_LIMIT, DEEP_CRAWL_CHECKPOINT_TTL
+from crawlers.article import crawl_batch
+from crawlers.metrics import run_metrics, track_source
+from crawlers.retry import retry_budget
+from crawlers.registry import Source
+from history_store import HistoryStore, history_store
+from redis_client import RedisClient, redis_client
+
+DEEP_PREFIX = f"{REDIS_KEY_PREFIX}:deep"
+
+
+class DeepCheckpoints:
+    """深度爬取断点（每个数据源一个，带过期时间）"""
+
+    def __init__(self, client: RedisClient = redis_client, ttl: int = DEEP_CRAWL_CHECKPOINT_TTL):
+        self.redis = client.client
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(source: str) -> str:
+        return f"{DEEP_PREFIX}:checkpoint:{source}"
+
+    def load(self, source: str) -> Optional[Dict[str, Any]]:
+        raw = self.redis.get(self._key(source))
+        if not raw:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+    def save(self, source: str, checkpoint: Dict[str, Any]):
+        checkpoint = dict(checkpoint, updated_at=time.time())
+        self.redis.set(self._key(source), json.dumps(checkpoint, ensure_ascii=False), ex=self.ttl)
+
+    def clear(self, source: str):
+        self.redis.delete(self._key(source))
+
+
+class DeepCrawler:
+    """
+    深度爬取调度
+
+    Usage:
+        deep_crawler.run(registry.sources(), days=7, limit=500, resume=True)
+    """
+
+    def __init__(
+        self,
+        checkpoints: DeepCheckpoints = None,
+        store: HistoryStore = history_store,
+        limit: int = DEEP_CRAWL_LIMIT
+    ):
+        """
+        Args:
+            checkpoints: 断点存储
+            store: 结果写入的历史库
+            limit: 每个数据源默认最多收集的条目数
+        """
+        self.checkpoints = checkpoints or DeepCheckpoints()
+        self.store = store
+        self.limit = limit
+
+    def run_source(self, source: Source, days: float, limit: int = None, resume: bool = False) -> int:
+        """
+        深度爬取单个数据源，返回本次收集的条目数
+        resume 为 True 且存在断点时从断点继续，否则丢弃旧断点从头开始
+        """
+        checkpoint = self.checkpoints.load(source.key)
+        if checkpoint is None or not resume:
+            if checkpoint is not None:
+                print(f"[Deep] {source.label}: 丢弃未完成的断点，从头开始")
+            checkpoint = {
+                "state": {}, "cutoff": time.time() - days * 86400, "limit": limit or self.limit, "collected": 0
+            }
+        else:
+            print(
+                f"[Deep] {source.label}: 从断点继续，已收集 {checkpoint['collected']} 条，"
+                f"截止 {datetime.fromtimestamp(checkpoint['cutoff']):%Y-%m-%d %H:%M}"
+            )
+            checkpoint["limit"] = limit or checkpoint.get("limit") or self.limit
+
+        collected = 0
+        remaining = max(0, checkpoint["limit"] - checkpoint["collected"])
+        if remaining == 0:
+            # 恢复时指定的上限不超过断点中已收集的数量
+            print(f"[Deep] {source.label}: 已收集 {checkpoint['collected']} 条，达到上限 {checkpoint['limit']}")
+            self.checkpoints.clear(source.key)
+            return 0
+        pages = source.deep_pages(checkpoint["state"], checkpoint["cutoff"], remaining)
+        try:
+            for articles, state in pages:
+                articles = articles[:remaining - collected]
+                if articles:
+                    self.store.record(articles, backfill=True)
+                collected += len(articles)
+                checkpoint["state"] = state
+                checkpoint["collected"] += len(articles)
+                self.checkpoints.save(source.key, checkpoint)
+                print(f"[Deep] {source.label}: 已收集 {checkpoint['collected']}/{checkpoint['limit']} 条")
+                if collected >= remaining:
+                    break
+        finally:
+            pages.close()
+
+        self.checkpoints.clear(source.key)
+        return collected
+
+    def run(self, sources: List[Source], days: float, limit: int = None, resume: bool = False) -> Dict[str, int]:
+        """
+        按优先级逐个深度爬取支持的数据源，单个数据源失败时保留其断点并继续下一个
+        返回 数据源 -> 本次收集的条目数（失败的数据源不在其中）
+        """
+        results = {}
+        for source in sources:
+            if not source.supports_deep:
+                continue
+            print(f"\n[Deep] 正在深度爬取 {source.label}（最近 {days:g} 天）...")
+            retry_budget.reset()
+            start = time.perf_counter()
+            with track_source(source.key), crawl_batch():
+                try:
+                    collected = self.run_source(source, days, limit, resume)
+                except Exception as e:
+                    run_metrics.finish_source(source.key, time.perf_counter() - start, error=e)
+                    print(f"[Deep] {source.label} 中断: {e}，可使用 --resume 从断点继续")
+                    continue
+            run_metrics.finish_source(source.key, time.perf_counter() - start, items=collected)
+            results[source.key] = collected
+        return results
+
+
+# 单例
+deep_crawler = DeepCrawler()
@@ -0,0 +1,248 @@
+"""
+文章历史库
+按爬取时间保留多日文章，支持按数据源、时间范围、分数变化查询
+
+Redis 结构：
+    {prefix}:history:timeline           ZSET  member=文章ID, score=最近一次爬取时间戳（深度爬取回填的文章为发布时间戳）
+    {prefix}:history:source:{source}    ZSET  同上，按数据源划分
+    {prefix}:history:sources            SET   出现过的数据源
+    {prefix}:history:item:{id}          HASH  body / source / first_seen / last_seen / score / prev_score
+    {prefix}:history:sweep_cursor       STRING  孤立成员清理的 ZSCAN 游标
+"""
+import re
+import json
+import time
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from config import REDIS_KEY_PREFIX, HISTORY_RETENTION_DAYS, HISTORY_SWEEP_BATCH
+from crawlers.utils import article_id_for_url
+from redis_client import RedisClient, redis_client
+
+HISTORY_PREFIX = f"{REDIS_KEY_PREFIX}:history"
+
+
+def article_score(article: Dict[str, Any]) -> Optional[float]:
+    """
+    提取文章的热度分数
+    HN: score, GitHub: today_stars（如 "1,234 stars today"）, 掘金: digg_count
+    """
+    extra = article.get("extra") or {}
+    for field in ("score", "today_stars", "digg_count"):
+        value = extra.get(field)
+        if value is None or value == "":
+            continue
+        if isinstance(value, (int, float)):
+            return float(value)
+        match = re.search(r"[\d,]+", str(value))
+        if match:
+            return float(match.group().replace(",", ""))
+    return None
+
+
+def _crawl_timestamp(article: Dict[str, Any]) -> float:
+    """文章的爬取时间戳，缺失或格式错误时使用当前时间"""
+    crawl_time = article.get("crawl_time")
+    if crawl_time:
+        try:
+            return datetime.fromisoformat(crawl_time).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+def _published_timestamp(article: Dict[str, Any]) -> Optional[float]:
+    """深度爬取写入的发布时间戳（extra.published_at），缺失时返回 None"""
+    value = (article.get("extra") or {}).get("published_at")
+    try:
+        return float(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+class HistoryStore:
+    """
+    多日文章历史库
+
+    Usage:
+        history_store.record(articles)
+        history_store.get_range(days=7, source="hackernews")
+        history_store.get_rising(days=1)
+    """
+
+    def __init__(
+        self,
+        client: RedisClient = redis_client,
+        retention_days: int = HISTORY_RETENTION_DAYS,
+        sweep_batch: int = HISTORY_SWEEP_BATCH
+    ):
+        """
+        Args:
+            client: Redis 客户端封装
+            retention_days: 历史保留天数
+            sweep_batch: 每次压缩检查的索引成员数
+        """
+        self.redis = client.client
+        self.retention_days = retention_days
+        self.sweep_batch = max(1, sweep_batch)
+
+    @property
+    def retention_seconds(self) -> int:
+        return self.retention_days * 86400
+
+    @staticmethod
+    def _item_key(article_id: str) -> str:
+        return f"{HISTORY_PREFIX}:item:{article_id}"
+
+    @staticmethod
+    def _source_key(source: str) -> str:
+        return f"{HISTORY_PREFIX}:source:{source}"
+
+    def record(self, articles: List[Dict[str, Any]], backfill: bool = False) -> int:
+        """
+        记录一批文章，返回记录数量
+        已存在的文章更新 body、last_seen 和分数，原分数保存在 prev_score 中
+
+        backfill 为 True 时（深度爬取）按发布时间（extra.published_at，缺失时为爬取时间）索引，
+        回溯的旧文章不会在 get_range / get_rising 中显示为今天爬取；已存在的文章保持不变
+        """
+        if not articles:
+            return 0
+
+        entries = {}
+        for article in articles:
+            article_id = article_id_for_url(article.get("url", ""))
+            entries.setdefault(article_id, article)
+        ids = list(entries)
+
+        # 第一次往返：读取已有分数
+        pipe = self.redis.pipeline(transaction=False)
+        for article_id in ids:
+            pipe.hmget(self._item_key(article_id), "score", "first_seen")
+        existing = pipe.execute()
+
+        # 第二次往返：写入
+        pipe = self.redis.pipeline(transaction=True)
+        recorded = 0
+        for article_id, (old_score, first_seen) in zip(ids, existing):
+            if backfill and first_seen:
+                continue
+            recorded += 1
+            article = dict(entries[article_id], id=article_id)
+            source = article.get("source", "unknown")
+            ts = (backfill and _published_timestamp(article)) or _crawl_timestamp(article)
+            score = article_score(article)
+
+            fields = {
+                "body": json.dumps(article, ensure_ascii=False),
+                "source": source,
+                "first_seen": first_seen or ts,
+                "last_seen": ts,
+            }
+            if score is not None:
+                fields["score"] = score
+                # 分数变化时才更新上次分数，保留最近一次变化的幅度
+                if old_score is not None and float(old_score) != score:
+                    fields["prev_score"] = old_score
+
+            item_key = self._item_key(article_id)
+            pipe.hset(item_key, mapping=fields)
+            pipe.expire(item_key, self.retention_seconds)
+            pipe.zadd(f"{HISTORY_PREFIX}:timeline", {article_id: ts})
+            pipe.zadd(self._source_key(source), {article_id: ts})
+            pipe.sadd(f"{HISTORY_PREFIX}:sources", source)
+        pipe.execute()
+
+        return recorded
+
+    def _ids_in_range(self, days: float, source: Optional[str], limit: Optional[int]) -> List[str]:
+        key = self._source_key(source) if source else f"{HISTORY_PREFIX}:timeline"
+        since = time.time() - days * 86400
+        if limit:
+            return self.redis.zrevrangebyscore(key, "+inf", since, start=0, num=limit)
+        return self.redis.zrevrangebyscore(key, "+inf", since)
+
+    def _load_items(self, ids: List[str]) -> List[Dict[str, Any]]:
+        pipe = self.redis.pipeline(transaction=False)
+        for article_id in ids:
+            pipe.hgetall(self._item_key(article_id))
+        return [item for item in pipe.execute() if item]
+
+    def get_range(self, days: float = 7, source: str = None, limit: int = None) -> List[Dict[str, Any]]:
+        """
+        查询最近 days 天内爬取过的文章（按最近爬取时间倒序）
+
+        Args:
+            days: 时间范围（天）
+            source: 只查询指定数据源
+            limit: 最多返回条数
+        """
+        ids = self._ids_in_range(days, source, limit)
+        return [json.loads(item["body"]) for item in self._load_items(ids)]
+
+    def get_rising(self, days: float = 1, source: str = None, min_delta: float = 1) -> List[Dict[str, Any]]:
+        """
+        查询最近 days 天内分数上涨的文章，按涨幅倒序
+
+        Returns:
+            [{"article": 文章, "score": 当前分数, "prev_score": 上次分数, "delta": 涨幅}, ...]
+        """
+        ids = self._ids_in_range(days, source, None)
+        rising = []
+        for item in self._load_items(ids):
+            if "score" not in item or "prev_score" not in item:
+                continue
+            delta = float(item["score"]) - float(item["prev_score"])
+            if delta >= min_delta:
+                rising.append({
+                    "article": json.loads(item["body"]),
+                    "score": float(item["score"]),
+                    "prev_score": float(item["prev_score"]),
+                    "delta": delta,
+                })
+        rising.sort(key=lambda r: r["delta"], reverse=True)
+        return rising
+
+    def compact(self) -> int:
+        """
+        按保留策略压缩历史库，返回删除的文章数量
+        - 按分数删除超过保留期的文章及其索引（只涉及新过期的文章）
+        - 沿 ZSCAN 游标每次检查 sweep_batch 个成员，清理 Hash 已不存在的孤立成员；
+          每次调用的开销与历史库大小无关，多次调用后覆盖整个索引
+        """
+        cutoff = time.time() - self.retention_seconds
+        timeline_key = f"{HISTORY_PREFIX}:timeline"
+        cursor_key = f"{HISTORY_PREFIX}:sweep_cursor"
+        sources = self.redis.smembers(f"{HISTORY_PREFIX}:sources")
+
+        expired = self.redis.zrangebyscore(timeline_key, "-inf", cutoff)
+
+        # 索引中 Hash 已因 TTL 消失的成员（本批）
+        cursor, batch = self.redis.zscan(timeline_key, int(self.redis.get(cursor_key) or 0), count=self.sweep_batch)
+        members = [member for member, _ in batch]
+        pipe = self.redis.pipeline(transaction=False)
+        for article_id in members:
+            pipe.exists(self._item_key(article_id))
+        orphans = [m for m, exists in zip(members, pipe.execute()) if not exists] if members else []
+        self.redis.set(cursor_key, cursor, ex=self.retention_seconds)
+
+        removed = set(expired) | set(orphans)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.zremrangebyscore(timeline_key, "-inf", cutoff)
+        for source in sources:
+            pipe.zremrangebyscore(self._source_key(source), "-inf", cutoff)
+        if removed:
+            pipe.zrem(timeline_key, *removed)
+            for source in sources:
+                pipe.zrem(self._source_key(source), *removed)
+        if expired:
+            pipe.delete(*[self._item_key(article_id) for article_id in expired])
+        pipe.execute()
+
+        if removed:
+            print(f"[History] 已清理 {len(removed)} 篇过期文章")
+        return len(removed)
+
+
+# 单例
+history_store = HistoryStore()
@@ -1,162 +1,781 @@
 """
 智能技术资讯聚合系统 - Python 爬虫入口
 """
+import os
 import sys
+import signal
+import time
+import asyncio
 import argparse
+import threading
+from concurrent.futures import Future, wait, FIRST_COMPLETED
+from contextlib import nullcontext
 from datetime import datetime
+from typing import List, Dict, Any, Callable
 
-from crawlers.github_crawler import crawl_github_trending
-from crawlers.juejin_crawler import crawl_juejin_hot
-from crawlers.hackernews_crawler import crawl_hackernews
-from crawlers.producthunt_crawler import crawl_ai_tools
-from crawlers.ai_papers_crawler import crawl_huggingface_papers, crawl_arxiv_ai
-from crawlers.football_crawler import get_football_summary, format_football_markdown
+from crawlers.async_engine import engine
+from crawlers.retry import retry_budget
+from crawlers.metrics import run_metrics, track_source
+from crawlers.article import crawl_batch
+from crawlers.registry import registry, Source
+from crawlers.utils import session_manager
 from redis_client import redis_client
-from config import FOOTBALL_API_KEY
+from history_store import history_store
+from dedup import dedup_index
+from deep_crawl import deep_crawler
+from scheduler import CrawlScheduler
+from work_queue import QueueWorker, crawl_queue
+from config import (
+    CRAWL_MODE,
+    CRAWL_WORKERS,
+    CRAWL_SOURCE_TIMEOUT,
+    CRAWL_GLOBAL_TIMEOUT,
+    CRAWL_CONCURRENCY_LIMITS,
+    REDIS_STORAGE_MODE,
+    HISTORY_ENABLED,
+    DEDUP_ENABLED,
+    ARTICLE_PAGE_SIZE,
+    METRICS_JSON_PATH,
+    METRICS_PROM_PATH,
+    DEEP_CRAWL_LIMIT,
+)
 
-# 配置
-DAYS_LIMIT = 10
+GROUP_TITLES = {
+    "ai": "📌 优先爬取 AI 内容",
+    "extra": "📎 爬取补充来源",
+    "football": "⚽ 获取足球数据",
+}
 
 
-def run_crawlers():
+def _instrumented(key: str, func: Callable) -> Callable:
     """
-    运行所有爬虫并存储结果
-    优先级：AI内容 > 其他技术内容
+    包装数据源函数：期间记录的指标归属于 key，结束时记录耗时、条目数和状态；
+    同一次运行产出的文章共用一个 crawl_time
     """
-    print(f"\n{'='*50}")
-    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 开始爬取技术资讯...")
-    print(f"{'='*50}\n")
-    
-    all_articles = []
-    
-    # === 优先级1: AI内容 ===
-    print("=" * 30)
-    print("📌 优先爬取 AI 内容")
-    print("=" * 30)
-    
-    # 1. AI应用 - 多源聚合 (Futurepedia/Toolify/GitHub AI)
-    print("[1/6] 正在爬取 AI 应用工具...")
-    try:
-        ai_tools = crawl_ai_tools(count=5, days_limit=DAYS_LIMIT)
-        all_articles.extend(ai_tools)
-    except Exception as e:
-        print(f"  ⚠ AI工具爬取失败: {e}")
-    
-    # 2. AI前沿 - Hugging Face Papers
-    print("[2/6] 正在爬取 Hugging Face AI 论文...")
-    try:
-        hf_articles = crawl_huggingface_papers(count=5, days_limit=DAYS_LIMIT)
-        all_articles.extend(hf_articles)
-    except Exception as e:
-        print(f"  ⚠ Hugging Face 爬取失败: {e}")
-    
-    # 3. AI前沿 - arXiv (备用)
-    print("[3/6] 正在爬取 arXiv AI 论文...")
-    try:
-        arxiv_articles = crawl_arxiv_ai(count=3, days_limit=DAYS_LIMIT)
-        all_articles.extend(arxiv_articles)
-    except Exception as e:
-        print(f"  ⚠ arXiv 爬取失败: {e}")
-    
-    # === 优先级2: 补充来源（减少数量） ===
-    print("\n" + "=" * 30)
-    print("📎 爬取补充来源")
-    print("=" * 30)
-    
-    # 4. GitHub Trending (只取4篇，主要看AI相关)
-    print("[4/6] 正在爬取 GitHub Trending...")
-    try:
-        github_articles = crawl_github_trending()[:4]
-        all_articles.extend(github_articles)
-    except Exception as e:
-        print(f"  ⚠ GitHub 爬取失败: {e}")
-    
-    # 5. 掘金热榜 (只取3篇)
-    print("[5/6] 正在爬取掘金热榜...")
-    try:
-        juejin_articles = crawl_juejin_hot()[:3]
-        all_articles.extend(juejin_articles)
-    except Exception as e:
-        print(f"  ⚠ 掘金爬取失败: {e}")
-    
-    # 6. Hacker News (只取3篇)
-    print("[6/6] 正在爬取 Hacker News...")
+    def wrapper():
+        start = time.perf_counter()
+        with track_source(key), crawl_batch():
+            try:
+                result = func()
+            except Exception as e:
+                run_metrics.finish_source(key, time.perf_counter() - start, error=e)
+                raise
+        run_metrics.finish_source(key, time.perf_counter() - start, result=result)
+        return result
+    return wrapper
+
+
+def _instrumented_async(key: str, async_func: Callable) -> Callable:
+    """_instrumented 的异步版本（被取消时由调用方记录超时）"""
+    async def wrapper():
+        start = time.perf_counter()
+        with track_source(key), crawl_batch():
+            try:
+                result = await async_func()
+            except Exception as e:
+                run_metrics.finish_source(key, time.perf_counter() - start, error=e)
+                raise
+        run_metrics.finish_source(key, time.perf_counter() - start, result=result)
+        return result
+    return wrapper
+
+
+def _run_sequential(sources: List[Source]) -> Dict[str, Any]:
+    """按优先级逐个运行数据源，单个数据源失败不影响其他数据源"""
+    results = {}
+    current_group = None
+    total = len(sources)
+
+    for i, source in enumerate(sources, 1):
+        if source.group != current_group:
+            current_group = source.group
+            print("\n" + "=" * 30)
+            print(GROUP_TITLES.get(source.group, source.group))
+            print("=" * 30)
+
+        print(f"[{i}/{total}] 正在爬取 {source.label}...")
+        try:
+            results[source.key] = _instrumented(source.key, source.run)()
+        except Exception as e:
+            print(f"  ⚠ {source.label} 爬取失败: {e}")
+
+    return results
+
+
+def _class_limits() -> Dict[str, int]:
+    return {name: max(1, limit) for name, limit in CRAWL_CONCURRENCY_LIMITS.items()}
+
+
+def _run_concurrent(
+    sources: List[Source],
+    workers: int,
+    source_timeout: float,
+    global_timeout: float
+) -> Dict[str, Any]:
+    """
+    使用有界线程池并发运行数据源
+
+    - 同时最多运行 workers 个数据源，同一并发类别的数据源不超过 CRAWL_CONCURRENCY_LIMITS
+    - 单个数据源从开始执行起超过其超时（未声明时为 source_timeout）秒即放弃
+    - 整轮超过 global_timeout 秒后放弃所有未完成的数据源
+
+    工作线程为守护线程，被放弃的数据源不会阻塞进程退出；超时放弃时立即归还其名额，
+    排队中的数据源不必等被放弃的线程结束（被放弃的线程仍在后台运行直到 func 返回）。
+    返回 {key: 结果}，失败或超时的数据源不在结果中。
+    """
+    slots = threading.BoundedSemaphore(max(1, workers))
+    class_slots = {name: threading.BoundedSemaphore(limit) for name, limit in _class_limits().items()}
+    stop_event = threading.Event()
+    started_at: Dict[str, float] = {}
+    futures: Dict[str, Future] = {}
+    labels = {source.key: source.label for source in sources}
+    timeouts = {source.key: source.timeout or source_timeout for source in sources}
+    # 数据源 -> 占用中的名额，归还一次后移除（完成与超时放弃只会归还一次）
+    held: Dict[str, List[threading.BoundedSemaphore]] = {}
+    held_lock = threading.Lock()
+
+    def release(key: str):
+        with held_lock:
+            semaphores = held.pop(key, [])
+        for semaphore in reversed(semaphores):
+            semaphore.release()
+
+    def runner(source: Source, func: Callable, future: Future):
+        # 先占用类别名额再占用全局名额，避免等待类别名额时占着全局名额
+        semaphores = [s for s in (class_slots.get(source.concurrency), slots) if s is not None]
+        for semaphore in semaphores:
+            semaphore.acquire()
+        with held_lock:
+            held[source.key] = semaphores
+        try:
+            if stop_event.is_set():
+                future.cancel()
+                return
+            started_at[source.key] = time.monotonic()
+            print(f"[并发] 开始爬取 {source.label}...")
+            try:
+                future.set_result(func())
+            except Exception as e:
+                future.set_exception(e)
+        finally:
+            release(source.key)
+
+    for source in sources:
+        future = Future()
+        futures[source.key] = future
+        threading.Thread(
+            target=runner,
+            args=(source, _instrumented(source.key, source.run), future),
+            name=f"crawl-{source.key}",
+            daemon=True
+        ).start()
+
+    deadline = time.monotonic() + global_timeout
+    pending = set(futures)
+    results = {}
+
+    while pending:
+        now = time.monotonic()
+        if now >= deadline:
+            for key in pending:
+                print(f"  ⚠ {labels[key]} 未在总超时 {global_timeout:g}s 内完成，已放弃")
+                start = started_at.get(key)
+                run_metrics.finish_source(key, now - start if start else 0.0, status="timeout")
+            break
+
+        # 单源超时检查
+        for key in list(pending):
+            start = started_at.get(key)
+            if start is not None and now - start >= timeouts[key]:
+                print(f"  ⚠ {labels[key]} 超时 ({timeouts[key]:g}s)，已放弃")
+                run_metrics.finish_source(key, now - start, status="timeout")
+                pending.discard(key)
+                release(key)
+
+        # 计算下一次需要醒来的时间点
+        wake_at = deadline
+        for key in pending:
+            start = started_at.get(key)
+            if start is not None:
+                wake_at = min(wake_at, start + timeouts[key])
+        timeout = max(0.0, min(wake_at - now, 1.0))
+
+        done, _ = wait([futures[k] for k in pending], timeout=timeout, return_when=FIRST_COMPLETED)
+        for key in list(pending):
+            future = futures[key]
+            if future not in done:
+                continue
+            pending.discard(key)
+            if future.cancelled():
+                continue
+            error = future.exception()
+            if error is not None:
+                print(f"  ⚠ {labels[key]} 爬取失败: {error}")
+            else:
+                results[key] = future.result()
+
+    stop_event.set()
+    return results
+
+
+async def _run_async(
+    sources: List[Source],
+    source_timeout: float,
+    global_timeout: float
+) -> Dict[str, Any]:
+    """
+    在单个事件循环中并发运行所有数据源的异步版本
+
+    - 同一并发类别的数据源不超过 CRAWL_CONCURRENCY_LIMITS
+    - 单个数据源开始执行后超过其超时（未声明时为 source_timeout）秒即取消
+    - 整轮超过 global_timeout 秒后取消所有未完成的数据源
+    返回 {key: 结果}，失败或超时的数据源不在结果中。
+    """
+    labels = {source.key: source.label for source in sources}
+    class_slots = {name: asyncio.Semaphore(limit) for name, limit in _class_limits().items()}
+
+    async def run_one(source: Source):
+        timeout = source.timeout or source_timeout
+        async with class_slots.get(source.concurrency) or nullcontext():
+            try:
+                return await asyncio.wait_for(_instrumented_async(source.key, source.run_async)(), timeout=timeout)
+            except asyncio.TimeoutError:
+                print(f"  ⚠ {source.label} 超时 ({timeout:g}s)，已取消")
+                run_metrics.finish_source(source.key, timeout, status="timeout")
+                raise
+
+    tasks = {source.key: asyncio.ensure_future(run_one(source)) for source in sources}
+    done, pending = await asyncio.wait(tasks.values(), timeout=global_timeout)
+
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    results = {}
+    for key, task in tasks.items():
+        if task in pending:
+            print(f"  ⚠ {labels[key]} 未在总超时 {global_timeout:g}s 内完成，已取消")
+            run_metrics.finish_source(key, global_timeout, status="timeout")
+            continue
+        error = task.exception()
+        if error is None:
+            results[key] = task.result()
+        elif not isinstance(error, asyncio.TimeoutError):
+            print(f"  ⚠ {labels[key]} 爬取失败: {error}")
+
+    return results
+
+
+def _dedup_articles(articles: List[Dict[str, Any]], incremental: bool) -> List[Dict[str, Any]]:
+    """合并跨数据源的近似重复文章，索引不可用时原样返回"""
     try:
-        hn_articles = crawl_hackernews(3)
-        all_articles.extend(hn_articles)
+        start = time.perf_counter()
+        kept = dedup_index.process(articles, drop_indexed=incremental)
+        dedup_index.compact()
+        run_metrics.record_redis("dedup", time.perf_counter() - start, len(articles) - len(kept))
+        return kept
     except Exception as e:
-        print(f"  ⚠ Hacker News 爬取失败: {e}")
-    
-    # 存入 Redis
-    print(f"\n[存储] 共 {len(all_articles)} 篇文章，正在存入 Redis...")
-    saved_count = redis_client.save_articles(all_articles)
+        print(f"[Dedup] 去重失败，跳过: {e}")
+        return articles
+
+
+def _store_articles(articles: List[Dict[str, Any]], incremental: bool):
+    """文章去重后存入 Redis 并记录到多日历史库"""
+    if DEDUP_ENABLED and articles:
+        articles = _dedup_articles(articles, incremental)
+    print(f"\n[存储] 共 {len(articles)} 篇文章，正在存入 Redis...")
+    start = time.perf_counter()
+    if incremental:
+        saved_count = redis_client.save_articles_incremental(articles)
+    else:
+        saved_count = redis_client.save_articles(articles)
+    run_metrics.record_redis(
+        "articles", time.perf_counter() - start,
+        saved_count, redis_client.last_save_stats.get("bytes", 0) if saved_count else 0
+    )
     print(f"[存储] 成功存入 {saved_count} 篇文章")
-    
-    # === 足球数据 ===
-    print("\n" + "=" * 30)
-    print("⚽ 获取足球数据")
-    print("=" * 30)
-    
+
+    if HISTORY_ENABLED:
+        try:
+            start = time.perf_counter()
+            recorded = history_store.record(articles)
+            history_store.compact()
+            run_metrics.record_redis("history", time.perf_counter() - start, recorded)
+            print(f"[History] 已记录 {recorded} 篇文章到历史库")
+        except Exception as e:
+            print(f"[History] 记录失败: {e}")
+
+
+def _save_football(football_data: Dict[str, Any]):
+    """存储足球数据（sink=football）"""
     try:
-        football_data = get_football_summary(FOOTBALL_API_KEY)
-        if football_data.get("standings") or football_data.get("matches"):
+        if football_data and (football_data.get("standings") or football_data.get("matches")):
+            start = time.perf_counter()
             redis_client.save_football(football_data)
+            run_metrics.record_redis("football", time.perf_counter() - start, 1)
             print("[Football] 足球数据已存入 Redis")
         else:
             print("[Football] 未获取到足球数据")
     except Exception as e:
-        print(f"[Football] 获取失败: {e}")
-    
-    # 打印汇总
+        print(f"[Football] 存储失败: {e}")
+
+
+# sink -> 存储函数（sink=articles 的数据源合并后统一存储）
+SINKS: Dict[str, Callable[[Any], None]] = {
+    "football": _save_football,
+}
+
+
+def _print_summary(all_articles: List[Dict[str, Any]], football_data: Dict[str, Any]):
+    """按运行指标打印各数据源汇总"""
+    report = run_metrics.report()
+
     print(f"\n{'='*50}")
     print("爬取完成！汇总：")
-    print(f"  🚀 AI应用 (多源聚合): {len(ai_tools) if 'ai_tools' in dir() else 0} 篇")
-    print(f"  🔬 AI前沿 (HuggingFace): {len(hf_articles) if 'hf_articles' in dir() else 0} 篇")
-    print(f"  📄 AI前沿 (arXiv): {len(arxiv_articles) if 'arxiv_articles' in dir() else 0} 篇")
-    print(f"  📦 GitHub Trending: {len(github_articles) if 'github_articles' in dir() else 0} 篇")
-    print(f"  📝 掘金热榜: {len(juejin_articles) if 'juejin_articles' in dir() else 0} 篇")
-    print(f"  🔶 Hacker News: {len(hn_articles) if 'hn_articles' in dir() else 0} 篇")
-    print(f"  ⚽ 足球数据: {'已获取' if 'football_data' in dir() and football_data else '未获取'}")
-    print(f"  📊 总计: {len(all_articles)} 篇")
+    print(f"  {'数据源':<9}{'状态':<9}{'条目':>5}{'丢弃':>5}{'请求':>5}{'重试':>5}{'下载':>9}{'抓取':>9}{'解析':>8}{'总耗时':>9}")
+    for key, row in report["sources"].items():
+        print(
+            f"  {key:<12}{row['status']:<9}{row['items']:>5}{row['dropped']:>5}"
+            f"{row['requests']:>5}{row['retries']:>5}{row['bytes'] / 1024:>7.0f}KB"
+            f"{row['fetch_ms'] / 1000:>8.2f}s{row['parse_ms']:>6.0f}ms{row['duration_ms'] / 1000:>8.2f}s"
+        )
+        if row["error"]:
+            print(f"    ✗ {row['error']}")
+    for operation, row in report["redis"].items():
+        print(f"  Redis 写入 ({operation}): {row['count']} 条, {row['bytes']} 字节, {row['elapsed_ms']} ms")
+    print(f"  ⚽ 足球数据: {'已获取' if football_data else '未获取'}")
+    print(f"  📊 总计: {len(all_articles)} 篇, 耗时 {report['duration_ms'] / 1000:.1f}s")
     print(f"  🔑 Redis Key: {redis_client.get_today_key()}")
     print(f"{'='*50}\n")
-    
+
+
+def _export_metrics(json_path: str = None, prom_path: str = None):
+    """将运行报告存入 Redis，并按需导出为 JSON / Prometheus 文本文件"""
+    try:
+        redis_client.save_run_report(run_metrics.report())
+    except Exception as e:
+        print(f"[Metrics] 存入 Redis 失败: {e}")
+    for path, content in ((json_path, run_metrics.to_json), (prom_path, run_metrics.to_prometheus)):
+        if not path:
+            continue
+        try:
+            # 先写临时文件再替换，避免采集方读到写了一半的文件
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(content())
+            os.replace(tmp, path)
+            print(f"[Metrics] 已导出 {path}")
+        except OSError as e:
+            print(f"[Metrics] 导出 {path} 失败: {e}")
+
+
+def run_crawlers(
+    mode: str = None,
+    workers: int = None,
+    source_timeout: float = None,
+    global_timeout: float = None,
+    incremental: bool = None,
+    metrics_json: str = None,
+    metrics_prom: str = None
+):
+    """
+    运行所有爬虫并存储结果
+    优先级：AI内容 > 其他技术内容
+
+    Args:
+        mode: sequential / concurrent / async（默认读取 CRAWL_MODE）
+        workers: 并发模式下的最大工作线程数
+        source_timeout: 并发/异步模式下单个数据源的超时（秒）
+        global_timeout: 并发/异步模式下整轮爬取的总超时（秒）
+        incremental: 是否增量写入 Redis（默认读取 REDIS_STORAGE_MODE）
+        metrics_json: 运行报告 JSON 导出路径（默认读取 METRICS_JSON_PATH）
+        metrics_prom: 运行报告 Prometheus 文本导出路径（默认读取 METRICS_PROM_PATH）
+    """
+    mode = mode or CRAWL_MODE
+    if incremental is None:
+        incremental = REDIS_STORAGE_MODE == "incremental"
+    workers = workers or CRAWL_WORKERS
+    source_timeout = source_timeout or CRAWL_SOURCE_TIMEOUT
+    global_timeout = global_timeout or CRAWL_GLOBAL_TIMEOUT
+
+    print(f"\n{'='*50}")
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 开始爬取技术资讯...")
+    if mode == "concurrent":
+        print(f"模式: 并发 (workers={workers}, 单源超时={source_timeout:g}s, 总超时={global_timeout:g}s)")
+    elif mode == "async":
+        print(f"模式: 异步 (单源超时={source_timeout:g}s, 总超时={global_timeout:g}s)")
+    print(f"{'='*50}\n")
+
+    # 每轮爬取重新计算重试时间预算和运行指标
+    retry_budget.reset()
+    run_metrics.reset(mode)
+
+    # 按注册表调度所有数据源（包括足球数据）
+    sources = registry.sources()
+    if mode == "concurrent":
+        results = _run_concurrent(sources, workers, source_timeout, global_timeout)
+    elif mode == "async":
+        try:
+            results = engine.run(_run_async(sources, source_timeout, global_timeout))
+        finally:
+            engine.close()
+    else:
+        results = _run_sequential(sources)
+
+    # 按优先级顺序合并文章（与完成顺序无关）
+    all_articles = []
+    for source in sources:
+        if source.sink == "articles":
+            all_articles.extend(results.get(source.key) or [])
+
+    _store_articles(all_articles, incremental)
+
+    # 非文章数据源按 sink 单独存储
+    for source in sources:
+        if source.sink in SINKS:
+            SINKS[source.sink](results.get(source.key))
+    football_data = results.get("football")
+
+    run_metrics.finish()
+    _print_summary(all_articles, football_data)
+    _export_metrics(metrics_json or METRICS_JSON_PATH, metrics_prom or METRICS_PROM_PATH)
+
+    return all_articles
+
+
+def run_daemon(
+    workers: int = None,
+    source_timeout: float = None,
+    metrics_json: str = None,
+    metrics_prom: str = None
+):
+    """
+    守护进程模式：常驻进程按各数据源的间隔调度爬取，收到 SIGINT/SIGTERM 后优雅退出
+
+    每个数据源爬取完成后立即增量写入 Redis（不会覆盖其他数据源的文章），
+    并更新运行报告；HTTP 会话和连接池在整个进程内复用。
+    """
+    metrics_json = metrics_json or METRICS_JSON_PATH
+    metrics_prom = metrics_prom or METRICS_PROM_PATH
+    run_metrics.reset("daemon")
+
+    def crawl_and_store(source: Source) -> Any:
+        run_metrics.reset_source(source.key)
+        result = _instrumented(source.key, source.run)()
+        if source.sink == "articles":
+            _store_articles(result or [], incremental=True)
+        elif source.sink in SINKS:
+            SINKS[source.sink](result)
+        _export_metrics(metrics_json, metrics_prom)
+        return result
+
+    scheduler = CrawlScheduler(
+        registry.sources(),
+        execute=crawl_and_store,
+        workers=workers or CRAWL_WORKERS,
+        source_timeout=source_timeout or CRAWL_SOURCE_TIMEOUT
+    )
+
+    def handle_signal(signum, frame):
+        print(f"\n[Daemon] 收到信号 {signal.Signals(signum).name}，正在退出...")
+        scheduler.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+    try:
+        scheduler.run()
+    finally:
+        session_manager.close()
+
+
+def run_coordinator(
+    global_timeout: float = None,
+    incremental: bool = None,
+    metrics_json: str = None,
+    metrics_prom: str = None
+):
+    """
+    分布式协调：将本轮爬取拆分为任务写入 Redis 队列，等待 worker（main.py --worker）完成后
+    按优先级合并结果并存储，存储方式与 run_crawlers 相同
+
+    Args:
+        global_timeout: 等待所有任务完成的总超时（秒），超时后未领取的任务被取消
+        incremental: 是否增量写入 Redis（默认读取 REDIS_STORAGE_MODE）
+    """
+    if incremental is None:
+        incremental = REDIS_STORAGE_MODE == "incremental"
+    global_timeout = global_timeout or CRAWL_GLOBAL_TIMEOUT
+
+    print(f"\n{'='*50}")
+    print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] 开始分布式爬取...")
+    print(f"模式: 协调进程 (总超时={global_timeout:g}s)")
+    print(f"{'='*50}\n")
+
+    retry_budget.reset()
+    run_metrics.reset("distributed")
+
+    sources = registry.sources()
+    start = time.perf_counter()
+    _, tasks = crawl_queue.submit_run(sources)
+    status = crawl_queue.wait(tasks, global_timeout)
+    results = crawl_queue.merge(sources, tasks)
+    crawl_queue.cleanup(tasks)
+    elapsed = time.perf_counter() - start
+
+    # 协调进程只记录各数据源的最终状态，请求/解析指标由各 worker 导出
+    for source in sources:
+        states = {status.get(task.id) for task in tasks if task.source == source.key}
+        if source.key in results:
+            run_metrics.finish_source(source.key, elapsed, result=results[source.key])
+        elif "cancelled" in states:
+            run_metrics.finish_source(source.key, elapsed, status="timeout")
+        else:
+            run_metrics.finish_source(source.key, elapsed, error=RuntimeError("所有任务进入死信队列"))
+
+    all_articles = []
+    for source in sources:
+        if source.sink == "articles":
+            all_articles.extend(results.get(source.key) or [])
+
+    _store_articles(all_articles, incremental)
+
+    for source in sources:
+        if source.sink in SINKS:
+            SINKS[source.sink](results.get(source.key))
+    football_data = results.get("football")
+
+    run_metrics.finish()
+    _print_summary(all_articles, football_data)
+    _export_metrics(metrics_json or METRICS_JSON_PATH, metrics_prom or METRICS_PROM_PATH)
+
     return all_articles
 
 
+def run_worker(
+    source_timeout: float = None,
+    max_tasks: int = None,
+    metrics_json: str = None,
+    metrics_prom: str = None
+):
+    """
+    分布式 worker：从 Redis 队列领取爬取任务并执行，结果交由协调进程合并存储，
+    收到 SIGINT/SIGTERM 后完成当前任务再退出；可在多个进程或节点上同时运行
+    """
+    metrics_json = metrics_json or METRICS_JSON_PATH
+    metrics_prom = metrics_prom or METRICS_PROM_PATH
+    run_metrics.reset("worker")
+
+    def execute(source: Source, params: Dict[str, Any]) -> Any:
+        retry_budget.reset()
+        run_metrics.reset_source(source.key)
+        result = _instrumented(source.key, lambda: source.run(**params))()
+        _export_metrics(metrics_json, metrics_prom)
+        return result
+
+    worker = QueueWorker(crawl_queue, execute=execute, max_tasks=max_tasks)
+
+    def handle_signal(signum, frame):
+        print(f"\n[Worker] 收到信号 {signal.Signals(signum).name}，完成当前任务后退出...")
+        worker.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+    try:
+        worker.run(source_timeout or CRAWL_SOURCE_TIMEOUT)
+    finally:
+        session_manager.close()
+
+
+def run_deep(
+    days: float,
+    source: str = None,
+    limit: int = None,
+    resume: bool = False,
+    metrics_json: str = None,
+    metrics_prom: str = None
+) -> Dict[str, int]:
+    """
+    深度爬取：逐页回溯支持 deep 的数据源直到 days 天前或条目上限，结果写入历史库
+
+    每页写入后保存断点，resume 为 True 时从上次中断处继续
+    """
+    run_metrics.reset("deep")
+    sources = [s for s in registry.sources() if s.supports_deep and (not source or s.key == source)]
+    if not sources:
+        print(f"数据源 {source} 不支持深度爬取" if source else "没有支持深度爬取的数据源")
+        return {}
+
+    try:
+        results = deep_crawler.run(sources, days, limit=limit, resume=resume)
+    finally:
+        session_manager.close()
+
+    run_metrics.finish()
+    print("\n" + "=" * 50)
+    print(f"深度爬取完成! 共收集 {sum(results.values())} 篇文章（已写入历史库）")
+    for s in sources:
+        status = f"{results[s.key]} 篇" if s.key in results else "中断"
+        print(f"  - {s.label}: {status}")
+    print("=" * 50)
+    _export_metrics(metrics_json or METRICS_JSON_PATH, metrics_prom or METRICS_PROM_PATH)
+    return results
+
+
+def show_queue(requeue: bool = False):
+    """显示分布式队列状态和死信任务，requeue 为 True 时将协调进程仍在等待的死信任务重新入队"""
+    stats = crawl_queue.stats()
+    print(f"待领取 {stats['pending']} 个, 执行中 {stats['inflight']} 个, 死信 {stats['dead']} 个")
+    for item in crawl_queue.dead_letters():
+        print(f"  ✗ {item['id']} (尝试 {item['attempts']} 次): {item['error']}")
+    if requeue:
+        requeued, skipped = crawl_queue.requeue_dead()
+        print(f"已将 {requeued} 个死信任务重新入队")
+        if skipped:
+            print(f"{skipped} 个死信任务所属轮次的协调进程已结束，重跑的结果无人合并，未重新入队")
+
+
 def test_redis():
     """测试 Redis 连接"""
     print("正在测试 Redis 连接...")
     if redis_client.ping():
         print("✓ Redis 连接成功!")
-        articles = redis_client.get_articles()
-        print(f"✓ 当前存储 {len(articles)} 篇文章")
+        print(f"✓ 当前存储 {redis_client.count_articles()} 篇文章")
     else:
         print("✗ Redis 连接失败!")
         sys.exit(1)
 
 
+def show_history(days: float, source: str = None, rising: bool = False):
+    """显示历史库中的文章"""
+    if rising:
+        items = history_store.get_rising(days=days, source=source)
+        print(f"最近 {days:g} 天分数上涨的文章 {len(items)} 篇：\n")
+        for i, item in enumerate(items, 1):
+            a = item["article"]
+            print(f"{i}. [{a['source']}] {a['title']}  (+{item['delta']:g}, {item['prev_score']:g} → {item['score']:g})")
+            print(f"   URL: {a['url']}")
+        return
+
+    articles = history_store.get_range(days=days, source=source)
+    print(f"最近 {days:g} 天历史文章 {len(articles)} 篇：\n")
+    for i, a in enumerate(articles, 1):
+        print(f"{i}. [{a['source']}] {a['title']}")
+        print(f"   URL: {a['url']}")
+
+
+def show_metrics(limit: int = 1):
+    """显示最近几轮的运行报告"""
+    reports = redis_client.get_run_reports(limit)
+    if not reports:
+        print("暂无运行报告")
+        return
+    for report in reports:
+        print(f"[{report['started_at']}] 模式 {report['mode']}, 耗时 {report['duration_ms'] / 1000:.1f}s")
+        for key, row in report["sources"].items():
+            print(
+                f"  {key:<14}{row['status']:<9}条目 {row['items']:<4} 请求 {row['requests']:<4} "
+                f"重试 {row['retries']:<3} 抓取 {row['fetch_ms'] / 1000:.2f}s 解析 {row['parse_ms']:.0f}ms"
+            )
+        print()
+
+
 def main():
     parser = argparse.ArgumentParser(description="技术资讯爬虫")
     parser.add_argument("--test", action="store_true", help="仅测试 Redis 连接")
     parser.add_argument("--show", action="store_true", help="显示当前存储的文章")
+    parser.add_argument("--page-size", type=int, help=f"--show 分页读取时每页条数 (默认 {ARTICLE_PAGE_SIZE})")
+    parser.add_argument("--history", type=float, metavar="DAYS", help="显示最近 DAYS 天的历史文章")
+    parser.add_argument("--source", help="配合 --history / --deep 只处理指定数据源")
+    parser.add_argument("--rising", action="store_true", help="配合 --history 只显示分数上涨的文章")
+    parser.add_argument("--metrics", type=int, nargs="?", const=1, metavar="N", help="显示最近 N 轮的运行报告")
+    parser.add_argument("--metrics-json", metavar="PATH", help="将本轮运行报告导出为 JSON 文件")
+    parser.add_argument("--metrics-prom", metavar="PATH", help="将本轮运行报告导出为 Prometheus 文本文件")
+    parser.add_argument("--concurrent", action="store_true", help="并发爬取所有数据源（线程池）")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="使用异步引擎爬取所有数据源")
+    parser.add_argument("--incremental", action="store_true", help="增量写入：按 URL 去重，只写入新增或变化的文章")
+    parser.add_argument("--daemon", action="store_true", help="守护进程模式：按各数据源的间隔持续爬取")
+    parser.add_argument("--coordinator", action="store_true", help="分布式模式：拆分任务写入 Redis 队列并合并 worker 的结果")
+    parser.add_argument("--worker", action="store_true", help="分布式模式：从 Redis 队列领取并执行爬取任务")
+    parser.add_argument("--max-tasks", type=int, help="配合 --worker 处理 N 个任务后退出")
+    parser.add_argument("--queue", action="store_true", help="显示分布式队列状态和死信任务")
+    parser.add_argument("--requeue-dead", action="store_true", help="配合 --queue 将协调进程仍在等待的死信任务重新入队")
+    parser.add_argument("--deep", type=float, metavar="DAYS", help="深度爬取：翻页回溯最近 DAYS 天的文章写入历史库")
+    parser.add_argument("--deep-limit", type=int, help=f"配合 --deep 每个数据源最多收集的条目数 (默认 {DEEP_CRAWL_LIMIT})")
+    parser.add_argument("--resume", action="store_true", help="配合 --deep 从上次中断的断点继续")
+    parser.add_argument("--workers", type=int, help=f"并发工作线程数 (默认 {CRAWL_WORKERS})")
+    parser.add_argument("--source-timeout", type=float, help=f"单个数据源超时秒数 (默认 {CRAWL_SOURCE_TIMEOUT:.0f})")
+    parser.add_argument("--global-timeout", type=float, help=f"整轮爬取超时秒数 (默认 {CRAWL_GLOBAL_TIMEOUT:.0f})")
     args = parser.parse_args()
-    
+
     if args.test:
         test_redis()
+    elif args.metrics:
+        show_metrics(args.metrics)
+    elif args.history:
+        show_history(args.history, source=args.source, rising=args.rising)
     elif args.show:
-        articles = redis_client.get_articles()
-        if articles:
-            print(f"当前存储 {len(articles)} 篇文章：\n")
+        total = redis_client.count_articles()
+        if total:
+            print(f"当前存储 {total} 篇文章：\n")
+            articles = redis_client.iter_articles(
+                page_size=args.page_size or ARTICLE_PAGE_SIZE,
+                fields=("source", "title", "url", "description")
+            )
             for i, a in enumerate(articles, 1):
-                print(f"{i}. [{a['source']}] {a['title']}")
-                print(f"   URL: {a['url']}")
-                print(f"   描述: {a['description'][:80]}...")
+                print(f"{i}. [{a.get('source', '')}] {a.get('title', '')}")
+                print(f"   URL: {a.get('url', '')}")
+                print(f"   描述: {(a.get('description') or '')[:80]}...")
                 print()
         else:
             print("暂无存储的文章")
+    elif args.queue:
+        show_queue(requeue=args.requeue_dead)
+    elif args.coordinator:
+        run_coordinator(
+            global_timeout=args.global_timeout,
+            incremental=True if args.incremental else None,
+            metrics_json=args.metrics_json,
+            metrics_prom=args.metrics_prom
+        )
+    elif args.worker:
+        run_worker(
+            source_timeout=args.source_timeout,
+            max_tasks=args.max_tasks,
+            metrics_json=args.metrics_json,
+            metrics_prom=args.metrics_prom
+        )
+    elif args.deep:
+        run_deep(
+            args.deep,
+            source=args.source,
+            limit=args.deep_limit,
+            resume=args.resume,
+            metrics_json=args.metrics_json,
+            metrics_prom=args.metrics_prom
+        )
+    elif args.daemon:
+        run_daemon(
+            workers=args.workers,
+            source_timeout=args.source_timeout,
+            metrics_json=args.metrics_json,
+            metrics_prom=args.metrics_prom
+        )
     else:
-        run_crawlers()
+        mode = None
+        if args.use_async:
+            mode = "async"
+        elif args.concurrent:
+            mode = "concurrent"
+        run_crawlers(
+            mode=mode,
+            workers=args.workers,
+            source_timeout=args.source_timeout,
+            global_timeout=args.global_timeout,
+            incremental=True if args.incremental else None,
+            metrics_json=args.metrics_json,
+            metrics_prom=args.metrics_prom
+        )
 
 
 if __name__ == "__main__":
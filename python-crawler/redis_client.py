@@ -2,11 +2,356 @@
 Redis 客户端封装
 """
 import json
+import time
+import zlib
+import itertools
+import uuid
+import hashlib
 import redis
-from datetime import datetime, date
-from typing import List, Dict, Any
+from datetime import datetime, date, timedelta
+from typing import List, Dict, Any, Tuple, Iterator, Optional, Sequence
 
-from config import REDIS_HOST, REDIS_PORT, REDIS_PASSWORD, REDIS_KEY_PREFIX
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # 未安装时不提供 zstd 压缩
+
+from config import (
+    REDIS_HOST,
+    REDIS_PORT,
+    REDIS_PASSWORD,
+    REDIS_KEY_PREFIX,
+    REDIS_ARTICLE_FORMAT,
+    REDIS_ARTICLE_FORMAT_PREFERENCE,
+    ARTICLE_PAGE_SIZE,
+    METRICS_HISTORY_SIZE,
+)
+from crawlers.article import ARTICLE_FIELDS, as_dict
+from crawlers.utils import article_id_for_url
+
+# 文章数据保留时间（秒）
+ARTICLE_TTL = 86400
+
+# 增量写入脚本：按稳定 ID 判断新增/变更，新文章追加到列表，变更的文章原地 LSET
+# KEYS: 列表 Key, ID->下标 索引, ID->内容摘要, 打包值 Key
+# ARGV: TTL, 之后每三个一组 (id, digest, payload)
+# 今天的文章以打包格式存储时不写入，返回 {-1, 0}，由调用方先把打包值展开为 JSON 列表
+INCREMENTAL_SAVE_SCRIPT = """
+if redis.call('EXISTS', KEYS[4]) == 1 then
+    return {-1, 0}
+end
+local added, updated = 0, 0
+for i = 2, #ARGV, 3 do
+    local id, digest, payload = ARGV[i], ARGV[i + 1], ARGV[i + 2]
+    local idx = redis.call('HGET', KEYS[2], id)
+    if not idx then
+        local len = redis.call('RPUSH', KEYS[1], payload)
+        redis.call('HSET', KEYS[2], id, len - 1)
+        redis.call('HSET', KEYS[3], id, digest)
+        added = added + 1
+    elseif redis.call('HGET', KEYS[3], id) ~= digest then
+        redis.call('LSET', KEYS[1], tonumber(idx), payload)
+        redis.call('HSET', KEYS[3], id, digest)
+        updated = updated + 1
+    end
+end
+for i = 1, 3 do
+    redis.call('EXPIRE', KEYS[i], tonumber(ARGV[1]))
+end
+return {added, updated}
+"""
+
+
+def content_digest(article: Dict[str, Any]) -> str:
+    """文章内容摘要（不含 id 和 crawl_time），用于判断内容是否变化"""
+    body = {k: v for k, v in article.items() if k not in ("id", "crawl_time")}
+    raw = json.dumps(body, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+# === 文章编解码 ===
+# 格式字符串: "json"（每篇文章一个 JSON 字符串的 List，Java 端默认读取的格式）
+# 或 "<codec>[+<compression>]"，如 "json+zlib"、"compact"、"compact+zstd"，
+# 此类格式将整个列表打包为一个带版本头的二进制值，存于 {key}:packed
+#
+# 打包格式头（5 字节）: b"TBA" + 版本号(u8) + 编码 ID(u4 高位) | 压缩 ID(u4 低位)
+
+PACKED_MAGIC = b"TBA"
+PACKED_VERSION = 1
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _write_varint(buf: bytearray, value: int):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            buf.append(byte | 0x80)
+        else:
+            buf.append(byte)
+            return
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, pos
+        shift += 7
+
+
+def _write_str(buf: bytearray, value: str):
+    raw = value.encode("utf-8")
+    _write_varint(buf, len(raw))
+    buf += raw
+
+
+def _read_str(data: bytes, pos: int) -> Tuple[str, int]:
+    length, pos = _read_varint(data, pos)
+    return data[pos:pos + length].decode("utf-8"), pos + length
+
+
+class ArticleCodec:
+    """文章列表编解码器基类"""
+
+    name = ""
+    codec_id = 0
+
+    def encode(self, articles: List[Dict[str, Any]]) -> bytes:
+        raise NotImplementedError
+
+    def iter_decode(self, payload: bytes) -> Iterator[Dict[str, Any]]:
+        """逐篇解码，不一次性构造整个列表"""
+        raise NotImplementedError
+
+
+class JsonCodec(ArticleCodec):
+    """JSON Lines：每行一篇文章"""
+
+    name = "json"
+    codec_id = 0
+
+    def encode(self, articles: List[Dict[str, Any]]) -> bytes:
+        return "\n".join(json.dumps(as_dict(a), ensure_ascii=False) for a in articles).encode("utf-8")
+
+    def iter_decode(self, payload: bytes) -> Iterator[Dict[str, Any]]:
+        for line in payload.split(b"\n"):
+            if line:
+                yield json.loads(line)
+
+
+class CompactCodec(ArticleCodec):
+    """
+    紧凑二进制编码
+    - 字段按固定顺序存储，不重复写键名
+    - source / ai_category 存入字符串表，每篇只写表下标
+    - UUID 形式的 id 存为 16 字节，ISO 格式的 crawl_time 存为微秒整数
+    - extra 及未知字段以紧凑 JSON 存储
+    """
+
+    name = "compact"
+    codec_id = 1
+
+    # 每篇文章的标志位
+    F_UUID_ID = 1
+    F_CRAWL_TS = 2
+    F_CRAWL_RAW = 4
+    F_CATEGORY = 8
+    F_EXTRA = 16
+    F_REST = 32
+
+    def encode(self, articles: List[Dict[str, Any]]) -> bytes:
+        table: Dict[str, int] = {}
+        body = bytearray()
+
+        def intern(value: str) -> int:
+            if value not in table:
+                table[value] = len(table)
+            return table[value]
+
+        for article in articles:
+            flags = 0
+            record = bytearray()
+
+            article_id = str(article.get("id", ""))
+            try:
+                id_bytes = uuid.UUID(article_id).bytes
+                if str(uuid.UUID(bytes=id_bytes)) != article_id:
+                    raise ValueError
+                flags |= self.F_UUID_ID
+                record += id_bytes
+            except ValueError:
+                _write_str(record, article_id)
+
+            _write_str(record, article.get("title") or "")
+            _write_str(record, article.get("url") or "")
+            _write_varint(record, intern(article.get("source") or ""))
+            _write_str(record, article.get("description") or "")
+
+            crawl_time = article.get("crawl_time")
+            if crawl_time:
+                try:
+                    ts = datetime.fromisoformat(crawl_time)
+                    if ts.tzinfo is not None or ts.isoformat() != crawl_time:
+                        raise ValueError
+                    flags |= self.F_CRAWL_TS
+                    _write_varint(record, (ts - _EPOCH) // timedelta(microseconds=1))
+                except (TypeError, ValueError):
+                    flags |= self.F_CRAWL_RAW
+                    _write_str(record, str(crawl_time))
+
+            if "ai_category" in article:
+                flags |= self.F_CATEGORY
+                _write_varint(record, intern(article["ai_category"] or ""))
+
+            if article.get("extra") is not None:
+                flags |= self.F_EXTRA
+                _write_str(record, json.dumps(article["extra"], ensure_ascii=False, separators=(",", ":")))
+
+            rest = {k: v for k, v in article.items() if k not in ARTICLE_FIELDS}
+            if rest:
+                flags |= self.F_REST
+                _write_str(record, json.dumps(rest, ensure_ascii=False, separators=(",", ":")))
+
+            body.append(flags)
+            body += record
+
+        out = bytearray()
+        _write_varint(out, len(articles))
+        _write_varint(out, len(table))
+        for value in table:
+            _write_str(out, value)
+        return bytes(out + body)
+
+    def iter_decode(self, payload: bytes) -> Iterator[Dict[str, Any]]:
+        count, pos = _read_varint(payload, 0)
+        table_size, pos = _read_varint(payload, pos)
+        table = []
+        for _ in range(table_size):
+            value, pos = _read_str(payload, pos)
+            table.append(value)
+
+        for _ in range(count):
+            flags = payload[pos]
+            pos += 1
+            article: Dict[str, Any] = {}
+
+            if flags & self.F_UUID_ID:
+                article["id"] = str(uuid.UUID(bytes=payload[pos:pos + 16]))
+                pos += 16
+            else:
+                article["id"], pos = _read_str(payload, pos)
+
+            article["title"], pos = _read_str(payload, pos)
+            article["url"], pos = _read_str(payload, pos)
+            index, pos = _read_varint(payload, pos)
+            article["source"] = table[index]
+            article["description"], pos = _read_str(payload, pos)
+
+            crawl_time = None
+            if flags & self.F_CRAWL_TS:
+                micros, pos = _read_varint(payload, pos)
+                crawl_time = (_EPOCH + timedelta(microseconds=micros)).isoformat()
+            elif flags & self.F_CRAWL_RAW:
+                crawl_time, pos = _read_str(payload, pos)
+
+            category = None
+            if flags & self.F_CATEGORY:
+                index, pos = _read_varint(payload, pos)
+                category = table[index]
+
+            if flags & self.F_EXTRA:
+                raw, pos = _read_str(payload, pos)
+                article["extra"] = json.loads(raw)
+            if crawl_time is not None:
+                article["crawl_time"] = crawl_time
+            if flags & self.F_CATEGORY:
+                article["ai_category"] = category
+            if flags & self.F_REST:
+                raw, pos = _read_str(payload, pos)
+                article.update(json.loads(raw))
+
+            yield article
+
+
+class _Compression:
+    """压缩算法：(ID, 压缩函数, 解压函数)"""
+
+    def __init__(self, name: str, compression_id: int, compress, decompress):
+        self.name = name
+        self.compression_id = compression_id
+        self.compress = compress
+        self.decompress = decompress
+
+
+CODECS: Dict[str, ArticleCodec] = {}
+COMPRESSIONS: Dict[str, _Compression] = {}
+
+
+def register_codec(codec: ArticleCodec):
+    """注册编解码器（codec_id 需唯一，0-15）"""
+    CODECS[codec.name] = codec
+
+
+register_codec(JsonCodec())
+register_codec(CompactCodec())
+COMPRESSIONS["none"] = _Compression("none", 0, lambda b: b, lambda b: b)
+COMPRESSIONS["zlib"] = _Compression("zlib", 1, lambda b: zlib.compress(b, 6), zlib.decompress)
+if zstandard is not None:
+    COMPRESSIONS["zstd"] = _Compression(
+        "zstd", 2,
+        lambda b: zstandard.ZstdCompressor(level=3).compress(b),
+        lambda b: zstandard.ZstdDecompressor().decompress(b)
+    )
+
+
+def _parse_format(fmt: str) -> Tuple[ArticleCodec, _Compression]:
+    codec_name, _, compression_name = fmt.partition("+")
+    codec = CODECS.get(codec_name)
+    compression = COMPRESSIONS.get(compression_name or "none")
+    if codec is None or compression is None:
+        raise ValueError(f"不支持的文章格式: {fmt}")
+    return codec, compression
+
+
+def is_format_available(fmt: str) -> bool:
+    try:
+        _parse_format(fmt)
+        return True
+    except ValueError:
+        return False
+
+
+def pack_articles(articles: List[Dict[str, Any]], fmt: str) -> bytes:
+    """按格式将文章列表打包为带版本头的二进制值"""
+    codec, compression = _parse_format(fmt)
+    header = PACKED_MAGIC + bytes([PACKED_VERSION, (codec.codec_id << 4) | compression.compression_id])
+    return header + compression.compress(codec.encode(articles))
+
+
+def iter_packed_articles(blob: bytes) -> Iterator[Dict[str, Any]]:
+    """解析打包值：根据版本头识别编码与压缩方式，逐篇返回文章"""
+    if blob[:3] != PACKED_MAGIC:
+        raise ValueError("不是打包的文章数据")
+    version, ids = blob[3], blob[4]
+    if version != PACKED_VERSION:
+        raise ValueError(f"不支持的打包版本: {version}")
+    codec = next((c for c in CODECS.values() if c.codec_id == ids >> 4), None)
+    compression = next((c for c in COMPRESSIONS.values() if c.compression_id == ids & 0x0F), None)
+    if codec is None or compression is None:
+        raise ValueError(f"未知的编码/压缩 ID: {ids:#04x}")
+    return codec.iter_decode(compression.decompress(blob[5:]))
+
+
+def _project(article: Dict[str, Any], fields: Optional[Sequence[str]]) -> Dict[str, Any]:
+    """字段投影"""
+    if not fields:
+        return article
+    return {k: article[k] for k in fields if k in article}
 
 
 class RedisClient:
@@ -17,39 +362,282 @@ class RedisClient:
             password=REDIS_PASSWORD,
             decode_responses=True
         )
+        # 读写二进制打包值使用的客户端
+        self.raw_client = redis.Redis(
+            host=REDIS_HOST,
+            port=REDIS_PORT,
+            password=REDIS_PASSWORD,
+            decode_responses=False
+        )
+        # 最近一次 save_articles 的写入统计: count / bytes / elapsed_ms
+        self.last_save_stats: Dict[str, Any] = {}
+        self._incremental_script = self.client.register_script(INCREMENTAL_SAVE_SCRIPT)
     
     def get_today_key(self) -> str:
         """获取今天的 Redis Key"""
         today = date.today().isoformat()
         return f"{REDIS_KEY_PREFIX}:{today}"
     
+    def _index_keys(self, key: str) -> Tuple[str, str]:
+        """列表 Key 对应的 (ID->下标 索引, ID->内容摘要) 两个 Hash"""
+        return f"{key}:index", f"{key}:digest"
+    
+    @staticmethod
+    def _packed_key(key: str) -> str:
+        return f"{key}:packed"
+    
+    @staticmethod
+    def get_reader_formats_key() -> str:
+        """读取端（如 Java 端）通过 SADD 向此 Set 声明自己能解码的格式"""
+        return f"{REDIS_KEY_PREFIX}:reader_formats"
+    
+    def negotiate_format(self) -> str:
+        """
+        确定写入格式
+        打包格式只在读取端声明支持时使用，否则读取端会看到空列表：
+        REDIS_ARTICLE_FORMAT 指定了打包格式时，读取端未声明该格式则退回 json；
+        为 auto 时按偏好顺序选择读取端声明支持且本地可用的第一个格式，读取端未声明时使用 json
+        """
+        if REDIS_ARTICLE_FORMAT == "json":
+            return "json"
+        try:
+            supported = self.client.smembers(self.get_reader_formats_key())
+        except redis.RedisError:
+            supported = set()
+        if REDIS_ARTICLE_FORMAT != "auto":
+            if REDIS_ARTICLE_FORMAT in supported and is_format_available(REDIS_ARTICLE_FORMAT):
+                return REDIS_ARTICLE_FORMAT
+            print(f"[Redis] 读取端未声明支持 {REDIS_ARTICLE_FORMAT} 格式，改用 json 写入")
+            return "json"
+        for fmt in REDIS_ARTICLE_FORMAT_PREFERENCE:
+            if fmt == "json" or (fmt in supported and is_format_available(fmt)):
+                return fmt
+        return "json"
+    
     def save_articles(self, articles: List[Dict[str, Any]]) -> int:
         """
         保存文章列表到 Redis
         返回保存的文章数量
+        
+        先在事务管道中写入临时 Key，再用 RENAME 原子替换今天的 Key，
+        整个过程一次往返，读取方不会看到写了一半的列表。
+        写入字节数与耗时记录在 last_save_stats 中。
         """
         if not articles:
             return 0
         
         key = self.get_today_key()
+        fmt = self.negotiate_format()
+        if fmt != "json":
+            return self._save_packed(key, articles, fmt)
         
-        # 清空今天的旧数据
-        self.client.delete(key)
+        start = time.perf_counter()
+        pipe = self.client.pipeline(transaction=True)
+        payloads = self._queue_json_list(pipe, key, articles)
+        pipe.execute()
         
-        # 逐条存入 List
-        for article in articles:
-            self.client.rpush(key, json.dumps(article, ensure_ascii=False))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.last_save_stats = {
+            "count": len(payloads),
+            "bytes": sum(len(p.encode("utf-8")) for p in payloads),
+            "elapsed_ms": round(elapsed_ms, 2),
+        }
+        print(
+            f"[Redis] 写入 {self.last_save_stats['count']} 条, "
+            f"{self.last_save_stats['bytes']} 字节, 耗时 {self.last_save_stats['elapsed_ms']} ms"
+        )
+        
+        return len(articles)
+    
+    def _queue_json_list(self, pipe, key: str, articles: List[Dict[str, Any]]) -> List[str]:
+        """
+        在事务管道中排入整体替换 JSON 列表的命令，返回序列化后的文章
+        先写临时 Key 再 RENAME，同时重建增量模式使用的索引（两种模式可以混用），并删除打包值
+        """
+        tmp_key = f"{key}:tmp:{uuid.uuid4().hex}"
+        payloads = [json.dumps(as_dict(article), ensure_ascii=False) for article in articles]
+        
+        index_key, digest_key = self._index_keys(key)
+        index, digests = {}, {}
+        for i, article in enumerate(articles):
+            article_id = article_id_for_url(article.get("url", ""))
+            index.setdefault(article_id, i)
+            digests.setdefault(article_id, content_digest(article))
+        
+        pipe.rpush(tmp_key, *payloads)
+        # 设置24小时过期（RENAME 会保留 TTL）
+        pipe.expire(tmp_key, ARTICLE_TTL)
+        pipe.rename(tmp_key, key)
+        pipe.delete(index_key, digest_key)
+        pipe.hset(index_key, mapping=index)
+        pipe.hset(digest_key, mapping=digests)
+        pipe.expire(index_key, ARTICLE_TTL)
+        pipe.expire(digest_key, ARTICLE_TTL)
+        pipe.delete(self._packed_key(key))
+        return payloads
+    
+    def _unpack_to_json(self, key: str):
+        """把今天的打包值展开为 JSON 列表和索引（WATCH 打包值，期间被改写则重试）"""
+        packed_key = self._packed_key(key)
+        with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    pipe.watch(packed_key)
+                    blob = self.raw_client.get(packed_key)
+                    if not blob:
+                        return
+                    articles = list(iter_packed_articles(blob))
+                    pipe.multi()
+                    if articles:
+                        self._queue_json_list(pipe, key, articles)
+                    else:
+                        pipe.delete(packed_key)
+                    pipe.execute()
+                    print(f"[Redis] 已将 {len(articles)} 条打包格式文章展开为 JSON 列表")
+                    return
+                except redis.WatchError:
+                    continue
+    
+    def _save_packed(self, key: str, articles: List[Dict[str, Any]], fmt: str) -> int:
+        """以打包格式整体写入（单个值，SET 天然原子），同时删除 JSON 列表"""
+        start = time.perf_counter()
+        blob = pack_articles(articles, fmt)
         
-        # 设置24小时过期
-        self.client.expire(key, 86400)
+        pipe = self.raw_client.pipeline(transaction=True)
+        pipe.set(self._packed_key(key), blob, ex=ARTICLE_TTL)
+        pipe.delete(key, *self._index_keys(key))
+        pipe.execute()
         
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.last_save_stats = {
+            "count": len(articles),
+            "bytes": len(blob),
+            "elapsed_ms": round(elapsed_ms, 2),
+            "format": fmt,
+        }
+        print(
+            f"[Redis] 写入 {len(articles)} 条 ({fmt}), "
+            f"{len(blob)} 字节, 耗时 {self.last_save_stats['elapsed_ms']} ms"
+        )
         return len(articles)
     
+    def save_articles_incremental(self, articles: List[Dict[str, Any]]) -> int:
+        """
+        增量保存文章：不清空今天的列表，只写入新增或内容变化的文章
+        返回写入（新增 + 更新）的文章数量
+        
+        文章 ID 由规范化 URL 生成，同一链接多次爬取 ID 不变；
+        已存在的文章若分数等内容变化则在列表中原地更新，不会产生重复条目。
+        今天的文章此前以打包格式整体写入时，先展开为 JSON 列表再增量写入。
+        """
+        if not articles:
+            return 0
+        
+        key = self.get_today_key()
+        index_key, digest_key = self._index_keys(key)
+        
+        start = time.perf_counter()
+        args = [ARTICLE_TTL]
+        seen = set()
+        total_bytes = 0
+        for article in articles:
+            article_id = article_id_for_url(article.get("url", ""))
+            if article_id in seen:
+                continue
+            seen.add(article_id)
+            article = dict(article, id=article_id)
+            payload = json.dumps(article, ensure_ascii=False)
+            total_bytes += len(payload.encode("utf-8"))
+            args.extend([article_id, content_digest(article), payload])
+        
+        keys = [key, index_key, digest_key, self._packed_key(key)]
+        added, updated = self._incremental_script(keys=keys, args=args)
+        while added < 0:
+            # 今天的文章已整体以打包格式写入：先展开为 JSON 列表，不能直接覆盖
+            self._unpack_to_json(key)
+            added, updated = self._incremental_script(keys=keys, args=args)
+        
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.last_save_stats = {
+            "count": added + updated,
+            "added": added,
+            "updated": updated,
+            "unchanged": len(seen) - added - updated,
+            "bytes": total_bytes,
+            "elapsed_ms": round(elapsed_ms, 2),
+        }
+        print(
+            f"[Redis] 增量写入: 新增 {added} 条, 更新 {updated} 条, "
+            f"未变化 {self.last_save_stats['unchanged']} 条, 耗时 {self.last_save_stats['elapsed_ms']} ms"
+        )
+        
+        return added + updated
+    
     def get_articles(self) -> List[Dict[str, Any]]:
-        """获取今天的文章列表"""
+        """获取今天的文章列表（自动识别 JSON 列表或打包格式）"""
+        return list(self.iter_articles())
+    
+    def iter_articles(
+        self,
+        page_size: int = ARTICLE_PAGE_SIZE,
+        start: int = 0,
+        stop: int = -1,
+        fields: Optional[Sequence[str]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        逐篇读取今天的文章（生成器），内存占用与列表长度无关
+        
+        Args:
+            page_size: 每次 LRANGE 读取的条数
+            start: 起始下标（含），支持负数
+            stop: 结束下标（含），-1 表示到末尾，语义同 LRANGE
+            fields: 只返回指定字段，如 ("title", "url", "source")
+        
+        JSON 列表按页在服务端切片；打包格式需整体读取压缩值，但仍逐篇解码。
+        """
         key = self.get_today_key()
-        raw_list = self.client.lrange(key, 0, -1)
-        return [json.loads(item) for item in raw_list]
+        blob = self.raw_client.get(self._packed_key(key))
+        if blob:
+            articles = iter_packed_articles(blob)
+            if start < 0 or stop < -1:
+                # 负数下标需要知道总数，先物化
+                articles = iter(list(articles)[start:None if stop == -1 else stop + 1])
+            else:
+                articles = itertools.islice(articles, start, None if stop == -1 else stop + 1)
+            for article in articles:
+                yield _project(article, fields)
+            return
+        
+        # 负数下标换算为正数
+        if start < 0 or stop < -1:
+            length = self.client.llen(key)
+            start = max(length + start, 0) if start < 0 else start
+            stop = length + stop if stop < 0 else stop
+            if stop < start:
+                return
+        
+        pos = start
+        page_size = max(1, page_size)
+        while True:
+            end = pos + page_size - 1
+            if stop != -1:
+                end = min(end, stop)
+            requested = end - pos + 1
+            page = self.client.lrange(key, pos, end)
+            for item in page:
+                yield _project(json.loads(item), fields)
+            pos += len(page)
+            # 不足一页说明已到列表末尾
+            if len(page) < requested or (stop != -1 and pos > stop):
+                return
+    
+    def count_articles(self) -> int:
+        """今天的文章数量"""
+        key = self.get_today_key()
+        blob = self.raw_client.get(self._packed_key(key))
+        if blob:
+            return sum(1 for _ in iter_packed_articles(blob))
+        return self.client.llen(key)
     
     def save_football(self, data: Dict[str, Any]) -> bool:
         """保存足球数据到Redis"""
@@ -58,7 +646,7 @@ class RedisClient:
         
         key = f"{REDIS_KEY_PREFIX}:football:{date.today().isoformat()}"
         self.client.set(key, json.dumps(data, ensure_ascii=False))
-        self.client.expire(key, 86400)
+        self.client.expire(key, ARTICLE_TTL)
         return True
     
     def get_football(self) -> Dict[str, Any]:
@@ -67,6 +655,25 @@ class RedisClient:
         data = self.client.get(key)
         return json.loads(data) if data else {}
     
+    def _metrics_key(self) -> str:
+        return f"{self.get_today_key()}:metrics"
+
+    def save_run_report(self, report: Dict[str, Any]) -> bool:
+        """
+        保存本轮爬取的运行报告
+        追加到今天文章 Key 旁的 {key}:metrics 列表（最新在前，保留 METRICS_HISTORY_SIZE 条）
+        """
+        pipe = self.client.pipeline(transaction=True)
+        pipe.lpush(self._metrics_key(), json.dumps(report, ensure_ascii=False))
+        pipe.ltrim(self._metrics_key(), 0, METRICS_HISTORY_SIZE - 1)
+        pipe.expire(self._metrics_key(), ARTICLE_TTL)
+        pipe.execute()
+        return True
+
+    def get_run_reports(self, limit: int = 1) -> List[Dict[str, Any]]:
+        """获取今天最近 limit 轮爬取的运行报告（最新在前）"""
+        return [json.loads(r) for r in self.client.lrange(self._metrics_key(), 0, limit - 1)]
+
     def ping(self) -> bool:
         """测试 Redis 连接"""
         try:
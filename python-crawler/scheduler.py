@@ -0,0 +1,204 @@
+"""
+守护进程调度器
+常驻进程内按各数据源自己的间隔调度爬取，复用已建立的 HTTP 会话和连接池，
+避免 cron 每次重新启动 Python、导入依赖和建立连接
+
+- 间隔带随机抖动，启动时各数据源随机错开，避免同时请求
+- 同一数据源上一次爬取未结束时不会再次启动（下次时间从本次结束时算起）
+- 超过单源超时的爬取只记录告警，结束前不会重新调度
+- 日期变化时立即重新爬取所有数据源，使新一天的文章列表完整
+- stop() 后不再启动新的爬取，等待进行中的爬取完成（最多 shutdown_timeout 秒）
+"""
+import time
+import random
+import threading
+from datetime import date
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, List, Optional
+
+from config import (
+    CRAWL_WORKERS,
+    CRAWL_SOURCE_TIMEOUT,
+    CRAWL_CONCURRENCY_LIMITS,
+    CRAWL_DAEMON_JITTER,
+    CRAWL_DAEMON_STAGGER,
+    CRAWL_DAEMON_SHUTDOWN_TIMEOUT,
+)
+from crawlers.registry import Source
+from crawlers.retry import retry_budget
+
+
+class CrawlScheduler:
+    """
+    按数据源间隔调度爬取
+
+    Usage:
+        scheduler = CrawlScheduler(registry.sources(), execute=crawl_and_store)
+        signal.signal(signal.SIGTERM, lambda *_: scheduler.stop())
+        scheduler.run()  # 阻塞直到 stop()
+    """
+
+    def __init__(
+        self,
+        sources: List[Source],
+        execute: Callable[[Source], Any],
+        workers: int = CRAWL_WORKERS,
+        source_timeout: float = CRAWL_SOURCE_TIMEOUT,
+        jitter: float = CRAWL_DAEMON_JITTER,
+        stagger: float = CRAWL_DAEMON_STAGGER,
+        shutdown_timeout: float = CRAWL_DAEMON_SHUTDOWN_TIMEOUT
+    ):
+        """
+        Args:
+            sources: 要调度的数据源
+            execute: 执行一次爬取（含存储），返回结果用于计算下次间隔
+            workers: 同时进行的最大爬取数
+            source_timeout: 未声明超时的数据源的超时（秒），超时只告警
+            jitter: 间隔的随机抖动比例，如 0.1 表示 ±10%
+            stagger: 启动时各数据源首次爬取错开的最大秒数
+            shutdown_timeout: 退出时等待进行中爬取的最长秒数
+        """
+        self.sources = {source.key: source for source in sources}
+        self.execute = execute
+        self.workers = max(1, workers)
+        self.source_timeout = source_timeout
+        self.jitter = jitter
+        self.stagger = stagger
+        self.shutdown_timeout = shutdown_timeout
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._class_slots = {
+            name: threading.BoundedSemaphore(max(1, limit)) for name, limit in CRAWL_CONCURRENCY_LIMITS.items()
+        }
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._next_run: Dict[str, float] = {}
+        self._running: Dict[str, Optional[float]] = {}  # key -> 开始时间（等待名额时为 None）
+        self._warned: set = set()
+        self._threads: Dict[str, threading.Thread] = {}
+        self._day = date.today()
+
+    def _jittered(self, interval: float) -> float:
+        return max(1.0, interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def _finished(self, source: Source, started: float, result: Any):
+        interval = self._jittered(source.interval_after(result))
+        with self._lock:
+            self._running.pop(source.key, None)
+            self._warned.discard(source.key)
+            self._next_run[source.key] = time.monotonic() + interval
+        wait_text = f"{interval / 60:.1f} 分钟" if interval >= 60 else f"{interval:.0f} 秒"
+        print(f"[Daemon] {source.label} 完成，耗时 {time.monotonic() - started:.1f}s，{wait_text}后再次爬取")
+
+    def _run_source(self, source: Source):
+        result = None
+        # 先占用类别名额再占用全局名额，避免等待类别名额时占着全局名额
+        with self._class_slots.get(source.concurrency) or nullcontext(), self._slots:
+            if self._stop_event.is_set():
+                with self._lock:
+                    self._running.pop(source.key, None)
+                return
+            started = time.monotonic()
+            with self._lock:
+                self._running[source.key] = started
+            print(f"[Daemon] 开始爬取 {source.label}")
+            try:
+                result = self.execute(source)
+            except Exception as e:
+                print(f"[Daemon] {source.label} 爬取失败: {e}")
+            finally:
+                self._finished(source, started, result)
+
+    def _dispatch(self, now: float):
+        with self._lock:
+            due = [
+                key for key, at in self._next_run.items()
+                if at <= now and key not in self._running
+            ]
+            if due and not self._running:
+                # 没有进行中的爬取时开始新的重试预算周期
+                retry_budget.reset()
+            for key in due:
+                self._running[key] = None
+                self._next_run[key] = float("inf")  # 结束时重新计算
+        for key in due:
+            # 守护线程：超时放弃的爬取不会阻塞进程退出
+            thread = threading.Thread(
+                target=self._run_source, args=(self.sources[key],), name=f"daemon-{key}", daemon=True
+            )
+            self._threads[key] = thread
+            thread.start()
+
+    def _check_day(self, now: float):
+        """跨天后今天的文章 Key 为空，所有未在进行中的数据源立即重新爬取"""
+        today = date.today()
+        if today == self._day:
+            return
+        self._day = today
+        print(f"[Daemon] 日期变为 {today}，重新爬取所有数据源")
+        with self._lock:
+            for key in self._next_run:
+                if key not in self._running:
+                    self._next_run[key] = min(self._next_run[key], now)
+
+    def _check_timeouts(self, now: float):
+        with self._lock:
+            running = dict(self._running)
+        for key, started in running.items():
+            if started is None:
+                continue
+            timeout = self.sources[key].timeout or self.source_timeout
+            if now - started >= timeout and key not in self._warned:
+                self._warned.add(key)
+                print(f"[Daemon] ⚠ {self.sources[key].label} 已运行超过 {timeout:g}s，结束前不会重新调度")
+
+    def _wait_time(self, now: float) -> float:
+        with self._lock:
+            next_at = min(self._next_run.values(), default=now + 1.0)
+        return min(max(0.0, next_at - now), 1.0)
+
+    def run(self):
+        """运行调度循环，阻塞直到 stop()"""
+        start = time.monotonic()
+        self._next_run = {key: start + random.uniform(0, self.stagger) for key in self.sources}
+        print(f"[Daemon] 已启动，调度 {len(self.sources)} 个数据源:")
+        for source in self.sources.values():
+            print(f"  - {source.label}: 每 {source.interval / 60:g} 分钟")
+
+        try:
+            while not self._stop_event.is_set():
+                now = time.monotonic()
+                self._check_day(now)
+                self._dispatch(now)
+                self._check_timeouts(now)
+                self._stop_event.wait(self._wait_time(now))
+        finally:
+            self._shutdown()
+
+    def _shutdown(self):
+        running = [t for t in self._threads.values() if t.is_alive()]
+        if running:
+            print(f"[Daemon] 正在等待 {len(running)} 个进行中的爬取完成（最多 {self.shutdown_timeout:g}s）...")
+            deadline = time.monotonic() + self.shutdown_timeout
+            for thread in running:
+                thread.join(max(0.0, deadline - time.monotonic()))
+            abandoned = [t for t in running if t.is_alive()]
+            if abandoned:
+                print(f"[Daemon] ⚠ {len(abandoned)} 个爬取未在限定时间内完成，已放弃")
+        print("[Daemon] 已停止")
+
+    def stop(self):
+        """请求停止（可在信号处理函数中调用）"""
+        self._stop_event.set()
+
+    @property
+    def running(self) -> List[str]:
+        with self._lock:
+            return list(self._running)
+
+    def next_run_in(self, key: str) -> Optional[float]:
+        """数据源 key 距下次爬取的秒数，进行中时返回 None"""
+        with self._lock:
+            at = self._next_run.get(key)
+        if at is None or at == float("inf"):
+            return None
+        return max(0.0, at - time.monotonic())
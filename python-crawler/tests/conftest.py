@@ -0,0 +1,17 @@
+"""
+测试共用夹具：使用 fakeredis（含 Lua 支持）代替真实 Redis，各模块通过 client 参数注入
+"""
+import types
+
+import fakeredis
+import pytest
+
+
+@pytest.fixture
+def redis_stub():
+    """与 RedisClient 结构相同的替身：client（解码字符串）与 raw_client（字节）共享同一个服务端"""
+    server = fakeredis.FakeServer()
+    return types.SimpleNamespace(
+        client=fakeredis.FakeRedis(server=server, decode_responses=True),
+        raw_client=fakeredis.FakeRedis(server=server),
+    )
@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+
+from crawlers.registry import Source
+from work_queue import CrawlQueue, CrawlTask, QueueWorker
+
+
+@pytest.fixture
+def queue(redis_stub):
+    return CrawlQueue(redis_stub, visibility_timeout=30, max_attempts=2, ttl=3600)
+
+
+def _tasks(run_id, *sources):
+    return [CrawlTask(f"{run_id}:{source}:0", source, {}, run_id, 0) for source in sources]
+
+
+def test_fail_requeues_until_max_attempts_then_dead_letters(queue):
+    queue.enqueue(_tasks("r1", "hackernews"))
+
+    task = queue.claim("w1")
+    assert task.attempts == 1
+    assert queue.fail(task, RuntimeError("boom")) == "requeued"
+
+    task = queue.claim("w1")
+    assert task.attempts == 2
+    assert queue.fail(task, RuntimeError("boom again")) == "dead"
+
+    assert queue.claim("w1") is None
+    assert queue.stats() == {"pending": 0, "inflight": 0, "dead": 1}
+    [dead] = queue.dead_letters()
+    assert dead["id"] == "r1:hackernews:0"
+    assert dead["attempts"] == 2
+    assert dead["error"] == "RuntimeError: boom again"
+
+
+def test_reap_requeues_tasks_past_visibility_timeout(queue):
+    queue.visibility_timeout = 0.05
+    queue.enqueue(_tasks("r1", "hackernews"))
+    task = queue.claim("w1")
+
+    assert queue.reap() == (0, 0)
+    time.sleep(0.1)
+    assert queue.reap() == (1, 0)
+
+    again = queue.claim("w2")
+    assert again.id == task.id
+    assert again.attempts == 2
+
+
+def test_reap_dead_letters_after_max_attempts(queue):
+    queue.visibility_timeout = 0.05
+    queue.max_attempts = 1
+    queue.enqueue(_tasks("r1", "hackernews"))
+    queue.claim("w1")
+    time.sleep(0.1)
+
+    assert queue.reap() == (0, 1)
+    assert queue.stats()["dead"] == 1
+
+
+def test_first_ack_wins_over_late_ack_after_reclaim(queue):
+    queue.visibility_timeout = 0.05
+    tasks = _tasks("r1", "hackernews")
+    queue.enqueue(tasks)
+    slow = queue.claim("slow")
+    time.sleep(0.1)
+    queue.reap()
+    fast = queue.claim("fast")
+
+    assert queue.ack(fast, [{"title": "fast"}]) is True
+    assert queue.ack(slow, [{"title": "slow"}]) is False
+    assert queue.fail(slow, RuntimeError("late")) == "lost"
+    assert queue.results(tasks) == {"r1:hackernews:0": [{"title": "fast"}]}
+
+
+def test_wait_cancels_unfinished_tasks_on_timeout(queue):
+    tasks = _tasks("r1", "hackernews", "github")
+    queue.enqueue(tasks)
+    first = queue.claim("w1")
+    queue.ack(first, [])
+
+    status = queue.wait(tasks, timeout=0.2, poll_interval=0.05)
+
+    assert status == {first.id: "done", (set(t.id for t in tasks) - {first.id}).pop(): "cancelled"}
+    assert queue.stats()["pending"] == 0
+    assert queue.claim("w1") is None
+
+
+def test_requeue_dead_only_for_runs_still_waiting(queue):
+    queue.max_attempts = 1
+    waiting, finished = _tasks("r1", "hackernews"), _tasks("r2", "github")
+    queue.enqueue(waiting + finished)
+    for _ in range(2):
+        queue.fail(queue.claim("w1"), RuntimeError("boom"))
+
+    queue._open_runs(["r1"], timeout=60)
+    assert queue.requeue_dead() == (1, 1)
+    assert queue.stats() == {"pending": 1, "inflight": 0, "dead": 1}
+    assert queue.claim("w1").id == "r1:hackernews:0"
+
+    # 协调进程结束后不再重新入队
+    queue._close_runs(["r1"])
+    assert queue.requeue_dead() == (0, 1)
+
+
+def test_requeued_dead_task_completes_its_run(queue):
+    queue.max_attempts = 1
+    tasks = _tasks("r1", "hackernews")
+    queue.enqueue(tasks)
+    result = {}
+    waiter = threading.Thread(target=lambda: result.update(queue.wait(tasks, timeout=5, poll_interval=0.05)))
+
+    queue._open_runs(["r1"], timeout=60)
+    queue.fail(queue.claim("w1"), RuntimeError("boom"))
+    assert queue.requeue_dead() == (1, 0)
+    waiter.start()
+    queue.ack(queue.claim("w1"), [])
+    waiter.join()
+
+    assert result == {"r1:hackernews:0": "done"}
+
+
+def test_worker_gives_up_on_task_past_source_timeout(queue, monkeypatch):
+    queue.max_attempts = 1
+    release = threading.Event()
+    source = Source("slow", "Slow", lambda: [], None, timeout=0.2)
+    monkeypatch.setattr("work_queue.registry.get", lambda key: source)
+    worker = QueueWorker(queue, execute=lambda source, params: release.wait(5))
+    queue.enqueue(_tasks("r1", "slow"))
+
+    start = time.monotonic()
+    worker.process(queue.claim(worker.worker_id), source_timeout=60)
+    release.set()
+
+    assert time.monotonic() - start < 2
+    [dead] = queue.dead_letters()
+    assert dead["error"].startswith("TimeoutError")
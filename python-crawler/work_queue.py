@@ -0,0 +1,624 @@
+"""
+分布式爬取队列
+协调进程把本轮爬取拆成任务写入 Redis（每个数据源一个任务，声明了 shards 的数据源
+如 HN、arXiv 按故事组/页拆分），任意数量的 worker 进程或节点领取并执行，
+协调进程按优先级合并结果后写入今天的文章列表
+
+- 领取时设置可见性超时，worker 执行期间定期续期；进程崩溃未确认的任务超时后重新入队
+- 同一任务最多尝试 max_attempts 次，之后移入死信队列并记录最后一次错误
+- 确认以先完成的结果为准，超时后被重新领取的任务迟到的结果不会重复写入
+
+Redis 结构：
+    {prefix}:queue:pending      LIST  待领取的任务 ID（LPUSH 入队，RPOP 领取）
+    {prefix}:queue:inflight     ZSET  member=任务 ID, score=可见性截止时间（毫秒，Redis TIME）
+    {prefix}:queue:tasks        HASH  任务 ID -> 任务 JSON
+    {prefix}:queue:attempts     HASH  任务 ID -> 已领取次数
+    {prefix}:queue:leases       HASH  任务 ID -> 当前租约令牌
+    {prefix}:queue:status       HASH  任务 ID -> done / dead / cancelled
+    {prefix}:queue:results      HASH  任务 ID -> 结果 JSON
+    {prefix}:queue:errors       HASH  任务 ID -> 最近一次错误
+    {prefix}:queue:dead         LIST  死信任务 ID
+    {prefix}:queue:runs         HASH  协调进程仍在等待的轮次 ID -> 等待截止时间（毫秒，Redis TIME）
+
+死信任务只能在所属轮次的协调进程仍在等待时重新入队（任务 ID 以轮次 ID 开头）；
+协调进程合并结果并退出后，迟到的结果无人合并，这些任务保留在死信队列中供排查
+"""
+import json
+import time
+import uuid
+import socket
+import threading
+import contextvars
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import (
+    REDIS_KEY_PREFIX,
+    CRAWL_SOURCE_TIMEOUT,
+    WORK_QUEUE_VISIBILITY_TIMEOUT,
+    WORK_QUEUE_MAX_ATTEMPTS,
+    WORK_QUEUE_POLL_INTERVAL,
+    WORK_QUEUE_TTL,
+)
+from crawlers.registry import Source, registry
+from crawlers.article import as_dict
+from crawlers.utils import article_id_for_url
+from redis_client import RedisClient, redis_client
+
+QUEUE_PREFIX = f"{REDIS_KEY_PREFIX}:queue"
+
+# 领取一个任务：出队、增加尝试次数、记录租约并加入可见性 ZSET
+# KEYS: pending, inflight, tasks, attempts, leases
+# ARGV: 可见性超时（毫秒）, worker 标识
+CLAIM_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+while true do
+    local id = redis.call('RPOP', KEYS[1])
+    if not id then
+        return nil
+    end
+    local body = redis.call('HGET', KEYS[3], id)
+    if body then
+        local attempts = redis.call('HINCRBY', KEYS[4], id, 1)
+        local token = ARGV[2] .. ':' .. attempts
+        redis.call('HSET', KEYS[5], id, token)
+        redis.call('ZADD', KEYS[2], now + tonumber(ARGV[1]), id)
+        return {id, token, body, attempts}
+    end
+end
+"""
+
+# 续期：租约仍属于调用方时推迟可见性截止时间
+# KEYS: inflight, leases
+# ARGV: 任务 ID, 租约令牌, 可见性超时（毫秒）
+EXTEND_SCRIPT = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('ZADD', KEYS[1], 'XX', now + tonumber(ARGV[3]), ARGV[1])
+return 1
+"""
+
+# 确认完成：先完成的结果生效，同时从待领取列表移除（超时后可能已重新入队）
+# KEYS: inflight, leases, pending, status, results, attempts
+# ARGV: 任务 ID, 结果 JSON, TTL
+ACK_SCRIPT = """
+redis.call('ZREM', KEYS[1], ARGV[1])
+if redis.call('HGET', KEYS[4], ARGV[1]) then
+    return 0
+end
+redis.call('LREM', KEYS[3], 0, ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('HSET', KEYS[4], ARGV[1], 'done')
+redis.call('HSET', KEYS[5], ARGV[1], ARGV[2])
+for i = 4, 6 do
+    redis.call('EXPIRE', KEYS[i], tonumber(ARGV[3]))
+end
+return 1
+"""
+
+# 任务失败 / 可见性超时后的处理：未达到尝试上限时重新入队，否则移入死信队列
+# 两个脚本共用，KEYS: inflight, leases, attempts, pending, dead, status, errors, tasks
+_RELEASE_LUA = """
+local function release(id, err, max_attempts, ttl)
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('HDEL', KEYS[2], id)
+    redis.call('HSET', KEYS[7], id, err)
+    if redis.call('HGET', KEYS[6], id) then
+        return 2
+    end
+    local attempts = tonumber(redis.call('HGET', KEYS[3], id) or '0')
+    if attempts >= max_attempts then
+        redis.call('LPUSH', KEYS[5], id)
+        redis.call('HSET', KEYS[6], id, 'dead')
+        for i = 5, 8 do
+            redis.call('EXPIRE', KEYS[i], ttl)
+        end
+        return 0
+    end
+    redis.call('LPUSH', KEYS[4], id)
+    return 1
+end
+"""
+
+# ARGV: 任务 ID, 租约令牌, 错误信息, 最大尝试次数, TTL
+FAIL_SCRIPT = _RELEASE_LUA + """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return -1
+end
+return release(ARGV[1], ARGV[3], tonumber(ARGV[4]), tonumber(ARGV[5]))
+"""
+
+# ARGV: 最大尝试次数, TTL, 单次最多处理条数
+REAP_SCRIPT = _RELEASE_LUA + """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, tonumber(ARGV[3]))
+local requeued, dead = 0, 0
+for _, id in ipairs(ids) do
+    local result = release(id, 'visibility timeout', tonumber(ARGV[1]), tonumber(ARGV[2]))
+    if result == 1 then
+        requeued = requeued + 1
+    elseif result == 0 then
+        dead = dead + 1
+    end
+end
+return {requeued, dead}
+"""
+
+
+# 重新入队死信任务：只处理所属轮次仍在等待的任务，顺带清除已过截止时间的轮次
+# KEYS: dead, runs, attempts, status, pending
+REQUEUE_DEAD_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local ids = redis.call('LRANGE', KEYS[1], 0, -1)
+local requeued = 0
+for _, id in ipairs(ids) do
+    local run = string.match(id, '^([^:]+):')
+    local deadline = run and redis.call('HGET', KEYS[2], run)
+    if deadline and tonumber(deadline) <= now then
+        redis.call('HDEL', KEYS[2], run)
+        deadline = nil
+    end
+    if deadline then
+        redis.call('LREM', KEYS[1], 0, id)
+        redis.call('HDEL', KEYS[3], id)
+        redis.call('HDEL', KEYS[4], id)
+        redis.call('LPUSH', KEYS[5], id)
+        requeued = requeued + 1
+    end
+end
+return {requeued, #ids - requeued}
+"""
+
+
+class CrawlTask:
+    """队列中的一个爬取任务：数据源 key 加子任务参数覆盖"""
+
+    def __init__(self, task_id: str, source: str, params: Dict[str, Any] = None, run_id: str = "", shard: int = 0):
+        self.id = task_id
+        self.source = source
+        self.params = dict(params or {})
+        self.run_id = run_id
+        self.shard = shard
+        # 领取后由队列填充
+        self.token: Optional[str] = None
+        self.attempts = 0
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"id": self.id, "source": self.source, "params": self.params, "run_id": self.run_id, "shard": self.shard},
+            ensure_ascii=False
+        )
+
+    @classmethod
+    def from_json(cls, raw: str) -> "CrawlTask":
+        data = json.loads(raw)
+        return cls(data["id"], data["source"], data.get("params"), data.get("run_id", ""), data.get("shard", 0))
+
+    def __repr__(self) -> str:
+        return f"CrawlTask({self.id!r}, source={self.source!r}, attempts={self.attempts})"
+
+
+class CrawlQueue:
+    """
+    基于 Redis 的爬取任务队列
+
+    Usage:
+        # 协调进程
+        run_id, tasks = crawl_queue.submit_run(registry.sources())
+        crawl_queue.wait(tasks, timeout=300)
+        results = crawl_queue.merge(registry.sources(), tasks)
+
+        # worker
+        task = crawl_queue.claim("worker-1")
+        crawl_queue.ack(task, result)  # 或 crawl_queue.fail(task, error)
+    """
+
+    def __init__(
+        self,
+        client: RedisClient = redis_client,
+        visibility_timeout: float = WORK_QUEUE_VISIBILITY_TIMEOUT,
+        max_attempts: int = WORK_QUEUE_MAX_ATTEMPTS,
+        ttl: int = WORK_QUEUE_TTL
+    ):
+        """
+        Args:
+            client: Redis 客户端封装
+            visibility_timeout: 可见性超时（秒）
+            max_attempts: 单个任务最多尝试次数
+            ttl: 任务、结果和死信的保留时间（秒）
+        """
+        self.redis = client.client
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.ttl = ttl
+        self._claim = self.redis.register_script(CLAIM_SCRIPT)
+        self._extend = self.redis.register_script(EXTEND_SCRIPT)
+        self._ack = self.redis.register_script(ACK_SCRIPT)
+        self._fail = self.redis.register_script(FAIL_SCRIPT)
+        self._reap = self.redis.register_script(REAP_SCRIPT)
+        self._requeue_dead = self.redis.register_script(REQUEUE_DEAD_SCRIPT)
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return f"{QUEUE_PREFIX}:{name}"
+
+    def _release_keys(self) -> List[str]:
+        return [self._key(name) for name in (
+            "inflight", "leases", "attempts", "pending", "dead", "status", "errors", "tasks"
+        )]
+
+    @property
+    def _visibility_ms(self) -> int:
+        return int(self.visibility_timeout * 1000)
+
+    # === 生产 ===
+
+    def enqueue(self, tasks: List[CrawlTask]):
+        """批量入队（一次事务往返）"""
+        if not tasks:
+            return
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(self._key("tasks"), mapping={task.id: task.to_json() for task in tasks})
+        pipe.lpush(self._key("pending"), *[task.id for task in tasks])
+        pipe.expire(self._key("tasks"), self.ttl)
+        pipe.execute()
+
+    def submit_run(self, sources: List[Source]) -> Tuple[str, List[CrawlTask]]:
+        """
+        将一轮爬取拆分为任务并入队
+        拆分子任务失败的数据源（如获取 HN 故事 ID 失败）作为单个任务入队，由 worker 完整爬取
+        """
+        run_id = uuid.uuid4().hex[:12]
+        tasks = []
+        for source in sources:
+            try:
+                shards = source.shards()
+            except Exception as e:
+                print(f"[Queue] {source.label} 拆分子任务失败，作为单个任务入队: {e}")
+                shards = [{}]
+            for index, params in enumerate(shards):
+                tasks.append(CrawlTask(f"{run_id}:{source.key}:{index}", source.key, params, run_id, index))
+        self.enqueue(tasks)
+        print(f"[Queue] 本轮 {run_id} 已入队 {len(tasks)} 个任务 ({len(sources)} 个数据源)")
+        return run_id, tasks
+
+    # === 消费 ===
+
+    def claim(self, worker_id: str) -> Optional[CrawlTask]:
+        """领取一个任务，队列为空时返回 None"""
+        claimed = self._claim(
+            keys=[self._key(name) for name in ("pending", "inflight", "tasks", "attempts", "leases")],
+            args=[self._visibility_ms, worker_id]
+        )
+        if not claimed:
+            return None
+        _, token, body, attempts = claimed
+        task = CrawlTask.from_json(body)
+        task.token = token
+        task.attempts = int(attempts)
+        return task
+
+    def extend(self, task: CrawlTask) -> bool:
+        """续期可见性超时，租约已失效（被重新领取）时返回 False"""
+        return bool(self._extend(
+            keys=[self._key("inflight"), self._key("leases")],
+            args=[task.id, task.token, self._visibility_ms]
+        ))
+
+    def ack(self, task: CrawlTask, result: Any) -> bool:
+        """确认完成并保存结果，任务已由其他 worker 完成时返回 False"""
+        return bool(self._ack(
+            keys=[self._key(name) for name in ("inflight", "leases", "pending", "status", "results", "attempts")],
+            args=[task.id, json.dumps(result, ensure_ascii=False, default=as_dict), self.ttl]
+        ))
+
+    def fail(self, task: CrawlTask, error: BaseException) -> str:
+        """
+        报告失败，返回 requeued / dead / done / lost
+        lost 表示租约已失效，任务已被其他 worker 重新领取
+        """
+        code = self._fail(
+            keys=self._release_keys(),
+            args=[task.id, task.token, f"{type(error).__name__}: {error}", self.max_attempts, self.ttl]
+        )
+        return {1: "requeued", 0: "dead", 2: "done"}.get(code, "lost")
+
+    def reap(self, limit: int = 100) -> Tuple[int, int]:
+        """处理超过可见性截止时间的任务，返回 (重新入队数, 移入死信数)"""
+        requeued, dead = self._reap(keys=self._release_keys(), args=[self.max_attempts, self.ttl, limit])
+        if requeued or dead:
+            print(f"[Queue] 可见性超时: 重新入队 {requeued} 个任务, 移入死信 {dead} 个")
+        return requeued, dead
+
+    # === 协调 ===
+
+    def wait(
+        self,
+        tasks: List[CrawlTask],
+        timeout: float,
+        poll_interval: float = WORK_QUEUE_POLL_INTERVAL,
+        stop_event: threading.Event = None
+    ) -> Dict[str, str]:
+        """
+        等待任务全部完成或进入死信队列，期间代为处理可见性超时
+        超时后未领取的任务从队列中取消，返回 {任务 ID: 状态}
+        """
+        ids = [task.id for task in tasks]
+        run_ids = sorted({task.run_id for task in tasks if task.run_id})
+        deadline = time.monotonic() + timeout
+        self._open_runs(run_ids, timeout)
+        while True:
+            self.reap()
+            status = self._status(ids)
+            expired = time.monotonic() >= deadline or (stop_event is not None and stop_event.is_set())
+            if len(status) == len(ids) or expired:
+                # 先关闭轮次再读取最终状态，之后 requeue_dead 不会再把本轮任务放回队列
+                self._close_runs(run_ids)
+                status = self._status(ids)
+                if len(status) == len(ids):
+                    return status
+                if expired:
+                    break
+                # 关闭前有死信任务被重新入队，继续等待
+                self._open_runs(run_ids, deadline - time.monotonic())
+                continue
+            time.sleep(poll_interval)
+
+        unfinished = [task_id for task_id in ids if task_id not in status]
+        pipe = self.redis.pipeline(transaction=True)
+        for task_id in unfinished:
+            pipe.lrem(self._key("pending"), 0, task_id)
+            pipe.hsetnx(self._key("status"), task_id, "cancelled")
+        pipe.execute()
+        print(f"[Queue] {len(unfinished)} 个任务未在 {timeout:g}s 内完成，已取消")
+        return dict(status, **{task_id: "cancelled" for task_id in unfinished})
+
+    def _status(self, ids: List[str]) -> Dict[str, str]:
+        """已结束任务的状态 {任务 ID: done / dead / cancelled}"""
+        if not ids:
+            return {}
+        return {
+            task_id: value
+            for task_id, value in zip(ids, self.redis.hmget(self._key("status"), ids))
+            if value
+        }
+
+    def _open_runs(self, run_ids: List[str], timeout: float):
+        """登记正在等待的轮次，截止时间之后视为协调进程已退出（如崩溃）"""
+        if not run_ids:
+            return
+        seconds, micros = self.redis.time()
+        until = seconds * 1000 + micros // 1000 + int(max(timeout, 0) * 1000)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(self._key("runs"), mapping={run_id: until for run_id in run_ids})
+        pipe.expire(self._key("runs"), self.ttl)
+        pipe.execute()
+
+    def _close_runs(self, run_ids: List[str]):
+        if run_ids:
+            self.redis.hdel(self._key("runs"), *run_ids)
+
+    def results(self, tasks: List[CrawlTask]) -> Dict[str, Any]:
+        """已完成任务的结果 {任务 ID: 结果}"""
+        ids = [task.id for task in tasks]
+        if not ids:
+            return {}
+        return {
+            task_id: json.loads(raw)
+            for task_id, raw in zip(ids, self.redis.hmget(self._key("results"), ids))
+            if raw is not None
+        }
+
+    def merge(self, sources: List[Source], tasks: List[CrawlTask]) -> Dict[str, Any]:
+        """
+        按数据源合并任务结果，返回 {key: 结果}
+        拆分的数据源按子任务顺序拼接、按 URL 去重后截取配额；全部子任务失败的数据源不在结果中
+        """
+        results = self.results(tasks)
+        by_source: Dict[str, List[CrawlTask]] = {}
+        for task in tasks:
+            by_source.setdefault(task.source, []).append(task)
+
+        merged = {}
+        for source in sources:
+            shard_tasks = sorted(by_source.get(source.key, []), key=lambda t: t.shard)
+            done = [results[t.id] for t in shard_tasks if t.id in results]
+            if len(done) < len(shard_tasks):
+                print(f"  ⚠ {source.label}: {len(shard_tasks) - len(done)}/{len(shard_tasks)} 个任务未完成")
+            if not done:
+                continue
+            if len(shard_tasks) == 1:
+                merged[source.key] = done[0]
+                continue
+            articles, seen = [], set()
+            for part in done:
+                for article in part or []:
+                    article_id = article_id_for_url(article.get("url", ""))
+                    if article_id not in seen:
+                        seen.add(article_id)
+                        articles.append(article)
+            merged[source.key] = articles[:source.quota] if source.quota is not None else articles
+        return merged
+
+    def cleanup(self, tasks: List[CrawlTask]):
+        """删除已合并任务的状态和结果（死信任务保留在死信队列中供排查）"""
+        ids = [task.id for task in tasks]
+        if not ids:
+            return
+        dead = set(self.redis.lrange(self._key("dead"), 0, -1))
+        finished = [task_id for task_id in ids if task_id not in dead]
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hdel(self._key("results"), *ids)
+        if finished:
+            for name in ("tasks", "attempts", "status", "errors", "leases"):
+                pipe.hdel(self._key(name), *finished)
+        pipe.execute()
+
+    # === 运维 ===
+
+    def stats(self) -> Dict[str, int]:
+        """队列长度统计"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.llen(self._key("pending"))
+        pipe.zcard(self._key("inflight"))
+        pipe.llen(self._key("dead"))
+        pending, inflight, dead = pipe.execute()
+        return {"pending": pending, "inflight": inflight, "dead": dead}
+
+    def dead_letters(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """最近的死信任务及其最后一次错误"""
+        ids = self.redis.lrange(self._key("dead"), 0, limit - 1)
+        if not ids:
+            return []
+        bodies = self.redis.hmget(self._key("tasks"), ids)
+        errors = self.redis.hmget(self._key("errors"), ids)
+        attempts = self.redis.hmget(self._key("attempts"), ids)
+        return [
+            {
+                "id": task_id,
+                "task": json.loads(body) if body else None,
+                "error": error,
+                "attempts": int(attempt or 0),
+            }
+            for task_id, body, error, attempt in zip(ids, bodies, errors, attempts)
+        ]
+
+    def requeue_dead(self) -> Tuple[int, int]:
+        """
+        将协调进程仍在等待的轮次的死信任务重新入队（尝试次数清零），返回 (重新入队数, 跳过数)
+        所属轮次已合并结束的任务重跑后无人合并，保留在死信队列中
+        """
+        requeued, skipped = self._requeue_dead(
+            keys=[self._key(name) for name in ("dead", "runs", "attempts", "status", "pending")]
+        )
+        return requeued, skipped
+
+
+class QueueWorker:
+    """
+    队列消费者：循环领取任务并执行，执行期间后台线程定期续期可见性超时
+
+    Usage:
+        worker = QueueWorker(crawl_queue, execute=lambda source, params: source.run(**params))
+        signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+        worker.run()  # 阻塞直到 stop()
+    """
+
+    def __init__(
+        self,
+        queue: CrawlQueue,
+        execute: Callable[[Source, Dict[str, Any]], Any],
+        worker_id: str = None,
+        poll_interval: float = WORK_QUEUE_POLL_INTERVAL,
+        max_tasks: int = None
+    ):
+        """
+        Args:
+            queue: 任务队列
+            execute: 执行一个任务，返回可 JSON 序列化的结果
+            worker_id: worker 标识（默认 主机名:随机串）
+            poll_interval: 队列为空时的轮询间隔（秒）
+            max_tasks: 处理多少个任务后退出，None 表示不限
+        """
+        self.queue = queue
+        self.execute = execute
+        self.worker_id = worker_id or f"{socket.gethostname()}:{uuid.uuid4().hex[:6]}"
+        self.poll_interval = poll_interval
+        self.max_tasks = max_tasks
+        self.processed = 0
+        self._stop_event = threading.Event()
+
+    def _heartbeat(self, task: CrawlTask, timeout: float, done: threading.Event):
+        """每 1/3 可见性超时续期一次；任务运行超过数据源超时后停止续期，交由其他 worker 重试"""
+        started = time.monotonic()
+        interval = max(0.5, self.queue.visibility_timeout / 3)
+        while not done.wait(interval):
+            if time.monotonic() - started >= timeout:
+                print(f"[Worker] ⚠ 任务 {task.id} 已运行超过 {timeout:g}s，停止续期")
+                return
+            try:
+                if not self.queue.extend(task):
+                    return
+            except Exception as e:
+                print(f"[Worker] 续期失败: {e}")
+
+    def process(self, task: CrawlTask, source_timeout: float):
+        """
+        执行一个任务：超过数据源超时（未声明时为 source_timeout）后停止续期并按失败处理，
+        worker 不再等待，继续领取下一个任务。execute 在守护线程中运行，无法强制中止，
+        被放弃的调用仍在后台运行直到返回，其结果被丢弃（任务已由其他 worker 重新领取）
+        """
+        source = registry.get(task.source)
+        if source is None:
+            state = self.queue.fail(task, LookupError(f"未注册的数据源: {task.source}"))
+            print(f"[Worker] 任务 {task.id} 的数据源未注册 ({state})")
+            return
+
+        timeout = source.timeout or source_timeout
+        done = threading.Event()
+        threading.Thread(
+            target=self._heartbeat, args=(task, timeout, done),
+            name=f"heartbeat-{task.id}", daemon=True
+        ).start()
+        print(f"[Worker] 开始任务 {task.id} (第 {task.attempts} 次尝试)")
+        start = time.monotonic()
+        future = Future()
+
+        def run():
+            try:
+                future.set_result(self.execute(source, task.params))
+            except BaseException as e:
+                future.set_exception(e)
+
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(run,), name=f"task-{task.id}", daemon=True).start()
+        try:
+            result = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            done.set()
+            state = self.queue.fail(task, TimeoutError(f"执行超过 {timeout:g}s"))
+            print(f"[Worker] 任务 {task.id} 超时 ({state})，放弃等待")
+            return
+        except Exception as e:
+            done.set()
+            state = self.queue.fail(task, e)
+            print(f"[Worker] 任务 {task.id} 失败 ({state}): {e}")
+            return
+        done.set()
+        if self.queue.ack(task, result):
+            print(f"[Worker] 任务 {task.id} 完成，耗时 {time.monotonic() - start:.1f}s")
+        else:
+            print(f"[Worker] 任务 {task.id} 已由其他 worker 完成，丢弃本次结果")
+
+    def run(self, source_timeout: float = CRAWL_SOURCE_TIMEOUT):
+        """运行消费循环，阻塞直到 stop() 或处理完 max_tasks 个任务"""
+        print(f"[Worker] {self.worker_id} 已启动，等待任务...")
+        while not self._stop_event.is_set():
+            if self.max_tasks is not None and self.processed >= self.max_tasks:
+                break
+            try:
+                self.queue.reap()
+                task = self.queue.claim(self.worker_id)
+            except Exception as e:
+                print(f"[Worker] 领取任务失败: {e}")
+                task = None
+            if task is None:
+                self._stop_event.wait(self.poll_interval)
+                continue
+            self.process(task, source_timeout)
+            self.processed += 1
+        print(f"[Worker] {self.worker_id} 已停止，共处理 {self.processed} 个任务")
+
+    def stop(self):
+        """请求停止（可在信号处理函数中调用），当前任务执行完后退出"""
+        self._stop_event.set()
+
+
+# 单例
+crawl_queue = CrawlQueue()